@@ -0,0 +1,4 @@
+"""
+Benchmarks del backend (scripts, no pruebas). Se ejecutan desde la carpeta
+backend, p. ej. `python -m bench.arranque`.
+"""
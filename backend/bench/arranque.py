@@ -0,0 +1,111 @@
+#bench/arranque.py
+"""
+Benchmark de arranque en frío.
+
+Mide, en procesos nuevos:
+- arranque: desde lanzar `uvicorn main:app` hasta la primera respuesta 200
+  de `GET /` (importación + lifespan + primera petición).
+- antes (con `--base REV`): lo mismo con la carpeta backend de la revisión
+  REV de git, extraída a un directorio temporal. Es la medición real del
+  arranque anterior, por ejemplo con REV = la revisión previa a quitar
+  `create_all` de main.py.
+- esquema: `Base.metadata.create_all(engine)`, el trabajo que antes hacía cada
+  worker al importar main.py y que ahora solo corre `python -m migraciones`.
+
+Sin `--base` no hay medición del arranque anterior: se muestra solo una
+estimación (arranque + esquema), marcada como tal.
+
+Uso (desde la carpeta backend, con MySQL disponible):
+    python -m bench.arranque [--base REV] [--repeticiones 5] [--puerto 8765]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+CREAR_ESQUEMA = (
+    "from models import Base; from utils.db import engine; "
+    "Base.metadata.create_all(engine)"
+)
+
+
+def extraer_revision(revision: str, destino: str) -> str:
+    """Extrae la carpeta backend de `revision` en `destino` y devuelve su ruta."""
+    raiz = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], check=True, capture_output=True, text=True
+    ).stdout.strip()
+    archivo = subprocess.run(
+        ["git", "-C", raiz, "archive", "--format=tar", revision, "backend"], check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", destino], input=archivo, check=True)
+    return os.path.join(destino, "backend")
+
+
+def medir_arranque(puerto: int, carpeta: str | None = None, limite: float = 60.0) -> float:
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(puerto), "--log-level", "warning"],
+        cwd=carpeta,
+    )
+    try:
+        while time.perf_counter() - inicio < limite:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {proceso.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/", timeout=1) as respuesta:
+                    if respuesta.status == 200:
+                        return time.perf_counter() - inicio
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        raise TimeoutError("El servidor no respondió a tiempo")
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def medir_esquema() -> float:
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", CREAR_ESQUEMA], check=True)
+    return time.perf_counter() - inicio
+
+
+def resumen(nombre: str, tiempos: list[float]) -> float:
+    mediana = statistics.median(tiempos)
+    print(f"{nombre:<10} mediana {mediana * 1000:8.1f} ms   (min {min(tiempos) * 1000:.1f}, max {max(tiempos) * 1000:.1f})")
+    return mediana
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", help="Revisión de git con el arranque anterior (p. ej. un commit o una rama)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    arranque = resumen("arranque", [medir_arranque(args.puerto) for _ in range(args.repeticiones)])
+    antes = None
+    if args.base:
+        with tempfile.TemporaryDirectory(prefix="arranque-base-") as destino:
+            carpeta = extraer_revision(args.base, destino)
+            antes = resumen("antes", [medir_arranque(args.puerto, carpeta) for _ in range(args.repeticiones)])
+    try:
+        esquema = resumen("esquema", [medir_esquema() for _ in range(args.repeticiones)])
+    except subprocess.CalledProcessError:
+        esquema = None
+        print("esquema   no se pudo medir (¿MySQL disponible?)")
+
+    if antes is not None:
+        print(f"\nPor worker: antes {antes * 1000:.1f} ms ({args.base}), ahora {arranque * 1000:.1f} ms "
+              f"({arranque / antes - 1:+.0%})")
+    elif esquema is not None:
+        print(f"\nPor worker: antes ≈ {(arranque + esquema) * 1000:.1f} ms (estimación: arranque + esquema; "
+              f"usar --base para medirlo), ahora {arranque * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#bench/carga.py
+"""
+Benchmark de latencia por endpoint.
+
+Levanta la app en el mismo proceso (cliente ASGI de httpx, con lifespan) sobre
+una base generada por `bench.datos`, y para cada escenario de `ESCENARIOS`
+mide p50/p95/p99 de latencia y, a partir del encabezado Server-Timing
+(utils.metricas), sentencias SQL y filas por petición.
+
+El resultado es un JSON (`--salida`, o stdout) que incluye el commit; con
+`--comparar base.json` se imprime además la diferencia contra una corrida
+anterior. Solo se ejercitan rutas de lectura, para que repetir la corrida no
+cambie los datos.
+
+Uso (desde la carpeta backend):
+    python -m bench.datos --escala 0.01
+    python -m bench.carga [--peticiones 50] [--concurrencia 1] [--salida resultado.json] [--comparar base.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from bench.datos import URL_POR_DEFECTO
+
+SERVER_TIMING = re.compile(r'desc="(\d+) sentencias, (\d+) filas"')
+BUSQUEDAS = ["pollo", "arroz", "salmón", "sin granos", "renal", "cachorro"]
+
+# nombre → función que recibe el muestreador y devuelve la ruta a pedir.
+ESCENARIOS = {
+    "platos.listar": lambda m: "/cliente/platos-mascotas/?limite=50",
+    "platos.buscar": lambda m: f"/cliente/platos-mascotas/?search={m.elegir(BUSQUEDAS)}",
+    "platos.detalle": lambda m: f"/cliente/platos-mascotas/id/{m.id('plato_combinado')}",
+    "platos.categorias": lambda m: "/cliente/platos-mascotas/categorias",
+    "platos.etiquetas": lambda m: "/cliente/platos-mascotas/etiquetas",
+    "cliente.perfil": lambda m: f"/cliente/id/{m.id('cliente')}",
+    "cliente.direcciones": lambda m: f"/cliente/{m.id('cliente')}/direcciones",
+    "cliente.notificaciones": lambda m: f"/cliente/{m.id('cliente')}/notificaciones",
+    "cliente.no_leidas": lambda m: f"/cliente/{m.id('cliente')}/notificaciones/no-leidas",
+    "cliente.membresia": lambda m: f"/cliente/{m.id('cliente')}/membresia",
+    "perfil.obtener": lambda m: f"/cliente/perfil/{m.id('cliente')}",
+    "mascotas.listar": lambda m: f"/cliente/mascotas/{m.id('cliente')}",
+    "mascotas.detalle": lambda m: f"/cliente/mascotas/detalle/{m.id('registro_mascota')}",
+    "favoritos.listar": lambda m: f"/cliente/favoritos/{m.id('cliente')}",
+    "carrito.obtener": lambda m: f"/cliente/carrito/{m.id('cliente')}",
+    "subscripciones.listar": lambda m: "/cliente/subscripciones/",
+    "pedido.historial": lambda m: f"/cliente/pedido/{m.id('cliente')}/historial",
+    "pedido.detalle": lambda m: f"/cliente/pedido/detalle/{m.id('pedido')}",
+    "pedido.especializados": lambda m: f"/cliente/pedido/especializado/{m.id('cliente')}",
+    "pedido.especializado_detalle": lambda m: f"/cliente/pedido/especializado/detalle/{m.especializado()}",
+    "pago.listar": lambda m: f"/cliente/pedido/{m.id('cliente')}/pagos",
+    "admin.pedidos": lambda m: "/admin/pedidos/",
+    "admin.pedido": lambda m: f"/admin/pedidos/{m.id('pedido')}",
+    "admin.pedido_entrega": lambda m: f"/admin/pedidos/{m.id('pedido')}/entrega",
+    "admin.asignados": lambda m: "/admin/pedidos/asignados",
+    "admin.especializados": lambda m: "/admin/pedidos/especializados",
+    "admin.repartidores": lambda m: "/admin/repartidores/",
+    "admin.repartidor": lambda m: f"/admin/repartidores/{m.id('repartidor')}",
+    "admin.repartidor_pedidos": lambda m: f"/admin/repartidores/{m.id('repartidor')}/pedidos",
+    "admin.platos": lambda m: "/admin/platos/",
+    "admin.subscripciones": lambda m: "/admin/subscripciones/",
+    "repartidor.pedidos": lambda m: f"/repartidor/{m.id('repartidor')}/pedidos",
+    "repartidor.historial": lambda m: f"/repartidor/{m.id('repartidor')}/historial",
+    "repartidor.pedido": lambda m: f"/repartidor/pedidos/{m.id('pedido')}",
+    "nutricionista.buscar_items": lambda m: f"/nutricionista/items/buscar?q={m.elegir(BUSQUEDAS)}",
+    "nutricionista.pendientes": lambda m: "/nutricionista/pedidos/pendientes",
+    "nutricionista.cola": lambda m: "/nutricionista/pedidos/cola?limite=50",
+    "nutricionista.pacientes": lambda m: "/nutricionista/pacientes",
+    "nutricionista.pedido": lambda m: f"/nutricionista/pedidos/{m.id('pedido_especializado')}",
+    "nutricionista.platos_personalizados": lambda m: f"/nutricionista/platos/personalizados/{m.id('registro_mascota')}",
+    "nutricionista.historial": lambda m: "/nutricionista/historial",
+}
+
+
+class Muestreador:
+    """Elige ids existentes: los de `bench.datos` son densos, basta conocer el máximo."""
+
+    def __init__(self, semilla: int):
+        from sqlalchemy import func, select
+        from models import Base, PedidoEspecializado
+        from utils.db import engine
+
+        self.rng = random.Random(semilla)
+        tablas = ("cliente", "pedido", "pedido_especializado", "plato_combinado", "registro_mascota", "repartidor")
+        with engine.connect() as conexion:
+            self.maximos = {
+                nombre: conexion.scalar(select(func.max(Base.metadata.tables[nombre].c.id))) or 1
+                for nombre in tablas
+            }
+            self.especializados = list(conexion.scalars(select(PedidoEspecializado.pedido_id).limit(1000))) or [0]
+
+    def id(self, tabla: str) -> int:
+        return self.rng.randint(1, self.maximos[tabla])
+
+    def especializado(self) -> int:
+        return self.rng.choice(self.especializados)
+
+    def elegir(self, opciones):
+        return self.rng.choice(opciones)
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por rango más cercano."""
+    ordenados = sorted(valores)
+    return ordenados[max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))]
+
+
+async def medir_escenario(cliente, ruta_de, muestreador, peticiones: int, concurrencia: int, tiempo_max: float) -> dict:
+    tiempos, sentencias, filas = [], [], []
+    estados: dict[str, int] = {}
+    limite = asyncio.Semaphore(concurrencia)
+    fin = time.perf_counter() + tiempo_max
+
+    async def una():
+        async with limite:
+            if time.perf_counter() > fin:
+                return
+            ruta = ruta_de(muestreador)
+            inicio = time.perf_counter()
+            respuesta = await cliente.get(ruta)
+            tiempos.append(time.perf_counter() - inicio)
+            estados[str(respuesta.status_code)] = estados.get(str(respuesta.status_code), 0) + 1
+            datos = SERVER_TIMING.search(respuesta.headers.get("server-timing", ""))
+            if datos:
+                sentencias.append(int(datos.group(1)))
+                filas.append(int(datos.group(2)))
+
+    await asyncio.gather(*(una() for _ in range(peticiones)))
+    return {
+        "peticiones": len(tiempos),
+        "estados": dict(sorted(estados.items())),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+        "p99_ms": round(percentil(tiempos, 99) * 1000, 2),
+        "media_ms": round(statistics.fmean(tiempos) * 1000, 2),
+        "sentencias_por_peticion": round(statistics.fmean(sentencias), 2) if sentencias else None,
+        "filas_por_peticion": round(statistics.fmean(filas), 2) if filas else None,
+    }
+
+
+async def correr(args) -> dict:
+    import httpx
+    import main
+
+    muestreador = Muestreador(args.semilla)
+    escenarios = {n: f for n, f in ESCENARIOS.items() if not args.solo or any(n.startswith(s) for s in args.solo)}
+    resultados = {}
+    async with main.app.router.lifespan_context(main.app):
+        transporte = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+            for nombre, ruta_de in escenarios.items():
+                # Una petición de calentamiento, fuera de la medición.
+                await cliente.get(ruta_de(muestreador))
+                resultados[nombre] = await medir_escenario(
+                    cliente, ruta_de, muestreador, args.peticiones, args.concurrencia, args.tiempo_max
+                )
+                r = resultados[nombre]
+                print(
+                    f"{nombre:<38} p50 {r['p50_ms']:>9.2f}  p95 {r['p95_ms']:>9.2f}  p99 {r['p99_ms']:>9.2f} ms"
+                    f"  sql/pet {r['sentencias_por_peticion'] if r['sentencias_por_peticion'] is not None else '-':>6}"
+                    f"  {' '.join(f'{c}×{n}' for c, n in r['estados'].items())}",
+                    file=sys.stderr,
+                )
+    return resultados
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(base: dict, actual: dict):
+    print(f"\n{'escenario':<38} {'p50 base':>10} {'p50':>10} {'Δ':>8}   {'sql base':>8} {'sql':>6}", file=sys.stderr)
+    for nombre, r in actual["escenarios"].items():
+        b = base.get("escenarios", {}).get(nombre)
+        if b is None:
+            continue
+        delta = (r["p50_ms"] - b["p50_ms"]) / b["p50_ms"] if b["p50_ms"] else 0.0
+        print(
+            f"{nombre:<38} {b['p50_ms']:>10.2f} {r['p50_ms']:>10.2f} {delta:>+8.0%}"
+            f"   {b['sentencias_por_peticion'] or '-':>8} {r['sentencias_por_peticion'] or '-':>6}",
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=URL_POR_DEFECTO, help="Base generada con bench.datos")
+    parser.add_argument("--peticiones", type=int, default=50, help="Peticiones por escenario")
+    parser.add_argument("--concurrencia", type=int, default=1)
+    parser.add_argument("--tiempo-max", type=float, default=30.0, help="Segundos máximos por escenario")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--solo", nargs="*", help="Prefijos de escenario a correr (p. ej. admin. pedido.)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    # Antes de importar la app: utils.db lee la URL al importarse.
+    os.environ["DATABASE_URL"] = args.url
+    if args.url.startswith("sqlite"):
+        os.environ["ASYNC_DATABASE_URL"] = args.url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    os.environ.setdefault("LOG_NIVEL", "WARNING")
+
+    resultado = {
+        "commit": _commit(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "url": args.url,
+        "parametros": {"peticiones": args.peticiones, "concurrencia": args.concurrencia, "semilla": args.semilla},
+        "escenarios": asyncio.run(correr(args)),
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            comparar(json.load(archivo), resultado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#bench/datos.py
+"""
+Generador de datos sintéticos para los benchmarks.
+
+Con `--escala 1` genera volúmenes de producción (100k clientes, 1M pedidos,
+mascotas con alergias y condiciones, repartidores, notificaciones...); para una
+corrida rápida basta `--escala 0.01`. Los datos son deterministas (misma semilla,
+mismos datos) para que las corridas de distintos commits sean comparables, y
+los ids de cada tabla son densos (1..N), lo que `bench.carga` usa para elegir
+ids al azar sin consultar.
+
+Destinos:
+- SQLite (por defecto `bench/datos.db`): se crea el esquema de models.py con los
+  nombres de índice prefijados por la tabla (en SQLite son globales).
+- MySQL: `--url mysql+pymysql://...`; el esquema se crea con las migraciones y
+  la carga desactiva FOREIGN_KEY_CHECKS en su conexión.
+
+Uso (desde la carpeta backend):
+    python -m bench.datos [--escala 0.01] [--url sqlite:///bench/datos.db] [--semilla 7]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import MetaData, create_engine, insert
+from sqlalchemy.dialects.mysql import TINYINT
+from sqlalchemy.ext.compiler import compiles
+
+from models import (
+    AlergiaEspecie, AlergiaMascota, Base, Categoria, Cliente, CondicionSalud, Consulta, ControlEntrega,
+    CuentaUsuario, DescripcionAlergias, DetallePedido, Direccion, Especie, Etiqueta, EtiquetaPlato,
+    MembresiaSubscripcion, Notificacion, Nutricionista, Pago, PasarelaPago, Pedido, PedidoEspecializado,
+    PlatoCombinado, PlatoFavorito, PreferenciaAlimentaria, Repartidor, Rol, RegistroMascota, UsuarioRol,
+)
+
+URL_POR_DEFECTO = "sqlite:///" + os.path.join(os.path.dirname(__file__), "datos.db")
+LOTE = 10_000
+# Fecha fija: los datos no dependen del día en que se generan.
+HASTA = datetime(2026, 1, 1)
+
+# Volúmenes con escala 1.
+VOLUMENES = {
+    "clientes": 100_000,
+    "mascotas": 150_000,
+    "repartidores": 500,
+    "nutricionistas": 50,
+    "platos": 400,
+    "pedidos": 1_000_000,
+    "notificaciones": 500_000,
+    "favoritos": 200_000,
+}
+# El catálogo no crece con la cantidad de clientes.
+SIN_ESCALAR = {"platos"}
+
+ESTADOS_PEDIDO = (
+    ("entregado", 70), ("pendiente", 10), ("en_preparacion", 8),
+    ("asignado", 6), ("en_camino", 4), ("devuelto", 2),
+)
+CATEGORIAS = ["Platos completos", "Snacks", "Postres", "Crudos (BARF)", "Suplementos", "Dietas", "Premios", "Caldos"]
+ETIQUETAS = [
+    "pollo", "res", "cerdo", "pescado", "cordero", "pavo", "hipoalergénico", "sin granos", "light",
+    "cachorro", "senior", "alto en proteína", "bajo en grasa", "vegetales", "arroz", "quinua", "camote",
+    "zanahoria", "calabaza", "avena", "huevo", "hígado", "salmón", "atún", "renal", "digestivo",
+    "articular", "piel y pelaje", "dental", "premium",
+]
+ALERGIAS = ["Pollo", "Res", "Trigo", "Maíz", "Soya", "Lácteos", "Huevo", "Pescado", "Cordero", "Cerdo"]
+CONDICIONES = ["Obesidad", "Insuficiencia renal", "Diabetes", "Dermatitis", "Gastritis", "Artrosis", "Pancreatitis"]
+RAZAS = {1: ["Mestizo", "Labrador", "Pug", "Beagle", "Bulldog", "Schnauzer", "Shih Tzu"],
+         2: ["Mestizo", "Siamés", "Persa", "Bengalí", "Maine Coon"]}
+
+
+@compiles(TINYINT, "sqlite")
+def _tinyint_sqlite(tipo, compilador, **kw):
+    return "INTEGER"
+
+
+def crear_esquema(engine):
+    if engine.dialect.name == "sqlite":
+        esquema = MetaData()
+        for tabla in Base.metadata.sorted_tables:
+            copia = tabla.to_metadata(esquema)
+            for indice in copia.indexes:
+                indice.name = f"{tabla.name}_{indice.name}"
+        esquema.drop_all(engine)
+        esquema.create_all(engine)
+    else:
+        from migraciones import aplicar_migraciones
+        aplicar_migraciones(engine)
+
+
+class _Cargador:
+    """Acumula filas por tabla y las inserta en lotes de `LOTE` (executemany)."""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.pendientes: dict = {}
+        self.totales: dict[str, int] = {}
+
+    def agregar(self, modelo, fila: dict):
+        filas = self.pendientes.setdefault(modelo, [])
+        filas.append(fila)
+        if len(filas) >= LOTE:
+            self._vaciar(modelo)
+
+    def _vaciar(self, modelo):
+        filas = self.pendientes.pop(modelo, None)
+        if filas:
+            self.conexion.execute(insert(modelo), filas)
+            nombre = modelo.__tablename__
+            self.totales[nombre] = self.totales.get(nombre, 0) + len(filas)
+
+    def terminar(self):
+        for modelo in list(self.pendientes):
+            self._vaciar(modelo)
+
+
+def _fecha(rng: random.Random, dias: int = 365) -> datetime:
+    return HASTA - timedelta(seconds=rng.randrange(dias * 86400))
+
+
+def _dinero(valor: float) -> Decimal:
+    return Decimal(str(round(valor, 2)))
+
+
+def generar(engine, escala: float = 1.0, semilla: int = 7) -> dict[str, int]:
+    """Crea el esquema, lo llena y devuelve {tabla: filas insertadas}."""
+    rng = random.Random(semilla)
+    n = {
+        clave: valor if clave in SIN_ESCALAR else max(1, int(valor * escala))
+        for clave, valor in VOLUMENES.items()
+    }
+    estados = [estado for estado, peso in ESTADOS_PEDIDO for _ in range(peso)]
+
+    crear_esquema(engine)
+    with engine.begin() as conexion:
+        if engine.dialect.name == "mysql":
+            conexion.exec_driver_sql("SET FOREIGN_KEY_CHECKS=0")
+        carga = _Cargador(conexion)
+
+        # Catálogos
+        for i, nombre in enumerate(["admin", "cliente", "nutricionista", "repartidor"], start=1):
+            carga.agregar(Rol, {"id": i, "nombre": nombre, "estado_registro": "A"})
+        for i, (nombre, duracion, precio) in enumerate([("Básica", 30, 19.9), ("Plus", 90, 49.9), ("Premium", 365, 159.9)], start=1):
+            carga.agregar(MembresiaSubscripcion, {
+                "id": i, "nombre": nombre, "duracion": duracion, "precio": _dinero(precio),
+                "estado_registro": "A", "descripcion": f"Membresía {nombre}", "beneficios": "Envío gratis",
+            })
+        for i, nombre in enumerate(["Yape", "Plin", "Tarjeta"], start=1):
+            carga.agregar(PasarelaPago, {"id": i, "nombre": nombre, "estado_registro": "A"})
+        for i, nombre in enumerate(["Perro", "Gato"], start=1):
+            carga.agregar(Especie, {"id": i, "nombre": nombre, "estado_registro": "A"})
+        for i, nombre in enumerate(CATEGORIAS, start=1):
+            carga.agregar(Categoria, {"id": i, "nombre": nombre, "estado_registro": "A", "descripcion": nombre})
+        for i, nombre in enumerate(ETIQUETAS, start=1):
+            carga.agregar(Etiqueta, {"id": i, "nombre": nombre})
+        alergias_especie = 0
+        for especie_id in (1, 2):
+            for nombre in ALERGIAS:
+                alergias_especie += 1
+                carga.agregar(AlergiaEspecie, {
+                    "id": alergias_especie, "especie_id": especie_id, "nombre": nombre, "estado_registro": "A",
+                })
+
+        # Platos
+        precios = {}
+        etiqueta_plato = 0
+        for i in range(1, n["platos"] + 1):
+            etiquetas = rng.sample(range(1, len(ETIQUETAS) + 1), 3)
+            precios[i] = _dinero(rng.uniform(8, 60))
+            carga.agregar(PlatoCombinado, {
+                "id": i, "nombre": f"{ETIQUETAS[etiquetas[0] - 1].capitalize()} con {ETIQUETAS[etiquetas[1] - 1]} {i}",
+                "precio": precios[i], "incluye_plato": 1, "es_crudo": int(rng.random() < 0.15),
+                "publicado": int(rng.random() < 0.9), "creado_nutricionista": int(rng.random() < 0.1),
+                "estado_registro": "A", "categoria_id": rng.randint(1, len(CATEGORIAS)), "especie_id": rng.randint(1, 2),
+                "descripcion": "Receta balanceada con " + ", ".join(ETIQUETAS[e - 1] for e in etiquetas),
+            })
+            for etiqueta_id in etiquetas:
+                etiqueta_plato += 1
+                carga.agregar(EtiquetaPlato, {"id": etiqueta_plato, "plato_combinado_id": i, "etiqueta_id": etiqueta_id})
+
+        # Cuentas: clientes, repartidores y nutricionistas
+        cuenta = 0
+
+        def nueva_cuenta(prefijo: str, rol_id: int) -> int:
+            nonlocal cuenta
+            cuenta += 1
+            carga.agregar(CuentaUsuario, {
+                "id": cuenta, "correo_electronico": f"{prefijo}{cuenta}@bench.local",
+                "nombre_usuario": f"{prefijo}{cuenta}", "estado_registro": "A", "ultimo_acceso": _fecha(rng, 30),
+            })
+            carga.agregar(UsuarioRol, {"id": cuenta, "cuenta_usuario_id": cuenta, "rol_id": rol_id, "estado_registro": "A"})
+            return cuenta
+
+        direccion = 0
+        direcciones_cliente = {}
+        for i in range(1, n["clientes"] + 1):
+            carga.agregar(Cliente, {
+                "id": i, "cuenta_usuario_id": nueva_cuenta("cliente", 2), "nombre": f"Cliente {i}",
+                "estado_registro": "A", "telefono": f"9{i:08d}"[:11],
+                "membresia_subscripcion_id": rng.choice((None, None, None, 1, 2, 3)),
+            })
+            direcciones_cliente[i] = []
+            for principal in (1, 0)[: 1 + (rng.random() < 0.2)]:
+                direccion += 1
+                direcciones_cliente[i].append(direccion)
+                carga.agregar(Direccion, {
+                    "id": direccion, "cliente_id": i, "nombre": "Casa" if principal else "Trabajo",
+                    "latitud": _dinero(-12 + rng.uniform(-0.2, 0.2)), "longitud": _dinero(-77 + rng.uniform(-0.2, 0.2)),
+                    "es_principal": principal, "estado_registro": "A", "referencia": "",
+                })
+        for i in range(1, n["repartidores"] + 1):
+            carga.agregar(Repartidor, {
+                "id": i, "cuenta_usuario_id": nueva_cuenta("repartidor", 4), "nombre": f"Repartidor {i}",
+                "telefono": f"9{i:08d}", "estado_registro": "A",
+            })
+        for i in range(1, n["nutricionistas"] + 1):
+            carga.agregar(Nutricionista, {
+                "id": i, "cuenta_usuario_id": nueva_cuenta("nutricionista", 3), "nombre": f"Nutricionista {i}",
+                "telefono": f"9{i:08d}", "estado_registro": "A", "especialidad": "Nutrición canina y felina",
+            })
+
+        # Mascotas con alergias, condiciones y preferencias
+        ids = dict.fromkeys(("alergia", "condicion", "descripcion", "preferencia", "consulta"), 0)
+        mascotas_cliente: dict[int, list[int]] = {}
+        for i in range(1, n["mascotas"] + 1):
+            cliente_id = rng.randint(1, n["clientes"])
+            especie_id = 1 if rng.random() < 0.65 else 2
+            mascotas_cliente.setdefault(cliente_id, []).append(i)
+            carga.agregar(RegistroMascota, {
+                "id": i, "cliente_id": cliente_id, "nombre": f"Mascota {i}", "sexo": rng.choice("MH"),
+                "cambio_edad": date(2025, rng.randint(1, 12), 1), "edad": rng.randint(0, 15), "estado_registro": "A",
+                "especie_id": especie_id, "raza": rng.choice(RAZAS[especie_id]), "peso": _dinero(rng.uniform(2, 40)),
+            })
+            for _ in range(rng.choices((0, 1, 2), (60, 30, 10))[0]):
+                ids["alergia"] += 1
+                carga.agregar(AlergiaMascota, {
+                    "id": ids["alergia"], "registro_mascota_id": i, "estado_registro": "A",
+                    "severidad": rng.choice(("leve", "moderada", "severa")),
+                    "alergia_especie_id": (especie_id - 1) * len(ALERGIAS) + rng.randint(1, len(ALERGIAS)),
+                })
+            if rng.random() < 0.35:
+                ids["condicion"] += 1
+                carga.agregar(CondicionSalud, {
+                    "id": ids["condicion"], "registro_mascota_id": i, "nombre": rng.choice(CONDICIONES),
+                    "fecha": _fecha(rng), "estado_registro": "A",
+                })
+            if rng.random() < 0.2:
+                ids["descripcion"] += 1
+                carga.agregar(DescripcionAlergias, {
+                    "id": ids["descripcion"], "registro_mascota_id": i, "descripcion": "Picazón tras comer",
+                    "fecha": _fecha(rng), "estado_registro": "A",
+                })
+            if rng.random() < 0.3:
+                ids["preferencia"] += 1
+                carga.agregar(PreferenciaAlimentaria, {
+                    "id": ids["preferencia"], "registro_mascota_id": i, "estado_registro": "A",
+                    "nombre": rng.choice(("Húmedo", "Seco", "Sin granos", "Casero")),
+                })
+
+        # Pedidos con su detalle, entrega y pago; 5 % especializados
+        detalle = entrega = pago = especializado = 0
+        for i in range(1, n["pedidos"] + 1):
+            cliente_id = rng.randint(1, n["clientes"])
+            estado = rng.choice(estados)
+            fecha = _fecha(rng)
+            total = Decimal("0.00")
+            for _ in range(rng.choices((1, 2, 3, 4, 5), (30, 30, 20, 12, 8))[0]):
+                plato_id = rng.randint(1, n["platos"])
+                cantidad = rng.choices((1, 2, 3), (70, 20, 10))[0]
+                subtotal = precios[plato_id] * cantidad
+                total += subtotal
+                detalle += 1
+                carga.agregar(DetallePedido, {
+                    "id": detalle, "pedido_id": i, "cantidad": cantidad, "subtotal": subtotal, "plato_combinado_id": plato_id,
+                })
+            carga.agregar(Pedido, {
+                "id": i, "cliente_id": cliente_id, "fecha": fecha, "total": total, "incluye_plato": 1,
+                "estado": estado, "direccion_id": rng.choice(direcciones_cliente[cliente_id]),
+            })
+            if estado in ("asignado", "en_camino", "entregado", "devuelto"):
+                entrega += 1
+                carga.agregar(ControlEntrega, {
+                    "id": entrega, "pedido_id": i, "fecha_entrega": fecha + timedelta(hours=rng.randint(2, 48)),
+                    "confirmacion_entrega": int(estado == "entregado"), "repartidor_id": rng.randint(1, n["repartidores"]),
+                })
+            if estado != "pendiente":
+                pago += 1
+                carga.agregar(Pago, {
+                    "id": pago, "pedido_id": i, "monto": total, "fecha": fecha, "pasarela_pago_id": rng.randint(1, 3),
+                    "estado": "pendiente" if estado == "en_preparacion" else "aprobado",
+                })
+            mascotas = mascotas_cliente.get(cliente_id)
+            if mascotas and rng.random() < 0.05:
+                especializado += 1
+                mascota_id = rng.choice(mascotas)
+                con_consulta = rng.random() < 0.6
+                carga.agregar(PedidoEspecializado, {
+                    "id": especializado, "pedido_id": i, "registro_mascota_id": mascota_id,
+                    "frecuencia_cantidad": "2 veces al día", "consulta_nutricionista": int(con_consulta),
+                    "estado_registro": "A", "objetivo_dieta": "Control de peso",
+                })
+                if con_consulta and estado != "pendiente":
+                    ids["consulta"] += 1
+                    carga.agregar(Consulta, {
+                        "id": ids["consulta"], "registro_mascota_id": mascota_id, "fecha": fecha + timedelta(hours=6),
+                        "estado_registro": "A", "nutricionista_id": rng.randint(1, n["nutricionistas"]),
+                        "observaciones": "Revisión de dieta",
+                    })
+
+        # Notificaciones y favoritos
+        for i in range(1, n["notificaciones"] + 1):
+            carga.agregar(Notificacion, {
+                "id": i, "cliente_id": rng.randint(1, n["clientes"]), "titulo": "Actualización de tu pedido",
+                "mensaje": "Tu pedido cambió de estado.", "fecha": _fecha(rng), "leido": int(rng.random() < 0.7),
+                "tipo": "pedido", "referencia_id": str(rng.randint(1, n["pedidos"])),
+            })
+        favoritos = set()
+        while len(favoritos) < min(n["favoritos"], n["clientes"] * n["platos"]):
+            favoritos.add((rng.randint(1, n["clientes"]), rng.randint(1, n["platos"])))
+        for i, (cliente_id, plato_id) in enumerate(sorted(favoritos), start=1):
+            carga.agregar(PlatoFavorito, {
+                "id": i, "cliente_id": cliente_id, "plato_combinado_id": plato_id, "fecha_agregado": _fecha(rng),
+            })
+
+        carga.terminar()
+    return carga.totales
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=URL_POR_DEFECTO)
+    parser.add_argument("--escala", type=float, default=1.0)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    inicio = time.perf_counter()
+    totales = generar(engine, args.escala, args.semilla)
+    for tabla, filas in sorted(totales.items()):
+        print(f"{tabla:<24} {filas:>10,}")
+    print(f"\n{sum(totales.values()):,} filas en {time.perf_counter() - inicio:.1f} s → {args.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#bench/serializacion.py
+"""
+Benchmark de serialización y compresión de respuestas.
+
+Para el catálogo, el historial de pedidos, la cola del repartidor y el detalle
+de un pedido captura el contenido que devuelve la ruta (antes de serializar) y
+mide:
+- CPU de serialización: `jsonable_encoder` + `json` (camino por defecto de
+  FastAPI) contra `serializar` de utils.respuestas (orjson, o el serializador
+  compilado de Pydantic para los modelos de respuesta).
+- Bytes: JSON sin comprimir, gzip y, si está instalado `brotli`, Brotli, con
+  los niveles que usa `MiddlewareCompresion`.
+
+Uso (desde la carpeta backend):
+    python -m bench.datos --escala 0.01
+    python -m bench.serializacion [--repeticiones 200] [--salida resultado.json]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+
+from bench.carga import Muestreador
+from bench.datos import URL_POR_DEFECTO
+
+# nombre → función que recibe el muestreador y devuelve la ruta a pedir.
+ESCENARIOS = {
+    "platos.catalogo": lambda m: "/cliente/platos-mascotas/",
+    "pedido.historial": lambda m: f"/cliente/pedido/{m.id('cliente')}/historial",
+    "repartidor.pedidos": lambda m: f"/repartidor/{m.id('repartidor')}/pedidos",
+    # Detalle de pedido con los modelos de utils.detalle_pedido.
+    "pedido.detalle": lambda m: f"/cliente/pedido/detalle/{m.id('pedido')}",
+    "admin.pedido": lambda m: f"/admin/pedidos/{m.id('pedido')}",
+    "repartidor.pedido": lambda m: f"/repartidor/pedidos/{m.id('pedido')}",
+}
+
+
+async def capturar_contenidos(muestreador, muestras: int) -> dict[str, list]:
+    """Pide cada escenario a la app y guarda lo que llega a `RespuestaJSONMedida.render`."""
+    import httpx
+    import main
+    from utils.metricas import RespuestaJSONMedida
+
+    capturados = []
+    render_original = RespuestaJSONMedida.render
+
+    def render_capturando(self, content):
+        capturados.append(content)
+        return render_original(self, content)
+
+    contenidos = {}
+    RespuestaJSONMedida.render = render_capturando
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            transporte = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=None) as cliente:
+                for nombre, ruta_de in ESCENARIOS.items():
+                    contenidos[nombre] = []
+                    for _ in range(muestras):
+                        capturados.clear()
+                        respuesta = await cliente.get(ruta_de(muestreador), headers={"Accept-Encoding": "identity"})
+                        if respuesta.status_code == 200 and capturados:
+                            contenidos[nombre].append(capturados[-1])
+    finally:
+        RespuestaJSONMedida.render = render_original
+    return contenidos
+
+
+def medir(funcion, contenidos: list, repeticiones: int) -> float:
+    """Mediana, en microsegundos, de serializar cada contenido."""
+    tiempos = []
+    for contenido in contenidos:
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion(contenido)
+        tiempos.append((time.perf_counter() - inicio) / repeticiones)
+    return statistics.median(tiempos) * 1e6
+
+
+def comparar(contenidos: dict[str, list], repeticiones: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from utils.respuestas import (
+        BROTLI_DISPONIBLE,
+        COMPRESION_BROTLI_CALIDAD,
+        COMPRESION_GZIP_NIVEL,
+        ORJSON_DISPONIBLE,
+        serializar,
+    )
+
+    def antes(contenido):
+        # Lo que hacía FastAPI con un dict: jsonable_encoder y luego JSONResponse.render.
+        return JSONResponse.render(None, jsonable_encoder(contenido))
+
+    resultados = {}
+    for nombre, lista in contenidos.items():
+        if not lista:
+            print(f"{nombre:<22} sin respuestas 200 (¿faltan datos?)", file=sys.stderr)
+            continue
+        cuerpos = [serializar(c) for c in lista]
+        bytes_json = statistics.median(len(c) for c in cuerpos)
+        bytes_gzip = statistics.median(len(gzip.compress(c, COMPRESION_GZIP_NIVEL)) for c in cuerpos)
+        bytes_br = None
+        if BROTLI_DISPONIBLE:
+            import brotli
+
+            bytes_br = statistics.median(len(brotli.compress(c, quality=COMPRESION_BROTLI_CALIDAD)) for c in cuerpos)
+        r = resultados[nombre] = {
+            "muestras": len(lista),
+            "antes_us": round(medir(antes, lista, repeticiones), 1),
+            "ahora_us": round(medir(serializar, lista, repeticiones), 1),
+            "bytes_json": bytes_json,
+            "bytes_gzip": bytes_gzip,
+            "bytes_br": bytes_br,
+        }
+        print(
+            f"{nombre:<22} ser {r['antes_us']:>9.1f} → {r['ahora_us']:>8.1f} µs"
+            f"  ({r['antes_us'] / r['ahora_us']:.0f}x)"
+            f"   bytes {bytes_json:>8.0f} → gzip {bytes_gzip:>7.0f}"
+            f" ({1 - bytes_gzip / bytes_json:.0%} menos)"
+            + (f", br {bytes_br:>7.0f}" if bytes_br is not None else ""),
+            file=sys.stderr,
+        )
+    if not ORJSON_DISPONIBLE:
+        print("orjson no está instalado: 'ahora' usa json de la biblioteca estándar", file=sys.stderr)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=URL_POR_DEFECTO, help="Base generada con bench.datos")
+    parser.add_argument("--muestras", type=int, default=20, help="Respuestas distintas por escenario")
+    parser.add_argument("--repeticiones", type=int, default=200, help="Serializaciones por respuesta")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+
+    # Antes de importar la app: utils.db lee la URL al importarse.
+    os.environ["DATABASE_URL"] = args.url
+    if args.url.startswith("sqlite"):
+        os.environ["ASYNC_DATABASE_URL"] = args.url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    os.environ.setdefault("LOG_NIVEL", "WARNING")
+
+    contenidos = asyncio.run(capturar_contenidos(Muestreador(args.semilla), args.muestras))
+    texto = json.dumps(comparar(contenidos, args.repeticiones), indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,13 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from utils.db import engine
+from utils.arranque import lifespan
+from utils.cache_http import MiddlewareCacheHttp
+from utils.metricas import MiddlewareMetricas, RespuestaJSONMedida, metricas
+from utils.registro import MiddlewareRegistro
+from utils.respuestas import MiddlewareCompresion
 from routers.cliente import pago as cliente_pago
 
 # Routers generales
@@ -23,23 +28,26 @@ from routers.cliente import (
     subscripciones as cliente_subscripciones,
     favoritos,
     carrito as cliente_carrito,
+    eventos as cliente_eventos,
+    referencia as cliente_referencia,
 )
 
 # Routers admin
 from routers.admin import (
+    exportar as admin_exportar,
     pedidos as admin_pedidos,
     platos as admin_platos,
     repartidores as admin_repartidores,
     subscripciones as admin_subscripciones,
 )
 
-from models import Base
+# El esquema se gestiona aparte (`python -m migraciones`); el arranque del
+# worker solo calienta pools y cachés (ver utils.arranque).
+app = FastAPI(title="API Mascota", lifespan=lifespan, default_response_class=RespuestaJSONMedida)
 
-print("--- Intentando crear tablas en la base de datos 'mascotas'... ---")
-Base.metadata.create_all(bind=engine)
-print("--- Proceso de creación de tablas finalizado. ---")
-
-app = FastAPI(title="API Mascota")
+# ETag / Cache-Control / 304 para datos de referencia (ver utils/cache_http.py).
+# Va por dentro de CORS para que los 304 también lleven sus encabezados.
+app.add_middleware(MiddlewareCacheHttp)
 
 # ✅ CONFIGURACIÓN CRÍTICA DE CORS - DEBE IR ANTES DE CUALQUIER ROUTER
 app.add_middleware(
@@ -51,6 +59,17 @@ app.add_middleware(
     expose_headers=["*"]  # ← Expone todos los headers
 )
 
+# Brotli / gzip según Accept-Encoding (ver utils/respuestas.py). Las métricas,
+# por fuera, incluyen el tiempo de compresión.
+app.add_middleware(MiddlewareCompresion)
+
+# Registro estructurado: asocia cada log a su ruta y emite un evento por petición.
+app.add_middleware(MiddlewareRegistro)
+
+# Tiempo total, tiempo en BD, sentencias, filas y serialización por petición:
+# encabezado Server-Timing y GET /metrics (formato Prometheus).
+app.add_middleware(MiddlewareMetricas)
+
 # Servir archivos estáticos
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -66,12 +85,20 @@ app.include_router(perfil.router)
 app.include_router(cliente_subscripciones.router)
 app.include_router(favoritos.router)
 app.include_router(admin_pedidos.router)
+app.include_router(admin_exportar.router)
 app.include_router(admin_platos.router)
 app.include_router(admin_repartidores.router)
 app.include_router(admin_subscripciones.router)
 app.include_router(cliente_carrito.router)
 app.include_router(cliente_pago.router)
+app.include_router(cliente_eventos.router)
+app.include_router(cliente_referencia.router)
 
 @app.get("/")
 def root():
-    return {"status": "ok", "message": "Backend Mascota iniciado correctamente"}
\ No newline at end of file
+    return {"status": "ok", "message": "Backend Mascota iniciado correctamente"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def exportar_metricas():
+    return PlainTextResponse(metricas.exportar_prometheus(), media_type="text/plain; version=0.0.4")
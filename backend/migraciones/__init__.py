@@ -0,0 +1,107 @@
+#migraciones/__init__.py
+"""
+MIGRACIONES DEL ESQUEMA
+-----------------------
+Reemplaza el `Base.metadata.create_all` de main.py. Cada cambio de esquema es
+un módulo `mNNNN_descripcion.py` de este paquete con una función
+`aplicar(conexion)`; se ejecutan en orden y las ya aplicadas quedan
+registradas en la tabla `version_esquema`.
+
+Uso (desde la carpeta backend):
+    python -m migraciones            # aplica las pendientes
+    python -m migraciones estado     # lista aplicadas y pendientes
+    python -m migraciones explicar   # EXPLAIN de las consultas críticas (ver planes.py)
+
+Notas:
+- En MySQL el DDL hace commit implícito: cada migración debe poder repetirse
+  sin error si se interrumpe a mitad (usar `crear_indices`, checkfirst, etc.).
+- Se toma un lock con nombre (GET_LOCK) para que varios procesos que arrancan
+  a la vez no apliquen la misma migración dos veces. Si no se obtiene en
+  `ESPERA_LOCK_SEGUNDOS`, se aborta con error en lugar de migrar sin lock.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+
+NOMBRE_LOCK = "pawpals_migraciones"
+ESPERA_LOCK_SEGUNDOS = 300
+
+version_esquema = Table(
+    "version_esquema",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("nombre", String(100), nullable=False),
+    Column("aplicada_en", DateTime, nullable=False),
+)
+
+
+def migraciones_disponibles() -> list[tuple[int, str]]:
+    """(version, nombre_modulo) de cada migración del paquete, en orden."""
+    disponibles = []
+    for modulo in pkgutil.iter_modules(__path__):
+        coincidencia = re.fullmatch(r"m(\d{4})_\w+", modulo.name)
+        if coincidencia:
+            disponibles.append((int(coincidencia.group(1)), modulo.name))
+    return sorted(disponibles)
+
+
+def versiones_aplicadas(conexion) -> set[int]:
+    if not inspect(conexion).has_table(version_esquema.name):
+        return set()
+    return set(conexion.scalars(select(version_esquema.c.version)))
+
+
+def crear_indices(conexion, modelo, *nombres: str):
+    """Crea los índices `nombres` declarados en el modelo que aún no existan."""
+    tabla = modelo.__table__
+    existentes = {i["name"] for i in inspect(conexion).get_indexes(tabla.name)}
+    for indice in tabla.indexes:
+        if indice.name in nombres and indice.name not in existentes:
+            indice.create(conexion)
+
+
+def eliminar_indices(conexion, nombre_tabla: str, *nombres: str):
+    """Elimina los índices `nombres` de la tabla que todavía existan."""
+    tabla = Table(nombre_tabla, MetaData(), autoload_with=conexion)
+    for indice in tabla.indexes:
+        if indice.name in nombres:
+            indice.drop(conexion)
+
+
+def aplicar_migraciones(engine) -> list[str]:
+    """Aplica las migraciones pendientes y devuelve los nombres de las aplicadas."""
+    aplicadas = []
+    with engine.connect() as conexion:
+        es_mysql = conexion.dialect.name == "mysql"
+        if es_mysql:
+            obtenido = conexion.scalar(
+                text("SELECT GET_LOCK(:nombre, :espera)"),
+                {"nombre": NOMBRE_LOCK, "espera": ESPERA_LOCK_SEGUNDOS},
+            )
+            # 0: venció la espera (otro proceso sigue migrando); NULL: error.
+            # En ambos casos no se puede migrar sin arriesgar una ejecución doble.
+            if obtenido != 1:
+                raise RuntimeError(
+                    f"No se obtuvo el lock {NOMBRE_LOCK!r} en {ESPERA_LOCK_SEGUNDOS} s; "
+                    "otro proceso está aplicando migraciones."
+                )
+        try:
+            version_esquema.create(conexion, checkfirst=True)
+            conexion.commit()
+            ya_aplicadas = versiones_aplicadas(conexion)
+            for version, nombre in migraciones_disponibles():
+                if version in ya_aplicadas:
+                    continue
+                importlib.import_module(f"{__name__}.{nombre}").aplicar(conexion)
+                conexion.execute(
+                    insert(version_esquema).values(version=version, nombre=nombre, aplicada_en=datetime.now())
+                )
+                conexion.commit()
+                aplicadas.append(nombre)
+        finally:
+            if es_mysql:
+                conexion.execute(text("SELECT RELEASE_LOCK(:nombre)"), {"nombre": NOMBRE_LOCK})
+    return aplicadas
@@ -0,0 +1,42 @@
+#migraciones/__main__.py
+import argparse
+import sys
+
+from utils.db import engine
+from migraciones import aplicar_migraciones, migraciones_disponibles, versiones_aplicadas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m migraciones", description="Migraciones del esquema de la base de datos.")
+    parser.add_argument("comando", nargs="?", default="aplicar", choices=["aplicar", "estado", "explicar"])
+    args = parser.parse_args()
+
+    if args.comando == "aplicar":
+        try:
+            aplicadas = aplicar_migraciones(engine)
+        except RuntimeError as error:
+            print(error, file=sys.stderr)
+            return 1
+        print(f"Migraciones aplicadas: {', '.join(aplicadas)}" if aplicadas else "El esquema está al día.")
+        return 0
+
+    with engine.connect() as conexion:
+        if args.comando == "estado":
+            aplicadas = versiones_aplicadas(conexion)
+            for version, nombre in migraciones_disponibles():
+                print(f"[{'x' if version in aplicadas else ' '}] {nombre}")
+            return 0
+
+        from migraciones.planes import CONSULTAS_CRITICAS, verificar_planes
+        regresiones = verificar_planes(conexion)
+        for nombre in CONSULTAS_CRITICAS:
+            print(f"{'FULL SCAN' if nombre in regresiones else 'ok':>9}  {nombre}")
+        for nombre, plan in regresiones.items():
+            print(f"\n{nombre}:")
+            for fila in plan:
+                print(f"  tabla={fila.get('table')} type={fila.get('type')} key={fila.get('key')} rows={fila.get('rows')}")
+        return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Esquema inicial: crea las tablas de models.py que aún no existan."""
+from models import Base
+
+
+def aplicar(conexion):
+    Base.metadata.create_all(conexion)
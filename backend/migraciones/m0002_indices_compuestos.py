@@ -0,0 +1,19 @@
+"""
+Índices compuestos para los filtros más usados:
+- pedido(fecha, id): listado del administrador paginado por keyset.
+- pedido(cliente_id, estado): pedidos de un cliente por estado.
+- pedido(estado, fecha): colas por estado (administrador, nutricionista).
+- control_entrega(repartidor_id, confirmacion_entrega, pedido_id): cola del
+  repartidor; incluye pedido_id para resolver el filtro solo con el índice.
+- notificacion(cliente_id, fecha): bandeja de notificaciones.
+- plato_combinado(estado_registro, publicado, categoria_id): catálogo publicado.
+"""
+from migraciones import crear_indices
+from models import ControlEntrega, Notificacion, Pedido, PlatoCombinado
+
+
+def aplicar(conexion):
+    crear_indices(conexion, Pedido, "fecha_id", "cliente_estado", "estado_fecha")
+    crear_indices(conexion, ControlEntrega, "repartidor_confirmacion")
+    crear_indices(conexion, Notificacion, "cliente_fecha")
+    crear_indices(conexion, PlatoCombinado, "estado_publicado_categoria")
@@ -0,0 +1,15 @@
+"""
+Índice para la cola de trabajo del nutricionista (GET /nutricionista/pedidos/cola):
+- pedido_especializado(estado_registro, consulta_nutricionista, pedido_id):
+  solicitudes activas, filtradas por si piden consulta; incluye pedido_id para
+  llegar al pedido (estado, fecha) sin leer la fila de la solicitud.
+
+Eliminado en m0008: la cola ya no lo usa. En bases nuevas esta migración no
+crea nada, porque el índice ya no está declarado en models.py.
+"""
+from migraciones import crear_indices
+from models import PedidoEspecializado
+
+
+def aplicar(conexion):
+    crear_indices(conexion, PedidoEspecializado, "estado_consulta")
@@ -0,0 +1,11 @@
+"""
+Índice para la lista de pacientes del nutricionista (GET /nutricionista/pacientes):
+- consulta(registro_mascota_id, fecha): el COUNT y MAX(fecha) por mascota se
+  resuelven recorriendo solo el índice, sin leer las filas de consulta.
+"""
+from migraciones import crear_indices
+from models import Consulta
+
+
+def aplicar(conexion):
+    crear_indices(conexion, Consulta, "mascota_fecha")
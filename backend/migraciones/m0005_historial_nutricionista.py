@@ -0,0 +1,11 @@
+"""
+Índice para el historial de consultas (GET /nutricionista/historial):
+- consulta(nutricionista_id, fecha): consultas de un nutricionista en un rango
+  de fechas, ya ordenadas por fecha para la paginación por keyset.
+"""
+from migraciones import crear_indices
+from models import Consulta
+
+
+def aplicar(conexion):
+    crear_indices(conexion, Consulta, "nutricionista_fecha")
@@ -0,0 +1,11 @@
+"""
+Índice para la bandeja de notificaciones:
+- notificacion(cliente_id, leido, fecha): contador de no leídas por cliente
+  (badge), listado de solo no leídas ordenado por fecha y marcado masivo.
+"""
+from migraciones import crear_indices
+from models import Notificacion
+
+
+def aplicar(conexion):
+    crear_indices(conexion, Notificacion, "cliente_leido_fecha")
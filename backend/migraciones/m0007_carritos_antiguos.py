@@ -0,0 +1,19 @@
+"""
+Borra los carritos del modelo anterior: filas `pedido` en estado "carrito" y
+sus `detalle_pedido`. Desde que el carrito vive en utils.carrito_store nadie
+las lee ni las convierte en pedido.
+
+No se copian al almacén de carritos: la migración corre en otro proceso (con
+`CARRITO_STORE=memoria` se perderían igual) y sus precios son los de cuando se
+agregaron. Los detalles se borran primero para no depender del ON DELETE
+CASCADE (SQLite no lo aplica sin `PRAGMA foreign_keys`).
+"""
+from sqlalchemy import delete, select
+
+from models import DetallePedido, Pedido
+
+
+def aplicar(conexion):
+    carritos = select(Pedido.id).where(Pedido.estado == "carrito")
+    conexion.execute(delete(DetallePedido).where(DetallePedido.pedido_id.in_(carritos)))
+    conexion.execute(delete(Pedido).where(Pedido.estado == "carrito"))
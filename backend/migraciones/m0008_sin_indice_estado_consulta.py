@@ -0,0 +1,14 @@
+"""
+Elimina pedido_especializado.estado_consulta (m0003).
+
+La cola del nutricionista se resuelve con una consulta por nivel de prioridad
+que recorre pedido(estado, fecha) en orden y llega a cada solicitud por el
+índice único pedido_especializado(pedido_id). Ninguna consulta usa ya
+(estado_registro, consulta_nutricionista, pedido_id): recorrerlo obligaría a
+ordenar por fecha en memoria. Solo encarecía las escrituras.
+"""
+from migraciones import eliminar_indices
+
+
+def aplicar(conexion):
+    eliminar_indices(conexion, "pedido_especializado", "estado_consulta")
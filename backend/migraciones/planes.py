@@ -0,0 +1,125 @@
+#migraciones/planes.py
+"""
+Verificación de planes de ejecución de las consultas críticas.
+
+`verificar_planes` ejecuta EXPLAIN sobre cada consulta de `CONSULTAS_CRITICAS`
+y reporta las que recorren una tabla completa (type = ALL en MySQL). Se corre
+con `python -m migraciones explicar`, que termina con código 1 si alguna
+consulta regresó a un full scan (apto para CI).
+
+Debe ejecutarse contra una base con datos representativos: con tablas casi
+vacías el optimizador puede preferir el recorrido completo aunque exista el
+índice.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, select, text
+
+from models import Consulta, ControlEntrega, Notificacion, Pedido, PedidoEspecializado, PlatoCombinado
+
+# Nombre → consulta, con valores de ejemplo (solo importa la forma del filtro).
+CONSULTAS_CRITICAS = {
+    "pedidos de un cliente por estado": (
+        select(Pedido.id).where(Pedido.cliente_id == 1, Pedido.estado == "pendiente")
+    ),
+    "cola de pedidos por estado": (
+        select(Pedido.id, Pedido.fecha)
+        .where(Pedido.estado == "pendiente")
+        .order_by(Pedido.fecha.desc())
+        .limit(50)
+    ),
+    "listado admin (keyset fecha, id)": (
+        select(Pedido.id, Pedido.fecha)
+        .where(Pedido.fecha < datetime(2100, 1, 1))
+        .order_by(Pedido.fecha.desc(), Pedido.id.desc())
+        .limit(100)
+    ),
+    "cola del repartidor": (
+        select(ControlEntrega.pedido_id).where(
+            ControlEntrega.repartidor_id == 1, ControlEntrega.confirmacion_entrega == 0
+        )
+    ),
+    "notificaciones de un cliente": (
+        select(Notificacion.id)
+        .where(Notificacion.cliente_id == 1)
+        .order_by(Notificacion.fecha.desc())
+        .limit(20)
+    ),
+    # Un nivel de prioridad de la cola: recorre pedido(estado, fecha) en orden.
+    "cola del nutricionista (un nivel de prioridad)": (
+        select(PedidoEspecializado.id)
+        .join(Pedido, Pedido.id == PedidoEspecializado.pedido_id)
+        .where(
+            PedidoEspecializado.estado_registro == "A",
+            PedidoEspecializado.consulta_nutricionista == 1,
+            Pedido.estado == "pendiente",
+            Pedido.fecha <= datetime(2100, 1, 1),
+        )
+        .order_by(Pedido.fecha.asc(), Pedido.id.asc())
+        .limit(50)
+    ),
+    "historial de pacientes (consultas por mascota)": (
+        select(Consulta.registro_mascota_id, func.count(), func.max(Consulta.fecha))
+        .group_by(Consulta.registro_mascota_id)
+    ),
+    "historial de consultas de un nutricionista": (
+        select(Consulta.id, Consulta.fecha)
+        .where(Consulta.nutricionista_id == 1, Consulta.fecha >= datetime(2000, 1, 1))
+        .order_by(Consulta.fecha.desc(), Consulta.id.desc())
+        .limit(50)
+    ),
+    "notificaciones sin leer de un cliente": (
+        select(func.count()).select_from(Notificacion).where(Notificacion.cliente_id == 1, Notificacion.leido == 0)
+    ),
+    "catálogo publicado por categoría": (
+        select(PlatoCombinado.id).where(
+            PlatoCombinado.estado_registro == "A",
+            PlatoCombinado.publicado == 1,
+            PlatoCombinado.categoria_id == 1,
+        )
+    ),
+}
+
+# Índice que debe elegir MySQL para cada consulta crítica (tests/test_planes.py).
+INDICES_ESPERADOS = {
+    "pedidos de un cliente por estado": "cliente_estado",
+    "cola de pedidos por estado": "estado_fecha",
+    "listado admin (keyset fecha, id)": "fecha_id",
+    "cola del repartidor": "repartidor_confirmacion",
+    "notificaciones de un cliente": "cliente_fecha",
+    "cola del nutricionista (un nivel de prioridad)": "estado_fecha",
+    "historial de pacientes (consultas por mascota)": "mascota_fecha",
+    "historial de consultas de un nutricionista": "nutricionista_fecha",
+    "notificaciones sin leer de un cliente": "cliente_leido_fecha",
+    "catálogo publicado por categoría": "estado_publicado_categoria",
+}
+
+# Consultas paginadas cuyo ORDER BY debe salir del índice (sin "Using filesort").
+ORDEN_POR_INDICE = {
+    "cola de pedidos por estado",
+    "listado admin (keyset fecha, id)",
+    "notificaciones de un cliente",
+    "cola del nutricionista (un nivel de prioridad)",
+    "historial de consultas de un nutricionista",
+}
+
+
+def explicar(conexion, consulta) -> list[dict]:
+    sql = consulta.compile(dialect=conexion.dialect, compile_kwargs={"literal_binds": True})
+    return [dict(fila) for fila in conexion.execute(text(f"EXPLAIN {sql}")).mappings()]
+
+
+def verificar_planes(conexion) -> dict[str, list[dict]]:
+    """
+    Devuelve {nombre: filas_del_plan} de las consultas críticas que hacen un
+    recorrido completo de alguna tabla. Un diccionario vacío significa que todo
+    está cubierto por índices.
+    """
+    if conexion.dialect.name != "mysql":
+        raise RuntimeError("La verificación de planes solo está implementada para MySQL.")
+    regresiones = {}
+    for nombre, consulta in CONSULTAS_CRITICAS.items():
+        plan = explicar(conexion, consulta)
+        if any(fila.get("type") == "ALL" for fila in plan):
+            regresiones[nombre] = plan
+    return regresiones
@@ -75,7 +75,9 @@ class Notificacion(Base):
     __tablename__ = 'notificacion'
     __table_args__ = (
         ForeignKeyConstraint(['cliente_id'], ['cliente.id'], ondelete='CASCADE'),
-        Index('cliente_id', 'cliente_id')
+        Index('cliente_id', 'cliente_id'),
+        Index('cliente_fecha', 'cliente_id', 'fecha'),
+        Index('cliente_leido_fecha', 'cliente_id', 'leido', 'fecha')
     )
 
     id: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True)
@@ -181,7 +183,8 @@ class PlatoCombinado(Base):
         ForeignKeyConstraint(['categoria_id'], ['categoria.id'], ondelete='SET NULL', name='plato_combinado_ibfk_1'),
         ForeignKeyConstraint(['especie_id'], ['especie.id'], ondelete='SET NULL', name='plato_combinado_ibfk_2'),
         Index('categoria_id', 'categoria_id'),
-        Index('especie_id', 'especie_id')
+        Index('especie_id', 'especie_id'),
+        Index('estado_publicado_categoria', 'estado_registro', 'publicado', 'categoria_id')
     )
 
     id: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True)
@@ -354,7 +357,9 @@ class Consulta(Base):
         ForeignKeyConstraint(['nutricionista_id'], ['nutricionista.id'], name='consulta_ibfk_2'),
         ForeignKeyConstraint(['registro_mascota_id'], ['registro_mascota.id'], ondelete='CASCADE', name='consulta_ibfk_1'),
         Index('nutricionista_id', 'nutricionista_id'),
-        Index('registro_mascota_id', 'registro_mascota_id')
+        Index('registro_mascota_id', 'registro_mascota_id'),
+        Index('mascota_fecha', 'registro_mascota_id', 'fecha'),
+        Index('nutricionista_fecha', 'nutricionista_id', 'fecha')
     )
 
     id: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True)
@@ -392,7 +397,10 @@ class Pedido(Base):
         ForeignKeyConstraint(['cliente_id'], ['cliente.id'], ondelete='CASCADE', name='pedido_ibfk_1'),
         ForeignKeyConstraint(['direccion_id'], ['direccion.id'], name='pedido_ibfk_2'),
         Index('cliente_id', 'cliente_id'),
-        Index('direccion_id', 'direccion_id')
+        Index('direccion_id', 'direccion_id'),
+        Index('fecha_id', 'fecha', 'id'),
+        Index('cliente_estado', 'cliente_id', 'estado'),
+        Index('estado_fecha', 'estado', 'fecha')
     )
 
     id: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True)
@@ -450,7 +458,8 @@ class ControlEntrega(Base):
         ForeignKeyConstraint(['pedido_id'], ['pedido.id'], ondelete='CASCADE', name='control_entrega_ibfk_1'),
         ForeignKeyConstraint(['repartidor_id'], ['repartidor.id'], name='control_entrega_ibfk_2'),
         Index('pedido_id', 'pedido_id', unique=True),
-        Index('repartidor_id', 'repartidor_id')
+        Index('repartidor_id', 'repartidor_id'),
+        Index('repartidor_confirmacion', 'repartidor_id', 'confirmacion_entrega', 'pedido_id')
     )
 
     id: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True)
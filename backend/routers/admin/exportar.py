@@ -0,0 +1,188 @@
+"""
+RUTAS DEL ADMINISTRADOR – EXPORTACIÓN DE PEDIDOS
+--------------------------------------------------
+Exporta los pedidos de un rango de fechas para el área de finanzas, una fila
+por línea de pedido, con los datos del pago y de la pasarela.
+Incluye:
+- CSV (`formato=csv`, por defecto).
+- Parquet (`formato=parquet`), columnar; requiere `pyarrow` instalado.
+Notas:
+- La respuesta se genera por lotes: la consulta usa un cursor del lado del
+  servidor (`yield_per`) y cada lote se escribe y se envía antes de leer el
+  siguiente, así que la memoria no depende del tamaño del rango.
+- Los carritos (estado "carrito") no se exportan.
+- IDs en formato `str` (por BIGINT).
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from utils.db import SessionLocal
+from models import DetallePedido, Pago, PasarelaPago, Pedido
+
+router = APIRouter(prefix="/admin/exportar", tags=["Exportación (Administrador)"])
+
+LOTE_EXPORTACION = 5000
+
+COLUMNAS = [
+    "pedido_id", "fecha", "cliente_id", "estado", "total",
+    "detalle_id", "plato_id", "cantidad", "subtotal",
+    "pago_id", "pago_monto", "pago_fecha", "pago_estado", "pago_referencia",
+    "pasarela_id", "pasarela",
+]
+
+
+def consulta_exportacion(desde: datetime, hasta: datetime):
+    return (
+        select(
+            Pedido.id.label("pedido_id"),
+            Pedido.fecha,
+            Pedido.cliente_id,
+            Pedido.estado,
+            Pedido.total,
+            DetallePedido.id.label("detalle_id"),
+            DetallePedido.plato_combinado_id.label("plato_id"),
+            DetallePedido.cantidad,
+            DetallePedido.subtotal,
+            Pago.id.label("pago_id"),
+            Pago.monto.label("pago_monto"),
+            Pago.fecha.label("pago_fecha"),
+            Pago.estado.label("pago_estado"),
+            Pago.referencia_pago.label("pago_referencia"),
+            PasarelaPago.id.label("pasarela_id"),
+            PasarelaPago.nombre.label("pasarela"),
+        )
+        .outerjoin(DetallePedido, DetallePedido.pedido_id == Pedido.id)
+        .outerjoin(Pago, Pago.pedido_id == Pedido.id)
+        .outerjoin(PasarelaPago, PasarelaPago.id == Pago.pasarela_pago_id)
+        .where(Pedido.fecha >= desde, Pedido.fecha < hasta, Pedido.estado != "carrito")
+        .order_by(Pedido.fecha, Pedido.id, DetallePedido.id)
+        .execution_options(yield_per=LOTE_EXPORTACION)
+    )
+
+
+def lotes_exportacion(desde: datetime, hasta: datetime):
+    """Genera listas de filas; abre su propia sesión porque corre tras retornar la ruta."""
+    db = SessionLocal()
+    try:
+        for lote in db.execute(consulta_exportacion(desde, hasta)).partitions():
+            yield lote
+    finally:
+        db.close()
+
+
+def _id(valor):
+    return str(valor) if valor is not None else None
+
+
+def _monto(valor):
+    return float(valor) if valor is not None else None
+
+
+def fila_a_valores(f) -> list:
+    return [
+        _id(f.pedido_id), f.fecha, _id(f.cliente_id), f.estado, _monto(f.total),
+        _id(f.detalle_id), _id(f.plato_id), f.cantidad, _monto(f.subtotal),
+        _id(f.pago_id), _monto(f.pago_monto), f.pago_fecha, f.pago_estado, f.pago_referencia,
+        _id(f.pasarela_id), f.pasarela,
+    ]
+
+
+def generar_csv(desde: datetime, hasta: datetime):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUMNAS)
+    for lote in lotes_exportacion(desde, hasta):
+        escritor.writerows(
+            [v.isoformat() if isinstance(v, datetime) else v for v in fila_a_valores(f)] for f in lote
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _SalidaIncremental(io.RawIOBase):
+    """Archivo de solo escritura que acumula bytes hasta que se retiran con `retirar()`."""
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def retirar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def generar_parquet(desde: datetime, hasta: datetime):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([
+        ("pedido_id", pa.string()), ("fecha", pa.timestamp("s")), ("cliente_id", pa.string()),
+        ("estado", pa.string()), ("total", pa.float64()),
+        ("detalle_id", pa.string()), ("plato_id", pa.string()), ("cantidad", pa.int32()),
+        ("subtotal", pa.float64()),
+        ("pago_id", pa.string()), ("pago_monto", pa.float64()), ("pago_fecha", pa.timestamp("s")),
+        ("pago_estado", pa.string()), ("pago_referencia", pa.string()),
+        ("pasarela_id", pa.string()), ("pasarela", pa.string()),
+    ])
+    salida = _SalidaIncremental()
+    # Cada lote se escribe como un row group y se envía en cuanto está listo.
+    with pq.ParquetWriter(salida, esquema, compression="snappy") as escritor:
+        for lote in lotes_exportacion(desde, hasta):
+            columnas = list(zip(*(fila_a_valores(f) for f in lote)))
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)],
+                schema=esquema,
+            ))
+            yield salida.retirar()
+    yield salida.retirar()
+
+
+# ---------------------------------------------------------------------------
+# GET /admin/exportar/pedidos
+# ---------------------------------------------------------------------------
+# Exporta pedidos + detalle + pago + pasarela entre dos fechas (ambas incluidas).
+@router.get("/pedidos")
+def exportar_pedidos(
+    fecha_inicio: str = Query(..., description="Fecha inicial en formato YYYY-MM-DD"),
+    fecha_fin: str = Query(..., description="Fecha final (incluida) en formato YYYY-MM-DD"),
+    formato: str = Query("csv", pattern="^(csv|parquet)$", description="csv o parquet"),
+):
+    try:
+        desde = datetime.strptime(fecha_inicio, "%Y-%m-%d")
+        hasta = datetime.strptime(fecha_fin, "%Y-%m-%d") + timedelta(days=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato de fecha inválido (usar YYYY-MM-DD)")
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="fecha_fin debe ser igual o posterior a fecha_inicio")
+
+    nombre = f"pedidos_{fecha_inicio}_{fecha_fin}.{formato}"
+    cabeceras = {"Content-Disposition": f'attachment; filename="{nombre}"'}
+
+    if formato == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Exportación Parquet no disponible: falta instalar pyarrow.")
+        return StreamingResponse(
+            generar_parquet(desde, hasta), media_type="application/vnd.apache.parquet", headers=cabeceras
+        )
+    return StreamingResponse(generar_csv(desde, hasta), media_type="text/csv; charset=utf-8", headers=cabeceras)
@@ -25,61 +25,127 @@ Notas:
 - El control de entrega se actualiza en la tabla `control_entrega`.
 """
 
+import json
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from utils.db import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+from utils.db import get_db, SessionLocal
 from utils import keygen
+from utils.paginacion import codificar_cursor, decodificar_cursor
+from utils.metricas import RespuestaJSONMedida
+from utils.detalle_pedido import DetallePedidoAdmin, construir_detalle
 from sqlalchemy.orm import joinedload, Session
-from models import Pedido, ControlEntrega, Repartidor
+from models import Cliente, DetallePedido, Pago, Pedido, PedidoEspecializado, ControlEntrega, Repartidor
 router = APIRouter(prefix="/admin/pedidos", tags=["Pedidos (Administrador)"])
 
 # ---------------------------------------------------------------------------
 # GET /admin/pedidos
 # ---------------------------------------------------------------------------
-# Lista todos los pedidos registrados en el sistema.
+# Lista los pedidos registrados en el sistema, del más reciente al más antiguo.
 # Permite aplicar filtros opcionales:
 #   - estado: filtra por estado logístico del pedido.
 #   - cliente_id: filtra los pedidos de un cliente específico.
 #   - fecha_inicio / fecha_fin: acota el rango temporal de consulta.
-# Retorna una lista de pedidos con id, cliente, fecha, total y estado.
-@router.get("/")
-def listar_pedidos_admin(
-    estado: str | None = Query(None, description="Filtrar por estado del pedido"),
-    cliente_id: str | None = Query(None, description="Filtrar por ID de cliente"),
-    fecha_inicio: str | None = Query(None, description="Fecha inicial en formato YYYY-MM-DD"),
-    fecha_fin: str | None = Query(None, description="Fecha final en formato YYYY-MM-DD"),
-    db: Session = Depends(get_db),
-):
-    query = db.query(Pedido).options(joinedload(Pedido.cliente))
+# Paginación por keyset sobre (fecha, id), apoyada en el índice `fecha_id`:
+#   - formato=json (por defecto): devuelve una página de `limite` pedidos y el
+#     `siguiente_cursor` para pedir la siguiente (null si no hay más).
+#   - formato=ndjson: transmite un pedido por línea, desde `cursor` hasta el
+#     final (o hasta `limite`), leyendo la base de datos por lotes.
+# Retorna id, cliente, fecha, total y estado de cada pedido.
+PAGINA_PEDIDOS_ADMIN = 100
+LOTE_STREAMING = 1000
+
+
+def consulta_pedidos_admin(estado, cliente_id, fecha_inicio, fecha_fin, cursor):
+    """Construye la consulta (solo columnas necesarias) con filtros y keyset."""
+    consulta = (
+        select(Pedido.id, Pedido.fecha, Pedido.total, Pedido.estado, Cliente.nombre.label("cliente"))
+        .outerjoin(Cliente, Cliente.id == Pedido.cliente_id)
+        .order_by(Pedido.fecha.desc(), Pedido.id.desc())
+    )
     if estado:
-        query = query.filter(Pedido.estado == estado)
+        consulta = consulta.where(Pedido.estado == estado)
     if cliente_id:
-        query = query.filter(Pedido.cliente_id == cliente_id)
+        consulta = consulta.where(Pedido.cliente_id == cliente_id)
     if fecha_inicio:
         try:
             fecha_inicio_dt = datetime.strptime(fecha_inicio, "%Y-%m-%d")
-            query = query.filter(Pedido.fecha >= fecha_inicio_dt)
+            consulta = consulta.where(Pedido.fecha >= fecha_inicio_dt)
         except ValueError:
             raise HTTPException(status_code=400, detail="Formato inválido en fecha_inicio (usar YYYY-MM-DD)")
     if fecha_fin:
         try:
             fecha_fin_dt = datetime.strptime(fecha_fin, "%Y-%m-%d")
-            query = query.filter(Pedido.fecha <= fecha_fin_dt)
+            consulta = consulta.where(Pedido.fecha <= fecha_fin_dt)
         except ValueError:
             raise HTTPException(status_code=400, detail="Formato inválido en fecha_fin (usar YYYY-MM-DD)")
-    pedidos = query.order_by(Pedido.fecha.desc()).all()
-    if not pedidos:
+    if cursor:
+        fecha, pedido_id = decodificar_cursor(cursor, datetime.fromisoformat, int)
+        # Forma expandida de (fecha, id) < (:fecha, :id), que MySQL resuelve como rango sobre el índice.
+        consulta = consulta.where(
+            or_(Pedido.fecha < fecha, and_(Pedido.fecha == fecha, Pedido.id < pedido_id))
+        )
+    return consulta
+
+
+def pedido_admin_a_dict(fila) -> dict:
+    return {
+        "id": str(fila.id),
+        "cliente": fila.cliente,
+        "fecha": fila.fecha.isoformat(),
+        "total": float(fila.total),
+        "estado": fila.estado,
+    }
+
+
+def transmitir_pedidos_ndjson(consulta):
+    """
+    Generador de líneas NDJSON. Abre su propia sesión porque se ejecuta después
+    de que la ruta retornó; `yield_per` mantiene acotada la memoria usando un
+    cursor del lado del servidor.
+    """
+    db = SessionLocal()
+    try:
+        filas = db.execute(consulta.execution_options(yield_per=LOTE_STREAMING))
+        for lote in filas.partitions():
+            yield "".join(json.dumps(pedido_admin_a_dict(f), ensure_ascii=False) + "\n" for f in lote)
+    finally:
+        db.close()
+
+
+@router.get("/")
+def listar_pedidos_admin(
+    estado: str | None = Query(None, description="Filtrar por estado del pedido"),
+    cliente_id: str | None = Query(None, description="Filtrar por ID de cliente"),
+    fecha_inicio: str | None = Query(None, description="Fecha inicial en formato YYYY-MM-DD"),
+    fecha_fin: str | None = Query(None, description="Fecha final en formato YYYY-MM-DD"),
+    limite: int | None = Query(None, ge=1, le=1000, description=f"Pedidos por página (json: {PAGINA_PEDIDOS_ADMIN} por defecto)"),
+    cursor: str | None = Query(None, description="Cursor devuelto como siguiente_cursor"),
+    formato: str = Query("json", pattern="^(json|ndjson)$", description="json (paginado) o ndjson (streaming)"),
+    db: Session = Depends(get_db),
+):
+    consulta = consulta_pedidos_admin(estado, cliente_id, fecha_inicio, fecha_fin, cursor)
+
+    if formato == "ndjson":
+        if limite:
+            consulta = consulta.limit(limite)
+        return StreamingResponse(transmitir_pedidos_ndjson(consulta), media_type="application/x-ndjson")
+
+    limite = limite or PAGINA_PEDIDOS_ADMIN
+    # Se pide una fila extra para saber si existe una página siguiente.
+    filas = db.execute(consulta.limit(limite + 1)).all()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    if not filas and not cursor:
         return {"mensaje": "No se encontraron pedidos con los filtros aplicados."}
-    resultado = [
-        {
-            "id": str(p.id),
-            "cliente": p.cliente.nombre if p.cliente else None,
-            "fecha": p.fecha.isoformat(),
-            "total": float(p.total),
-            "estado": p.estado,
-        }
-        for p in pedidos
-    ]
-    return {"total": len(resultado), "pedidos": resultado}
+    resultado = [pedido_admin_a_dict(f) for f in filas]
+    return {
+        "total": len(resultado),
+        "pedidos": resultado,
+        "siguiente_cursor": codificar_cursor(filas[-1].fecha, filas[-1].id) if hay_mas else None,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -93,7 +159,7 @@ def listar_pedidos_admin(
 # - Total y estado del pedido
 # - Información del pago (monto, fecha, estado, pasarela)
 # Si el pedido no existe, retorna error 404.
-@router.get("/{pedido_id}")
+@router.get("/{pedido_id}", response_model=DetallePedidoAdmin)
 def obtener_detalle_pedido_admin(pedido_id: str, db: Session = Depends(get_db)):
     pedido = (
         db.query(Pedido)
@@ -101,62 +167,15 @@ def obtener_detalle_pedido_admin(pedido_id: str, db: Session = Depends(get_db)):
             joinedload(Pedido.cliente),
             joinedload(Pedido.direccion),
             joinedload(Pedido.detalle_pedido).joinedload(DetallePedido.plato_combinado),
-            joinedload(Pedido.pago),
+            joinedload(Pedido.pago).joinedload(Pago.pasarela_pago),
         )
         .filter(Pedido.id == pedido_id)
         .first()
     )
     if not pedido:
         raise HTTPException(status_code=404, detail="Pedido no encontrado.")
-    cliente_info = None
-    if pedido.cliente:
-        cliente_info = {
-            "id": str(pedido.cliente.id),
-            "nombre": pedido.cliente.nombre,
-            "telefono": pedido.cliente.telefono,
-        }
-    direccion_info = None
-    if pedido.direccion:
-        direccion_info = {
-            "id": str(pedido.direccion.id),
-            "nombre": pedido.direccion.nombre,
-            "referencia": pedido.direccion.referencia,
-            "latitud": float(pedido.direccion.latitud),
-            "longitud": float(pedido.direccion.longitud),
-        }
-    platos_info = []
-    for det in pedido.detalle_pedido:
-        platos_info.append({
-            "id": str(det.id),
-            "plato": det.plato_combinado.nombre if det.plato_combinado else None,
-            "cantidad": det.cantidad,
-            "subtotal": float(det.subtotal),
-        })
-    pago_info = None
-    if pedido.pago and len(pedido.pago) > 0:
-        p = pedido.pago[0]
-        pago_info = {
-            "id": str(p.id),
-            "monto": float(p.monto),
-            "fecha": p.fecha.isoformat(),
-            "estado": p.estado,
-            "referencia_pago": p.referencia_pago,
-            "pasarela": p.pasarela_pago.nombre if p.pasarela_pago else None,
-        }
-    respuesta = {
-        "pedido": {
-            "id": str(pedido.id),
-            "fecha": pedido.fecha.isoformat(),
-            "total": float(pedido.total),
-            "incluye_plato": bool(pedido.incluye_plato),
-            "estado": pedido.estado,
-        },
-        "cliente": cliente_info,
-        "direccion": direccion_info,
-        "platos": platos_info,
-        "pago": pago_info,
-    }
-    return respuesta
+    pago = pedido.pago[0] if pedido.pago else None
+    return RespuestaJSONMedida(construir_detalle(DetallePedidoAdmin, pedido, pago=pago))
 
 # ---------------------------------------------------------------------------
 # PUT /admin/pedidos/{pedido_id}/estado
@@ -2,6 +2,8 @@
 RUTAS DE AUTENTICACIÓN Y GESTIÓN DE SESIONES
 """
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from utils.db import get_db
@@ -11,6 +13,8 @@ from models import CuentaUsuario, Cliente, UsuarioRol, Rol
 from datetime import datetime
 from models import Nutricionista
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Autenticación"])
 class RegisterNutriRequest(BaseModel):
     nombre: str
@@ -41,25 +45,21 @@ def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
     correo = data.correo
     contrasena = data.contrasena
 
-    print(f"🔥 Recibiendo registro: {nombre}, {correo}")
-
     # Verificar si el correo ya existe
     existe = db.query(CuentaUsuario).filter(
         CuentaUsuario.correo_electronico == correo
     ).first()
     
     if existe:
-        print(f"❌ El correo {correo} ya está registrado")
+        logger.info("registro rechazado: correo ya registrado", extra={"rol_id": 2})
         raise HTTPException(status_code=400, detail="El correo ya está registrado.")
 
     try:
         # Generar ID único
         user_id = keygen.generate_uint64_key()
-        print(f"✅ ID generado: {user_id}")
 
         # Hashear contraseña
         hashed_pass = security.get_password_hash(contrasena)
-        print(f"✅ Contraseña hasheada")
 
         # Crear cuenta de usuario
         nueva_cuenta = CuentaUsuario(
@@ -71,12 +71,11 @@ def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
         )
         db.add(nueva_cuenta)
         db.flush()
-        print(f"✅ Cuenta de usuario creada")
 
         # ✅ BUSCAR ROL DE CLIENTE (id = 2)
         rol_cliente = db.query(Rol).filter(Rol.id == 2).first()
         if not rol_cliente:
-            print(f"❌ ERROR: No existe el rol con id=2 (cliente)")
+            logger.error("no existe el rol con id=2 (cliente)")
             raise HTTPException(status_code=500, detail="Rol de cliente no configurado en el sistema.")
 
         # Asignar rol de cliente (id = 2)
@@ -87,7 +86,6 @@ def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
             estado_registro="A",
         )
         db.add(usuario_rol)
-        print(f"✅ Rol asignado")
 
         # Crear perfil de cliente
         nuevo_cliente = Cliente(
@@ -97,11 +95,10 @@ def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
             estado_registro="A",
         )
         db.add(nuevo_cliente)
-        print(f"✅ Perfil de cliente creado")
 
         # Guardar todo
         db.commit()
-        print(f"✅ Registro completado exitosamente")
+        logger.info("cliente registrado", extra={"cuenta_id": user_id, "cliente_id": nuevo_cliente.id})
 
         # Generar token
         token = token_manager.generar_token(user_id, 2)
@@ -120,9 +117,7 @@ def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
 
     except Exception as e:
         db.rollback()
-        print(f"❌ ERROR EN REGISTRO: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("error en el registro de cliente")
         raise HTTPException(
             status_code=500, 
             detail=f"Error al crear la cuenta: {str(e)}"
@@ -185,8 +180,6 @@ def register_nutricionista(data: RegisterNutriRequest, db: Session = Depends(get
     """
     Registra un nuevo NUTRICIONISTA (Rol 3) desde la web.
     """
-    print(f"Registrando Nutricionista: {data.correo}")
-
     # Verificar si existe
     existe = db.query(CuentaUsuario).filter(CuentaUsuario.correo_electronico == data.correo).first()
     if existe:
@@ -228,6 +221,7 @@ def register_nutricionista(data: RegisterNutriRequest, db: Session = Depends(get
         db.add(nuevo_perfil)
 
         db.commit()
+        logger.info("nutricionista registrado", extra={"cuenta_id": user_id, "nutricionista_id": nuevo_perfil.id})
         
         # Generar token para autologin
         token = token_manager.generar_token(user_id, 3)
@@ -241,9 +235,9 @@ def register_nutricionista(data: RegisterNutriRequest, db: Session = Depends(get
             }
         }
 
-    except Exception as e:
+    except Exception:
         db.rollback()
-        print(f"❌ Error: {e}")
+        logger.exception("error en el registro de nutricionista")
         raise HTTPException(status_code=500, detail="Error al registrar nutricionista.")
 
 # ---------------------------------------------------------------------------
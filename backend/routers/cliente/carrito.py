@@ -1,82 +1,200 @@
-# backend/routers/cliente/carrito.py
+"""
+CARRITO DE COMPRAS
+------------------
+El carrito vive en el almacén de carritos (utils.carrito_store: LRU en memoria
+o Redis) y solo se convierte en `Pedido` al hacer checkout. Agregar, cambiar o
+quitar productos no escribe en MySQL; solo se lee el precio del plato.
+
+El total se mantiene de forma incremental: cada operación ajusta el total con
+la diferencia de la línea modificada, por lo que su costo no depende del tamaño
+del carrito. Los importes se guardan en centavos.
+"""
 from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session, joinedload
-from utils.db import get_db
-from models import Cliente, Pedido, DetallePedido, PlatoCombinado
-from utils import keygen
-from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from utils.db import get_db, get_async_db
+from utils.carrito_store import CarritoOcupado, carrito_store
+from utils.pedidos import registrar_pedido
+from models import Cliente, Direccion, PlatoCombinado
 
 router = APIRouter(prefix="/cliente/carrito", tags=["Carrito de Compras"])
 
-def get_or_create_cart(cliente_id: str, db: Session) -> Pedido:
-    """Busca un pedido en estado 'carrito' para el cliente. Si no existe, lo crea."""
-    cart = db.query(Pedido).filter_by(cliente_id=cliente_id, estado="carrito").first()
-    if not cart:
-        cart = Pedido(
-            id=keygen.generate_uint64_key(),
-            cliente_id=cliente_id,
-            fecha=datetime.utcnow(),
-            total=0.0,
-            estado="carrito",
-            incluye_plato=True
-        )
-        db.add(cart)
-        db.commit()
-        db.refresh(cart)
-    return cart
+def normalizar_plato_id(plato_id: str) -> str:
+    """Clave de la línea en el almacén: el ID sin ceros ni espacios extra."""
+    try:
+        return str(int(plato_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ID de plato inválido")
+
+def get_precio_centavos(plato_id: str, db: Session) -> int:
+    precio = db.query(PlatoCombinado.precio).filter(PlatoCombinado.id == plato_id).scalar()
+    if precio is None:
+        raise HTTPException(status_code=404, detail="Plato no encontrado")
+    # round y no int: int(19.99 * 100) puede dar 1998 si el precio llega como float.
+    return round(precio * 100)
+
+def respuesta_carrito(mensaje: str, total_centavos: int) -> dict:
+    return {"mensaje": mensaje, "total_carrito": total_centavos / 100}
+
+def fijar_linea(cliente_id: str, plato_id: str, cantidad: int, subtotal: int) -> int:
+    try:
+        total = carrito_store.fijar(cliente_id, plato_id, cantidad, subtotal)
+    except CarritoOcupado:
+        raise HTTPException(status_code=409, detail="El carrito se está modificando; intenta de nuevo.")
+    if total is None:
+        raise HTTPException(status_code=404, detail="El producto no está en el carrito")
+    return total
 
+def verificar_cliente(cliente_id: str, db: Session):
+    if not db.query(Cliente.id).filter(Cliente.id == cliente_id).first():
+        raise HTTPException(status_code=404, detail="Cliente no encontrado.")
+
+def quitar_lineas(cliente_id: str, plato_ids: list[str]):
+    """Quita líneas de platos que ya no existen. Si el carrito está ocupado, se deja para la próxima lectura."""
+    for plato_id in plato_ids:
+        try:
+            carrito_store.fijar(cliente_id, plato_id, 0, 0)
+        except CarritoOcupado:
+            return
+
+# ---------------------------------------------------------------------------
+# POST /cliente/carrito/agregar
+# ---------------------------------------------------------------------------
 @router.post("/agregar")
 def agregar_al_carrito(
     cliente_id: str = Body(...),
     plato_id: str = Body(...),
-    cantidad: int = Body(1),
+    cantidad: int = Body(1, ge=1),
     db: Session = Depends(get_db)
 ):
     """Agrega un producto al carrito del cliente o actualiza su cantidad."""
-    cart = get_or_create_cart(cliente_id, db)
-    plato = db.query(PlatoCombinado).filter(PlatoCombinado.id == plato_id).first()
-    if not plato:
-        raise HTTPException(status_code=404, detail="Plato no encontrado")
+    plato_id = normalizar_plato_id(plato_id)
+    verificar_cliente(cliente_id, db)
+    precio = get_precio_centavos(plato_id, db)
+    total = carrito_store.agregar(cliente_id, plato_id, cantidad, precio * cantidad)
+    return respuesta_carrito("Producto agregado al carrito", total)
+
+# ---------------------------------------------------------------------------
+# PUT /cliente/carrito/{cliente_id}/items/{plato_id}
+# ---------------------------------------------------------------------------
+@router.put("/{cliente_id}/items/{plato_id}")
+def actualizar_cantidad(
+    cliente_id: str,
+    plato_id: str,
+    cantidad: int = Body(..., embed=True, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Fija la cantidad de un producto del carrito (0 lo elimina).
+    La línea se vuelve a valorar con el precio actual del plato.
+    """
+    plato_id = normalizar_plato_id(plato_id)
+    subtotal = get_precio_centavos(plato_id, db) * cantidad if cantidad else 0
+    total = fijar_linea(cliente_id, plato_id, cantidad, subtotal)
+    return respuesta_carrito("Cantidad actualizada", total)
 
-    detalle_existente = db.query(DetallePedido).filter_by(pedido_id=cart.id, plato_combinado_id=plato_id).first()
-
-    if detalle_existente:
-        detalle_existente.cantidad += cantidad
-    else:
-        nuevo_detalle = DetallePedido(
-            id=keygen.generate_uint64_key(),
-            pedido_id=cart.id,
-            plato_combinado_id=plato_id,
-            cantidad=cantidad,
-            subtotal=0 # El subtotal se recalcula siempre
-        )
-        db.add(nuevo_detalle)
-    
-    # Recalcular el total del carrito
-    detalles = db.query(DetallePedido).options(joinedload(DetallePedido.plato_combinado)).filter_by(pedido_id=cart.id).all()
-    cart.total = sum(d.plato_combinado.precio * d.cantidad for d in detalles)
-    db.commit()
-    
-    return {"mensaje": "Producto agregado al carrito", "total_carrito": float(cart.total)}
+# ---------------------------------------------------------------------------
+# DELETE /cliente/carrito/{cliente_id}/items/{plato_id}
+# ---------------------------------------------------------------------------
+@router.delete("/{cliente_id}/items/{plato_id}")
+def eliminar_del_carrito(cliente_id: str, plato_id: str):
+    """Quita un producto del carrito."""
+    plato_id = normalizar_plato_id(plato_id)
+    total = fijar_linea(cliente_id, plato_id, 0, 0)
+    return respuesta_carrito("Producto eliminado del carrito", total)
 
+# ---------------------------------------------------------------------------
+# DELETE /cliente/carrito/{cliente_id}
+# ---------------------------------------------------------------------------
+@router.delete("/{cliente_id}")
+def vaciar_carrito(cliente_id: str):
+    """Elimina todos los productos del carrito."""
+    carrito_store.vaciar(cliente_id)
+    return respuesta_carrito("Carrito vaciado", 0)
+
+# ---------------------------------------------------------------------------
+# POST /cliente/carrito/{cliente_id}/checkout
+# ---------------------------------------------------------------------------
+@router.post("/{cliente_id}/checkout")
+def confirmar_carrito(
+    cliente_id: str,
+    direccion_id: str = Body(..., embed=True),
+    db: Session = Depends(get_db)
+):
+    """
+    Convierte el carrito en un `Pedido` pendiente (precios vigentes del
+    catálogo) y lo vacía.
+
+    El carrito se lee y se borra en una sola operación (`tomar`): un producto
+    agregado durante el checkout queda en un carrito nuevo en lugar de
+    perderse. Si el pedido no se puede registrar, las líneas se devuelven.
+    """
+    verificar_cliente(cliente_id, db)
+    direccion = (
+        db.query(Direccion.id)
+        .filter(Direccion.id == direccion_id, Direccion.cliente_id == cliente_id)
+        .first()
+    )
+    if not direccion:
+        raise HTTPException(status_code=400, detail="La dirección no pertenece al cliente o no existe.")
+
+    carrito = carrito_store.tomar(cliente_id)
+    if not carrito["lineas"]:
+        raise HTTPException(status_code=400, detail="El carrito está vacío.")
+    items = {int(plato_id): cantidad for plato_id, (cantidad, _) in carrito["lineas"].items()}
+    try:
+        pedido = registrar_pedido(db, cliente_id, direccion_id, items)
+        db.commit()
+    except Exception:
+        db.rollback()
+        carrito_store.devolver(cliente_id, carrito)
+        raise
+
+    return {
+        "mensaje": "Pedido creado exitosamente.",
+        "pedido_id": str(pedido.id),
+        "estado": pedido.estado,
+        "total": float(pedido.total),
+        "fecha": pedido.fecha.isoformat(),
+    }
+
+# ---------------------------------------------------------------------------
+# GET /cliente/carrito/{cliente_id}
+# ---------------------------------------------------------------------------
 @router.get("/{cliente_id}")
-def ver_carrito(cliente_id: str, db: Session = Depends(get_db)):
-    """Muestra el contenido del carrito actual de un cliente."""
-    cart = db.query(Pedido).filter_by(cliente_id=cliente_id, estado="carrito").options(joinedload(Pedido.detalle_pedido).joinedload(DetallePedido.plato_combinado)).first()
-    
-    if not cart or not cart.detalle_pedido:
+async def ver_carrito(cliente_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Muestra el contenido del carrito actual de un cliente.
+
+    Las líneas de platos que ya no existen se quitan del carrito y el total se
+    calcula con las líneas devueltas. `detalle_id` identifica la línea en las
+    rutas de items: es el ID del plato, porque el carrito tiene una línea por plato.
+    """
+    # El backend Redis usa sockets bloqueantes: se consulta fuera del event loop.
+    carrito = await run_in_threadpool(carrito_store.obtener, cliente_id)
+    if not carrito["lineas"]:
         return {"items": [], "total": 0.0}
-        
+
+    platos = {
+        str(p.id): p
+        for p in (
+            await db.scalars(select(PlatoCombinado).where(PlatoCombinado.id.in_(list(carrito["lineas"]))))
+        ).all()
+    }
     items = [{
-        "detalle_id": str(d.id),
-        "plato_id": str(d.plato_combinado.id),
-        "nombre": d.plato_combinado.nombre,
-        "cantidad": d.cantidad,
-        "precio_unitario": float(d.plato_combinado.precio),
-        "subtotal": float(d.plato_combinado.precio * d.cantidad),
-        "imagen": d.plato_combinado.imagen, # Pasamos el nombre del archivo de imagen
-    } for d in cart.detalle_pedido]
-    
-    return {"items": items, "total": float(cart.total)}
-
-# (Más adelante se pueden añadir endpoints para eliminar items o vaciar el carrito)
\ No newline at end of file
+        "detalle_id": plato_id,
+        "plato_id": plato_id,
+        "nombre": platos[plato_id].nombre,
+        "cantidad": cantidad,
+        "precio_unitario": float(platos[plato_id].precio),
+        "subtotal": subtotal / 100,
+        "imagen": platos[plato_id].imagen, # Pasamos el nombre del archivo de imagen
+    } for plato_id, (cantidad, subtotal) in carrito["lineas"].items() if plato_id in platos]
+
+    obsoletas = [plato_id for plato_id in carrito["lineas"] if plato_id not in platos]
+    if obsoletas:
+        await run_in_threadpool(quitar_lineas, cliente_id, obsoletas)
+    total = sum(carrito["lineas"][item["plato_id"]][1] for item in items)
+    return {"items": items, "total": total / 100}
@@ -1,23 +1,38 @@
 # backend/routers/cliente/cliente.py - VERSIÓN CORREGIDA
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, Form
+from fastapi import APIRouter, Body, Depends, HTTPException, UploadFile, Form, Query, Request, Response
+from pydantic import BaseModel
 from utils import keygen, globals
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import joinedload, Session
 from utils.db import get_db
+from utils.medios import medios, ruta_imagen
+from utils.notificaciones import marcar_leidas, no_leidas
+from utils.paginacion import codificar_cursor, decodificar_cursor
+from datetime import datetime
+import logging
 import os  
 from models import Cliente, Direccion, Notificacion
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/cliente", tags=["Cliente"])
 
+
+def urls_foto(request: Request, foto: str | None) -> tuple[str | None, dict[str, str] | None]:
+    """URL completa de la foto del cliente y las de sus variantes."""
+    base_url = str(request.base_url).rstrip("/")
+    ruta = ruta_imagen(foto, globals.CLIENTE)
+    return (f"{base_url}/{ruta}" if ruta else None), medios.urls(base_url, ruta)
+
 # ---------------------------------------------------------------------------
 # GET /cliente/id/{cliente_id}
 # ---------------------------------------------------------------------------
 @router.get("/id/{cliente_id}")
-def obtener_perfil_cliente(cliente_id: str, db: Session = Depends(get_db)):
+def obtener_perfil_cliente(cliente_id: str, request: Request, db: Session = Depends(get_db)):
     """
     Obtiene el perfil completo de un cliente.
     """
-    print(f"📥 Obteniendo perfil para cliente: {cliente_id}")
-    
     cliente = (
         db.query(Cliente)
         .options(
@@ -36,11 +51,7 @@ def obtener_perfil_cliente(cliente_id: str, db: Session = Depends(get_db)):
     membresia = cliente.membresia_subscripcion
     
     # 🔥 CORRECCIÓN: Construir URL completa para la foto
-    foto_url = None
-    if cliente.foto:
-        # Limpiar ruta: eliminar 'static/' del inicio si existe
-        foto_path = cliente.foto.replace('static/', '').replace('static\\', '')
-        foto_url = f"{globals.CLIENTE}{os.path.basename(foto_path)}"
+    foto_url, foto_variantes = urls_foto(request, cliente.foto)
     
     direcciones = [
         {
@@ -60,6 +71,7 @@ def obtener_perfil_cliente(cliente_id: str, db: Session = Depends(get_db)):
         "telefono": cliente.telefono,
         "correo": cuenta.correo_electronico if cuenta else None,
         "foto": foto_url,
+        "foto_variantes": foto_variantes,
         "membresia_activa": {
             "id": str(membresia.id),
             "nombre": membresia.nombre,
@@ -68,8 +80,6 @@ def obtener_perfil_cliente(cliente_id: str, db: Session = Depends(get_db)):
         } if membresia else None,
         "direcciones": direcciones,
     }
-    
-    print(f"✅ Perfil obtenido: {cliente.nombre}")
     return response
 
 # ---------------------------------------------------------------------------
@@ -78,6 +88,7 @@ def obtener_perfil_cliente(cliente_id: str, db: Session = Depends(get_db)):
 @router.put("/{cliente_id}")
 def actualizar_datos_cliente(
     cliente_id: str,
+    request: Request,
     nombre: str = Form(...),
     telefono: str = Form(...),
     foto: UploadFile | None = None,
@@ -87,11 +98,6 @@ def actualizar_datos_cliente(
     Actualiza los datos del cliente.
     El correo NO se puede modificar.
     """
-    print(f"💾 Actualizando cliente: {cliente_id}")
-    print(f"   Nombre: {nombre}")
-    print(f"   Teléfono: {telefono}")
-    print(f"   Foto: {'Sí' if foto else 'No'}")
-    
     # Buscar cliente
     cliente = (
         db.query(Cliente)
@@ -110,24 +116,13 @@ def actualizar_datos_cliente(
     # 🔥 MANEJO DE FOTO MEJORADO
     if foto:
         try:
-            # Crear directorio si no existe
-            uploads_dir = globals.CLIENTE
-            os.makedirs(uploads_dir, exist_ok=True)
-
-            # Generar nombre único
-            filename = f"cliente_{cliente_id}_{foto.filename}"
-            file_path = os.path.join(uploads_dir, filename)
+            # Guardar archivo (direccionado por contenido; las variantes se generan aparte)
+            cliente.foto = medios.guardar(foto)
 
-            # Guardar archivo
-            with open(file_path, "wb") as f:
-                f.write(foto.file.read())
-            
-            # Guardar solo la ruta relativa
-            cliente.foto = file_path
-            print(f"✅ Foto guardada: {file_path}")
-            
-        except Exception as e:
-            print(f"❌ Error al guardar foto: {str(e)}")
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("no se pudo guardar la foto del cliente", extra={"cliente_id": cliente_id})
             # No fallar si hay error con la foto
             pass
     else:
@@ -139,17 +134,14 @@ def actualizar_datos_cliente(
     try:
         db.commit()
         db.refresh(cliente)
-        print("✅ Cliente actualizado correctamente")
-    except Exception as e:
+        logger.info("cliente actualizado", extra={"cliente_id": cliente_id, "con_foto": foto is not None})
+    except Exception:
         db.rollback()
-        print(f"❌ Error al guardar: {str(e)}")
+        logger.exception("error al actualizar el cliente", extra={"cliente_id": cliente_id})
         raise HTTPException(status_code=500, detail="Error al actualizar el cliente.")
 
     # Construir URL de foto
-    foto_url = None
-    if cliente.foto:
-        foto_path = cliente.foto.replace('static/', '').replace('static\\', '')
-        foto_url = f"{globals.CLIENTE}{os.path.basename(foto_path)}"
+    foto_url, foto_variantes = urls_foto(request, cliente.foto)
 
     return {
         "mensaje": "Datos del cliente actualizados correctamente.",
@@ -159,6 +151,7 @@ def actualizar_datos_cliente(
             "telefono": cliente.telefono,
             "correo": cliente.cuenta_usuario.correo_electronico if cliente.cuenta_usuario else None,
             "foto": foto_url,
+            "foto_variantes": foto_variantes,
         },
     }
 
@@ -203,26 +196,17 @@ def crear_direccion(
     db: Session = Depends(get_db),
 ):
     try:
-        print(f"🔥 Recibiendo dirección para cliente {cliente_id}")
-        print(f"   Nombre: {nombre}")
-        print(f"   Lat/Lng: {latitud}, {longitud}")
-        print(f"   Es principal: {es_principal}")
-        
         cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
         if not cliente:
             raise HTTPException(status_code=404, detail="Cliente no encontrado.")
         
-        print(f"✅ Cliente encontrado: {cliente.nombre}")
-        
         if es_principal:
-            print("🔄 Desmarcando otras direcciones principales...")
             db.query(Direccion).filter(
                 Direccion.cliente_id == cliente_id
             ).update({"es_principal": False})
             db.flush()
         
         direccion_id = keygen.generate_uint64_key()
-        print(f"🆔 ID generado: {direccion_id}")
         
         direccion = Direccion(
             id=direccion_id,
@@ -235,19 +219,14 @@ def crear_direccion(
             estado_registro="A",
         )
         
-        print("💾 Agregando dirección a la sesión...")
         db.add(direccion)
-        
-        print("🔄 Haciendo flush...")
         db.flush()
-        
-        print("✅ Haciendo commit...")
         db.commit()
-        
-        print("🔄 Refrescando objeto...")
         db.refresh(direccion)
-        
-        print(f"✅ Dirección guardada exitosamente: {direccion.id}")
+        logger.info(
+            "direccion registrada",
+            extra={"cliente_id": cliente_id, "direccion_id": direccion.id, "es_principal": es_principal},
+        )
         
         return {
             "mensaje": "Dirección registrada correctamente.",
@@ -265,9 +244,7 @@ def crear_direccion(
         raise
     
     except Exception as e:
-        print(f"❌ ERROR al crear dirección: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("error al crear la direccion", extra={"cliente_id": cliente_id})
         db.rollback()
         raise HTTPException(
             status_code=500, 
@@ -282,8 +259,6 @@ def listar_direcciones(
     cliente_id: str,
     db: Session = Depends(get_db),
 ):
-    print(f"🗺 Listando direcciones para cliente: {cliente_id}")
-    
     cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado.")
@@ -307,8 +282,6 @@ def listar_direcciones(
         for d in direcciones
     ]
     
-    print(f"📤 Direcciones encontradas: {len(resultado)}")
-    
     return {
         "total": len(resultado),
         "direcciones": resultado
@@ -354,26 +327,17 @@ def crear_direccion(
     db: Session = Depends(get_db),
 ):
     try:
-        print(f"🔥 Recibiendo dirección para cliente {cliente_id}")
-        print(f"   Nombre: {nombre}")
-        print(f"   Lat/Lng: {latitud}, {longitud}")
-        print(f"   Es principal: {es_principal}")
-        
         cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
         if not cliente:
             raise HTTPException(status_code=404, detail="Cliente no encontrado.")
         
-        print(f"✅ Cliente encontrado: {cliente.nombre}")
-        
         if es_principal:
-            print("🔄 Desmarcando otras direcciones principales...")
             db.query(Direccion).filter(
                 Direccion.cliente_id == cliente_id
             ).update({"es_principal": False})
             db.flush()
         
         direccion_id = keygen.generate_uint64_key()
-        print(f"🆔 ID generado: {direccion_id}")
         
         direccion = Direccion(
             id=direccion_id,
@@ -386,19 +350,14 @@ def crear_direccion(
             estado_registro="A",
         )
         
-        print("💾 Agregando dirección a la sesión...")
         db.add(direccion)
-        
-        print("🔄 Haciendo flush...")
         db.flush()
-        
-        print("✅ Haciendo commit...")
         db.commit()
-        
-        print("🔄 Refrescando objeto...")
         db.refresh(direccion)
-        
-        print(f"✅ Dirección guardada exitosamente: {direccion.id}")
+        logger.info(
+            "direccion registrada",
+            extra={"cliente_id": cliente_id, "direccion_id": direccion.id, "es_principal": es_principal},
+        )
         
         return {
             "mensaje": "Dirección registrada correctamente.",
@@ -416,9 +375,7 @@ def crear_direccion(
         raise
     
     except Exception as e:
-        print(f"❌ ERROR al crear dirección: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("error al crear la direccion", extra={"cliente_id": cliente_id})
         db.rollback()
         raise HTTPException(
             status_code=500, 
@@ -433,8 +390,6 @@ def listar_direcciones(
     cliente_id: str,
     db: Session = Depends(get_db),
 ):
-    print(f"🗺 Listando direcciones para cliente: {cliente_id}")
-    
     cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado.")
@@ -458,8 +413,6 @@ def listar_direcciones(
         for d in direcciones
     ]
     
-    print(f"📤 Direcciones encontradas: {len(resultado)}")
-    
     return {
         "total": len(resultado),
         "direcciones": resultado
@@ -568,18 +521,49 @@ def eliminar_direccion(
             }
     
     return {"mensaje": "Dirección eliminada correctamente."}
+# ---------------------------------------------------------------------------
+# GET /cliente/{cliente_id}/notificaciones
+# ---------------------------------------------------------------------------
+PAGINA_NOTIFICACIONES = 50
+
+
 @router.get("/{cliente_id}/notificaciones")
-def listar_notificaciones(cliente_id: str, db: Session = Depends(get_db)):
+def listar_notificaciones(
+    cliente_id: str,
+    response: Response,
+    solo_no_leidas: bool = Query(False, description="Solo notificaciones sin leer"),
+    limite: int = Query(PAGINA_NOTIFICACIONES, ge=1, le=200, description="Notificaciones por página"),
+    cursor: str | None = Query(None, description="Cursor devuelto en X-Siguiente-Cursor"),
+    db: Session = Depends(get_db),
+):
     """
-    Lista las notificaciones del cliente ordenadas por fecha.
+    Lista las notificaciones del cliente, de la más reciente a la más antigua.
+    Paginación por keyset sobre (fecha, id): el cursor de la siguiente página
+    se devuelve en la cabecera `X-Siguiente-Cursor` y el total sin leer en
+    `X-No-Leidas`.
     """
+    consulta = db.query(Notificacion).filter(Notificacion.cliente_id == cliente_id)
+    if solo_no_leidas:
+        consulta = consulta.filter(Notificacion.leido == 0)
+    if cursor:
+        fecha_ultima, id_ultimo = decodificar_cursor(cursor, datetime.fromisoformat, int)
+        consulta = consulta.filter(or_(
+            Notificacion.fecha < fecha_ultima,
+            and_(Notificacion.fecha == fecha_ultima, Notificacion.id < id_ultimo),
+        ))
+
+    # Se pide una fila extra para saber si existe una página siguiente.
     notificaciones = (
-        db.query(Notificacion)
-        .filter(Notificacion.cliente_id == cliente_id)
-        .order_by(Notificacion.fecha.desc())
+        consulta.order_by(Notificacion.fecha.desc(), Notificacion.id.desc())
+        .limit(limite + 1)
         .all()
     )
-    
+    if len(notificaciones) > limite:
+        notificaciones = notificaciones[:limite]
+        ultima = notificaciones[-1]
+        response.headers["X-Siguiente-Cursor"] = codificar_cursor(ultima.fecha, ultima.id)
+    response.headers["X-No-Leidas"] = str(no_leidas.obtener(db, cliente_id))
+
     return [
         {
             "id": str(n.id),
@@ -591,4 +575,44 @@ def listar_notificaciones(cliente_id: str, db: Session = Depends(get_db)):
             "referencia_id": n.referencia_id
         }
         for n in notificaciones
-    ]
\ No newline at end of file
+    ]
+
+# ---------------------------------------------------------------------------
+# GET /cliente/{cliente_id}/notificaciones/no-leidas
+# ---------------------------------------------------------------------------
+@router.get("/{cliente_id}/notificaciones/no-leidas")
+def contar_notificaciones_no_leidas(cliente_id: str, db: Session = Depends(get_db)):
+    """
+    Cantidad de notificaciones sin leer (badge de la app). Se sirve desde la
+    caché de utils.notificaciones; no lee la bandeja.
+    """
+    return {"no_leidas": no_leidas.obtener(db, cliente_id)}
+
+# ---------------------------------------------------------------------------
+# POST /cliente/{cliente_id}/notificaciones/leidas
+# ---------------------------------------------------------------------------
+class MarcarLeidasSchema(BaseModel):
+    ids: list[str] | None = None  # Sin ids: todas las sin leer
+    hasta: datetime | None = None  # Solo las de esta fecha o anteriores
+
+
+@router.post("/{cliente_id}/notificaciones/leidas")
+def marcar_notificaciones_leidas(
+    cliente_id: str,
+    data: MarcarLeidasSchema = Body(default_factory=MarcarLeidasSchema),
+    db: Session = Depends(get_db),
+):
+    """
+    Marca como leídas, en una sola sentencia, las notificaciones sin leer del
+    cliente: todas, las indicadas en `ids` o las anteriores a `hasta`.
+    """
+    try:
+        marcadas = marcar_leidas(db, cliente_id, ids=data.ids, hasta=data.hasta)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("error al marcar notificaciones como leidas", extra={"cliente_id": cliente_id})
+        raise HTTPException(status_code=500, detail="No se pudieron actualizar las notificaciones.")
+    no_leidas.descartar(cliente_id)
+
+    return {"marcadas": marcadas, "no_leidas": no_leidas.obtener(db, cliente_id)}
\ No newline at end of file
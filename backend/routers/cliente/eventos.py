@@ -0,0 +1,83 @@
+"""
+RUTAS DEL CLIENTE – EVENTOS EN VIVO
+-----------------------------------
+Canal de avisos para la app, en lugar de consultar periódicamente los
+endpoints REST (ver utils/difusion.py):
+
+- GET /cliente/{cliente_id}/eventos: Server-Sent Events.
+- WS  /cliente/{cliente_id}/eventos/ws: WebSocket (mismo contenido, un JSON por mensaje).
+
+Eventos: "notificacion" (nueva notificación) y "pedido_estado" (cambio de
+estado de un pedido del cliente).
+"""
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, WebSocket
+from fastapi.responses import StreamingResponse
+
+from utils.difusion import difusor
+
+# Cada cuánto se envía un comentario SSE vacío para que proxies y balanceadores
+# no cierren la conexión por inactividad.
+EVENTOS_LATIDO_SEGUNDOS = float(os.getenv("EVENTOS_LATIDO_SEGUNDOS", "15"))
+
+router = APIRouter(prefix="/cliente", tags=["Eventos del Cliente"])
+
+
+# ---------------------------------------------------------------------------
+# GET /cliente/{cliente_id}/eventos
+# ---------------------------------------------------------------------------
+@router.get("/{cliente_id}/eventos")
+async def flujo_eventos(cliente_id: str):
+    """
+    Flujo `text/event-stream` con los eventos del cliente. Cada evento trae
+    `event: <tipo>` y en `data` el JSON {"tipo", "fecha", "datos"}.
+    """
+    async def generar():
+        suscripcion = difusor.suscribir(cliente_id)
+        try:
+            # Tiempo sugerido al navegador para reconectar si se corta.
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    evento = await asyncio.wait_for(suscripcion.cola.get(), EVENTOS_LATIDO_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    yield ": latido\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+        finally:
+            difusor.cancelar(suscripcion)
+
+    return StreamingResponse(
+        generar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# WS /cliente/{cliente_id}/eventos/ws
+# ---------------------------------------------------------------------------
+@router.websocket("/{cliente_id}/eventos/ws")
+async def socket_eventos(websocket: WebSocket, cliente_id: str):
+    await websocket.accept()
+    suscripcion = difusor.suscribir(cliente_id)
+
+    async def enviar():
+        while True:
+            await websocket.send_json(await suscripcion.cola.get())
+
+    async def escuchar():
+        # La app no envía nada; solo se espera el cierre de la conexión.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tareas = [asyncio.create_task(enviar()), asyncio.create_task(escuchar())]
+    try:
+        await asyncio.wait(tareas, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+        difusor.cancelar(suscripcion)
@@ -13,7 +13,8 @@ Incluye:
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session, joinedload
 from utils.db import get_db
-from utils import keygen
+from utils import globals, keygen
+from utils.medios import medios, ruta_imagen
 from models import PlatoFavorito, Cliente, PlatoCombinado
 from datetime import datetime
 
@@ -155,9 +156,9 @@ def listar_favoritos(
     for fav in favoritos:
         plato = fav.plato_combinado
         if plato:
-            imagen_url = None
-            if plato.imagen:
-                imagen_url = f"{base_url}/static/imagenes/plato/{plato.imagen}"
+            ruta = ruta_imagen(plato.imagen, globals.PLATO)
+            imagen_url = f"{base_url}/{ruta}" if ruta else None
+            imagen_variantes = medios.urls(base_url, ruta)
             
             resultado.append({
                 "favorito_id": str(fav.id),
@@ -168,6 +169,7 @@ def listar_favoritos(
                     "descripcion": plato.descripcion,
                     "precio": float(plato.precio),
                     "imagen": imagen_url,
+                    "imagen_variantes": imagen_variantes,
                     "categoria": plato.categoria.nombre if plato.categoria else None,
                     "especie": plato.especie.nombre if plato.especie else None,
                     "etiquetas": [ep.etiqueta.nombre for ep in plato.etiqueta_plato]
@@ -5,11 +5,13 @@ Permite al cliente administrar el registro de sus mascotas y sus datos
 vinculados: especie, alergias, condiciones de salud, recetas médicas, etc.
 """
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Form, Request
 from utils import globals, keygen
 from utils.db import get_db
+from utils.medios import medios
 from fastapi import File, UploadFile, Form 
-import shutil
 from sqlalchemy.orm import Session, joinedload
 from models import (
     Cliente,
@@ -27,7 +29,9 @@ from models import (
 )
 import os
 from datetime import datetime
+from utils.expediente import expedientes
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/cliente/mascotas", tags=["Mascotas del Cliente"])
 
@@ -45,6 +49,11 @@ def construir_url_imagen(request: Request, ruta_local: str | None):
 
     return f"{base_url}/static/{ruta_limpia}"
 
+
+def construir_urls_variantes(request: Request, ruta_local: str | None):
+    """URLs de las variantes redimensionadas (miniatura, detalle, avatar) de la imagen."""
+    return medios.urls(str(request.base_url).rstrip("/"), ruta_local)
+
 # ---------------------------------------------------------------------------
 # PUT /cliente/mascotas/{mascota_id}  <-- AGREGA ESTO AL FINAL DEL ARCHIVO
 # ---------------------------------------------------------------------------
@@ -84,23 +93,13 @@ def actualizar_mascota(
     # 3. Manejar la foto si se envió una nueva
     if foto:
         try:
-            # Crear directorio si no existe
-            upload_folder = "static/imagenes/mascota"
-            os.makedirs(upload_folder, exist_ok=True)
-            
-            # Generar nombre de archivo único o usar el ID
-            filename = f"mascota_{mascota_id}_{foto.filename}"
-            file_path = os.path.join(upload_folder, filename)
-            
-            # Guardar el archivo
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(foto.file, buffer)
-            
-            # Actualizar la ruta en la base de datos (ruta relativa para static)
-            mascota.foto = file_path.replace("\\", "/") # Normalizar slashes para Windows
-            
-        except Exception as e:
-            print(f"❌ Error al guardar imagen: {e}")
+            # Guardar el archivo (direccionado por contenido; las variantes se generan aparte)
+            mascota.foto = medios.guardar(foto)
+
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("no se pudo guardar la imagen de la mascota", extra={"mascota_id": mascota_id})
             # No detenemos el proceso, pero logueamos el error
 
     # 4. Guardar cambios en BD
@@ -109,6 +108,7 @@ def actualizar_mascota(
 
     # 5. Construir URL para la respuesta
     foto_url = construir_url_imagen(request, mascota.foto)
+    foto_variantes = construir_urls_variantes(request, mascota.foto)
 
     return {
         "mensaje": "Mascota actualizada correctamente.",
@@ -119,6 +119,7 @@ def actualizar_mascota(
             "edad": mascota.edad,
             "peso": float(mascota.peso) if mascota.peso else None,
             "foto": foto_url,
+            "foto_variantes": foto_variantes,
             "observaciones": mascota.observaciones
         }
     }
@@ -166,6 +167,7 @@ def listar_mascotas_cliente(
             ruta_foto = m.foto
 
         foto_url = construir_url_imagen(request, ruta_foto)
+        foto_variantes = construir_urls_variantes(request, ruta_foto)
 
         resultado.append(
             {
@@ -176,6 +178,7 @@ def listar_mascotas_cliente(
                 "edad": m.edad,
                 "peso": float(m.peso) if m.peso else None,
                 "foto": foto_url,
+                "foto_variantes": foto_variantes,
             }
         )
 
@@ -239,6 +242,7 @@ def registrar_mascota(
     db.commit()
 
     foto_url = construir_url_imagen(request, mascota.foto)
+    foto_variantes = construir_urls_variantes(request, mascota.foto)
 
     return {
         "mensaje": "Mascota registrada exitosamente.",
@@ -250,6 +254,7 @@ def registrar_mascota(
             "edad": mascota.edad,
             "sexo": mascota.sexo,
             "foto": foto_url,
+            "foto_variantes": foto_variantes,
         },
     }
 
@@ -263,27 +268,26 @@ def obtener_detalle_mascota(
     request: Request,
     db: Session = Depends(get_db),
 ):
+    # Datos y sub-registros clínicos (utils.expediente, en caché por unos segundos)
+    expediente = expedientes.obtener(db, mascota_id)
+    if not expediente or expediente.estado_registro != "A":
+        raise HTTPException(status_code=404, detail="Mascota no encontrada o inactiva.")
 
+    # Recetas, consultas y menús (no forman parte del expediente en caché)
     mascota = (
         db.query(RegistroMascota)
         .options(
-            joinedload(RegistroMascota.especie),
-            joinedload(RegistroMascota.alergia_mascota).joinedload(AlergiaMascota.alergia_especie),
-            joinedload(RegistroMascota.condicion_salud),
             joinedload(RegistroMascota.receta_medica),
             joinedload(RegistroMascota.consulta).joinedload(Consulta.nutricionista),
-            joinedload(RegistroMascota.plato_personal).joinedload(PlatoPersonal.plato_combinado)
+            joinedload(RegistroMascota.plato_personal).joinedload(PlatoPersonal.plato_combinado),
         )
-        .filter(RegistroMascota.id == mascota_id, RegistroMascota.estado_registro == "A")
+        .filter(RegistroMascota.id == expediente.id)
         .first()
     )
 
-    if not mascota:
-        raise HTTPException(status_code=404, detail="Mascota no encontrada o inactiva.")
-
-    especie_nombre = mascota.especie.nombre if mascota.especie else "Sin especie"
+    especie_nombre = expediente.especie or "Sin especie"
 
-    if not mascota.foto:
+    if not expediente.foto:
         if "perro" in especie_nombre.lower():
             ruta_foto = "static/imagenes/cliente/perro.png"
         elif "gato" in especie_nombre.lower():
@@ -291,34 +295,27 @@ def obtener_detalle_mascota(
         else:
             ruta_foto = "static/imagenes/cliente/user.png"
     else:
-        ruta_foto = mascota.foto
+        ruta_foto = expediente.foto
 
     foto_url = construir_url_imagen(request, ruta_foto)
+    foto_variantes = construir_urls_variantes(request, ruta_foto)
 
     # -------------------------------
     # Alergias
     # -------------------------------
     alergias = [
         {
-            "id": str(a.id),
-            "alergia": a.alergia_especie.nombre if a.alergia_especie else "Desconocida",
-            "severidad": a.severidad,
+            "id": a["id"],
+            "alergia": a["alergia"] or "Desconocida",
+            "severidad": a["severidad"],
         }
-        for a in mascota.alergia_mascota
+        for a in expediente.alergias
     ]
 
     # -------------------------------
     # Condiciones de salud
     # -------------------------------
-    condiciones = [
-        {
-            "id": str(c.id),
-            "nombre": c.nombre,
-            "fecha": c.fecha.isoformat() if c.fecha else None,
-            "estado_registro": c.estado_registro,
-        }
-        for c in mascota.condicion_salud
-    ]
+    condiciones = list(expediente.condiciones)
 
     # -------------------------------
     # Recetas médicas
@@ -364,19 +361,20 @@ def obtener_detalle_mascota(
             })
 
     return {
-        "id": str(mascota.id),
-        "nombre": mascota.nombre,
+        "id": str(expediente.id),
+        "nombre": expediente.nombre,
         "especie": especie_nombre,
-        "raza": mascota.raza,
-        "edad": mascota.edad,
-        "peso": float(mascota.peso) if mascota.peso else None,
+        "raza": expediente.raza,
+        "edad": expediente.edad,
+        "peso": expediente.peso,
         "foto": foto_url,
+        "foto_variantes": foto_variantes,
         "alergias": alergias,
         "condiciones_salud": condiciones,
         "recetas_medicas": recetas,
         "historial_nutricional": historial_consultas,
         "menus_personalizados": menus_asignados,
-        "observaciones": mascota.observaciones,
+        "observaciones": expediente.observaciones,
     }
 
 
@@ -10,11 +10,15 @@ diferentes métodos (Yape, Plin, etc.) y subir comprobantes.
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session, joinedload
 from utils.db import get_db
+from utils.archivos import guardar_subida
 from utils import keygen, globals
 from models import Pedido, Pago, PasarelaPago
 from datetime import datetime
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/cliente/pedido", tags=["Pagos del Cliente"])
 
 # ---------------------------------------------------------------------------
@@ -50,20 +54,13 @@ def procesar_pago(
     # Guardar comprobante si se proporcionó
     referencia_pago = None
     if comprobante:
-        uploads_dir = os.path.join("static", "uploads", "comprobantes")
-        os.makedirs(uploads_dir, exist_ok=True)
-        
         # Generar nombre único para el archivo
         extension = os.path.splitext(comprobante.filename)[1]
         filename = f"comprobante_{pedido_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}{extension}"
-        file_path = os.path.join(uploads_dir, filename)
-        
+
         # Guardar archivo
-        with open(file_path, "wb") as f:
-            f.write(comprobante.file.read())
-        
-        referencia_pago = file_path
-        print(f"✅ Comprobante guardado en: {file_path}")
+        guardado = guardar_subida(comprobante, os.path.join("static", "uploads", "comprobantes"), filename)
+        referencia_pago = guardado.ruta
     
     # Crear registro de pago
     pago_id = keygen.generate_uint64_key()
@@ -85,7 +82,10 @@ def procesar_pago(
     db.commit()
     db.refresh(pago)
     
-    print(f"✅ Pago registrado: {pago_id}")
+    logger.info(
+        "pago registrado",
+        extra={"pago_id": pago_id, "pedido_id": pedido_id, "con_comprobante": referencia_pago is not None},
+    )
     
     return {
         "mensaje": "Pago procesado correctamente. Tu pedido está siendo verificado.",
@@ -5,8 +5,15 @@ RUTAS DEL CLIENTE – PEDIDOS Y PEDIDOS ESPECIALIZADOS
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Body, Form, File, Query
 from datetime import datetime
 from utils import keygen, globals
-from sqlalchemy.orm import joinedload, Session
-from utils.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, Session
+from utils.db import get_db, get_async_db
+from utils.metricas import RespuestaJSONMedida
+from utils.detalle_pedido import DetallePedidoRespuesta, construir_detalle
+from utils.archivos import guardar_subida
+from utils.expediente import expedientes
+from utils.pedidos import agrupar_items, registrar_pedido
 from models import (
     Cliente, Direccion, Pedido, DetallePedido, ControlEntrega, 
     PlatoCombinado, PedidoEspecializado, RegistroMascota, RecetaMedica, 
@@ -14,8 +21,11 @@ from models import (
 )
 import os
 import json
+import logging
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/cliente/pedido", tags=["Pedidos del Cliente"])
 
 # ---------------------------------------------------------------------------
@@ -39,7 +49,7 @@ def crear_pedido(
         raise HTTPException(status_code=400, detail="Debe especificar una dirección de entrega.")
     if not platos or len(platos) == 0:
         raise HTTPException(status_code=400, detail="Debe incluir al menos un plato en el pedido.")
-    if not total or total <= 0:
+    if total is not None and (not isinstance(total, (int, float)) or total <= 0):
         raise HTTPException(status_code=400, detail="El total del pedido debe ser mayor que 0.")
     
     direccion = (
@@ -50,45 +60,10 @@ def crear_pedido(
     if not direccion:
         raise HTTPException(status_code=400, detail="La dirección no pertenece al cliente o no existe.")
     
-    pedido_id = keygen.generate_uint64_key()
-    pedido = Pedido(
-        id=pedido_id,
-        cliente_id=cliente_id,
-        direccion_id=direccion_id,
-        fecha=datetime.now(),
-        total=total,
-        estado="pendiente",
-        incluye_plato=True,
-    )
-    db.add(pedido)
-    
-    for item in platos:
-        # ✅ CÓDIGO CORREGIDO: Eliminamos el debugger y la división por cero
-        plato_id = item.get("plato_id")
-        cantidad = item.get("cantidad", 1)
-        precio_unitario = item.get("precio_unitario", 0)
-        
-        # Calcular el subtotal correctamente
-        subtotal = cantidad * precio_unitario
-        
-        # Verificar que el plato existe
-        plato = db.query(PlatoCombinado).filter(PlatoCombinado.id == plato_id).first()
-        if not plato:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"El plato con ID {plato_id} no existe."
-            )
-        
-        # Crear el detalle del pedido
-        det = DetallePedido(
-            id=keygen.generate_uint64_key(),
-            pedido_id=pedido_id,
-            plato_combinado_id=plato_id,
-            cantidad=cantidad,
-            subtotal=subtotal,
-        )
-        db.add(det)
-    
+    # Precios, subtotales y total se calculan en el servidor (el `precio_unitario`
+    # enviado por la app se ignora); `total`, si se envía, solo se verifica.
+    pedido = registrar_pedido(db, cliente_id, direccion_id, agrupar_items(platos), total_esperado=total)
+    pedido_id = pedido.id
     db.commit()
     
     return {
@@ -105,39 +80,42 @@ def crear_pedido(
 # Lista todos los pedidos realizados por el cliente.
 # Incluye estado, fecha, total y si tiene pedido especializado asociado.
 @router.get("/{cliente_id}/historial")
-def listar_pedidos_cliente(
+async def listar_pedidos_cliente(
     cliente_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
-    if not cliente:
+    cliente_existe = await db.scalar(select(Cliente.id).where(Cliente.id == cliente_id))
+    if not cliente_existe:
         raise HTTPException(status_code=404, detail="Cliente no encontrado.")
     pedidos = (
-        db.query(Pedido)
-        .options(joinedload(Pedido.pedido_especializado))
-        .filter(Pedido.cliente_id == cliente_id)
-        .order_by(Pedido.fecha.desc())
-        .all()
-    )
+        await db.scalars(
+            select(Pedido)
+            .options(selectinload(Pedido.pedido_especializado))
+            .where(Pedido.cliente_id == cliente_id)
+            .order_by(Pedido.fecha.desc())
+        )
+    ).all()
     if not pedidos:
         return {"mensaje": "El cliente no tiene pedidos registrados."}
-    resultado = []
-    for p in pedidos:
-        resultado.append({
+    # fecha y total van tal cual: los serializa RespuestaJSONMedida, sin jsonable_encoder.
+    resultado = [
+        {
             "pedido_id": str(p.id),
-            "fecha": p.fecha.isoformat(),
+            "fecha": p.fecha,
             "estado": p.estado,
-            "total": float(p.total),
+            "total": p.total,
             "especializado": bool(p.pedido_especializado),
-        })
-    return {"total": len(resultado), "pedidos": resultado}
+        }
+        for p in pedidos
+    ]
+    return RespuestaJSONMedida({"total": len(resultado), "pedidos": resultado})
 
 # ---------------------------------------------------------------------------
 # GET /cliente/pedido/detalle/{pedido_id}
 # ---------------------------------------------------------------------------
 # Devuelve los detalles del pedido:
 # platos, cantidades, subtotal, dirección y estado actual.
-@router.get("/detalle/{pedido_id}")
+@router.get("/detalle/{pedido_id}", response_model=DetallePedidoRespuesta)
 def obtener_detalle_pedido(
     pedido_id: str,
     db: Session = Depends(get_db),
@@ -154,37 +132,7 @@ def obtener_detalle_pedido(
     )
     if not pedido:
         raise HTTPException(status_code=404, detail="Pedido no encontrado.")
-    direccion = pedido.direccion
-    cliente = pedido.cliente
-    platos = [
-        {
-            "plato": det.plato_combinado.nombre if det.plato_combinado else None,
-            "cantidad": det.cantidad,
-            "subtotal": float(det.subtotal),
-        }
-        for det in pedido.detalle_pedido
-    ]
-    return {
-        "pedido": {
-            "id": str(pedido.id),
-            "fecha": pedido.fecha.isoformat(),
-            "estado": pedido.estado,
-            "total": float(pedido.total),
-        },
-        "cliente": {
-            "id": str(cliente.id),
-            "nombre": cliente.nombre,
-            "telefono": cliente.telefono,
-        } if cliente else None,
-        "direccion": {
-            "id": str(direccion.id),
-            "nombre": direccion.nombre,
-            "referencia": direccion.referencia,
-            "latitud": float(direccion.latitud),
-            "longitud": float(direccion.longitud),
-        } if direccion else None,
-        "platos": platos,
-    }
+    return RespuestaJSONMedida(construir_detalle(DetallePedidoRespuesta, pedido))
 
 # ---------------------------------------------------------------------------
 # POST /cliente/pedido/{pedido_id}/recibido
@@ -261,7 +209,7 @@ def crear_pedido_especializado(
     cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado.")
-    print(f"DEBUG: Buscando mascota {registro_mascota_id} para cliente {cliente_id}")
+    logger.debug("buscando mascota del pedido especializado", extra={"mascota_id": registro_mascota_id, "cliente_id": cliente_id})
     mascota = (
         db.query(RegistroMascota)
         .options(joinedload(RegistroMascota.especie))
@@ -314,16 +262,11 @@ def crear_pedido_especializado(
     db.add(pedido_esp)
     db.flush()
     uploads_dir = os.path.join("static", "uploads", "pedido_especializado")
-    os.makedirs(uploads_dir, exist_ok=True)
     if archivo_adicional:
-        extra_path = os.path.join(uploads_dir, f"extra_{pedido_esp_id}_{archivo_adicional.filename}")
-        with open(extra_path, "wb") as f:
-            f.write(archivo_adicional.file.read())
-        pedido_esp.archivo_adicional = extra_path
+        extra = guardar_subida(archivo_adicional, uploads_dir, f"extra_{pedido_esp_id}_{archivo_adicional.filename}")
+        pedido_esp.archivo_adicional = extra.ruta
     if receta_medica:
-        receta_path = os.path.join(uploads_dir, f"receta_{pedido_esp_id}_{receta_medica.filename}")
-        with open(receta_path, "wb") as f:
-            f.write(receta_medica.file.read())
+        receta_path = guardar_subida(receta_medica, uploads_dir, f"receta_{pedido_esp_id}_{receta_medica.filename}").ruta
         receta = RecetaMedica(
             id=keygen.generate_uint64_key(),
             registro_mascota_id=registro_mascota_id,
@@ -468,8 +411,6 @@ def obtener_detalle_pedido_especializado(
         db.query(PedidoEspecializado)
         .options(
             joinedload(PedidoEspecializado.pedido).joinedload(Pedido.cliente),
-            joinedload(PedidoEspecializado.registro_mascota)
-                .joinedload(RegistroMascota.especie),
             joinedload(PedidoEspecializado.receta_medica),
         )
         .filter(PedidoEspecializado.pedido_id == pedido_id)
@@ -478,12 +419,8 @@ def obtener_detalle_pedido_especializado(
     if not pedido_esp:
         raise HTTPException(status_code=404, detail="Pedido especializado no encontrado.")
     pedido = pedido_esp.pedido
-    mascota = pedido_esp.registro_mascota
+    mascota = expedientes.obtener(db, pedido_esp.registro_mascota_id) if pedido_esp.registro_mascota_id else None
     receta = pedido_esp.receta_medica[0] if pedido_esp.receta_medica else None
-    alergias = db.query(AlergiaMascota).filter(AlergiaMascota.registro_mascota_id == mascota.id).all()
-    condiciones = db.query(CondicionSalud).filter(CondicionSalud.registro_mascota_id == mascota.id).all()
-    preferencias = db.query(PreferenciaAlimentaria).filter(PreferenciaAlimentaria.registro_mascota_id == mascota.id).all()
-    descripcion = db.query(DescripcionAlergias).filter(DescripcionAlergias.registro_mascota_id == mascota.id).order_by(DescripcionAlergias.fecha.desc()).first()
     return {
         "pedido": {
             "id": str(pedido.id),
@@ -506,35 +443,29 @@ def obtener_detalle_pedido_especializado(
         "mascota": {
             "id": str(mascota.id),
             "nombre": mascota.nombre,
-            "especie": mascota.especie.nombre if mascota.especie else None,
+            "especie": mascota.especie,
             "edad": mascota.edad,
             "raza": mascota.raza,
-            "peso": float(mascota.peso) if mascota.peso else None,
+            "peso": mascota.peso,
             "foto": mascota.foto,
         } if mascota else None,
         "detalles_nutricionales": {
             "alergias": [
                 {
-                    "id": str(a.id),
-                    "alergia_especie_id": a.alergia_especie_id,
-                    "severidad": a.severidad,
-                } for a in alergias
+                    "id": a["id"],
+                    "alergia_especie_id": a["alergia_especie_id"],
+                    "severidad": a["severidad"],
+                } for a in (mascota.alergias if mascota else [])
             ],
-            "descripcion_alergias": descripcion.descripcion if descripcion else None,
+            "descripcion_alergias": mascota.descripcion_alergias if mascota else None,
             "condiciones_salud": [
                 {
-                    "id": str(c.id),
-                    "nombre": c.nombre,
-                    "fecha": c.fecha.isoformat() if c.fecha else None,
-                } for c in condiciones
-            ],
-            "preferencias_alimentarias": [
-                {
-                    "id": str(pf.id),
-                    "nombre": pf.nombre,
-                    "descripcion": pf.descripcion,
-                } for pf in preferencias
+                    "id": c["id"],
+                    "nombre": c["nombre"],
+                    "fecha": c["fecha"],
+                } for c in (mascota.condiciones if mascota else [])
             ],
+            "preferencias_alimentarias": list(mascota.preferencias) if mascota else [],
         },
         "archivos": {
             "receta_medica": receta.archivo if receta else None,
@@ -1,43 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
-from utils.db import get_db
-from utils.globals import PLATO
-from models import PlatoCombinado, Categoria, Especie, EtiquetaPlato, Etiqueta
-from slugify import slugify
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.db import get_async_db
+from utils.catalogo import catalogo
+from utils.buscador import indice_platos
+from utils.paginacion import codificar_cursor, decodificar_cursor
+from utils.metricas import RespuestaJSONMedida
+from utils.referencia import RAZAS_POR_DEFECTO, RAZAS_POR_ESPECIE, referencia
 
 router = APIRouter(
     prefix="/cliente/platos-mascotas",
     tags=["Cliente - Platos para Mascotas"]
 )
 
-# ---------------------------------------------------------------------------
-# 🖼️ Utilidad: construir URL completa para la imagen
-# ---------------------------------------------------------------------------
-def construir_url_imagen(request: Request, nombre_archivo: str | None):
-    """Construye una URL completa para acceder a la imagen."""
-    if not nombre_archivo:
-        return None
-    base = str(request.base_url).rstrip("/")
-    path = PLATO.strip("/")
-    return f"{base}/{path}/{nombre_archivo.lstrip('/')}"
-
-# ---------------------------------------------------------------------------
-# 🧩 Utilidad: convertir PlatoCombinado → dict JSON serializable
-# ---------------------------------------------------------------------------
-def plato_to_dict(p: PlatoCombinado, request: Request):
-    """Convierte un PlatoCombinado en un diccionario listo para JSON."""
-    return {
-        "id": str(p.id),
-        "nombre": p.nombre,
-        "descripcion": p.descripcion,
-        "precio": float(p.precio),
-        "imagen": construir_url_imagen(request, p.imagen),
-        "categoria": p.categoria.nombre if p.categoria else None,
-        "especie": p.especie.nombre if p.especie else None,
-        "etiquetas": [ep.etiqueta.nombre for ep in p.etiqueta_plato],
-    }
-
 # ---------------------------------------------------------------------------
 # 🥘 GET /cliente/platos-mascotas
 # ---------------------------------------------------------------------------
@@ -45,130 +19,83 @@ def plato_to_dict(p: PlatoCombinado, request: Request):
     "/", 
     summary="Listar platos con filtros por categoría, especie o etiquetas",
 )
-def listar_platos(
+async def listar_platos(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     categoria_id: str | None = Query(None, description="ID de la categoría"),
     especie_id: str | None = Query(None, description="ID de la especie"),
     etiquetas: list[str] | None = Query(None, description="IDs de etiquetas"),
     search: str | None = Query(None, description="Texto libre para búsqueda"),
+    limite: int | None = Query(None, ge=1, le=200, description="Tamaño de página (sin valor: todos)"),
+    cursor: str | None = Query(None, description="Cursor devuelto en X-Siguiente-Cursor"),
 ):
     """
     Lista platos combinados filtrando por:
     - categoría
     - especie
     - etiquetas (una o varias)
-    - texto libre (nombre o descripción)
+    - texto libre (nombre, etiquetas o descripción; sin distinguir tildes)
 
-    Solo devuelve platos activos y publicados.
+    Solo devuelve platos activos y publicados. Se sirve desde la caché del
+    catálogo (utils.catalogo). Con `search` los resultados vienen ordenados por
+    relevancia (utils.buscador). Si se indica `limite`, el cursor de la
+    siguiente página se devuelve en la cabecera `X-Siguiente-Cursor`.
     """
-    query = (
-        db.query(PlatoCombinado)
-        .options(
-            joinedload(PlatoCombinado.categoria),
-            joinedload(PlatoCombinado.especie),
-            joinedload(PlatoCombinado.etiqueta_plato).joinedload(EtiquetaPlato.etiqueta),
-        )
-        .filter(
-            PlatoCombinado.estado_registro == "A",
-            PlatoCombinado.publicado == 1,
-        )
+    relevancia = await indice_platos.buscar_async(db, search, solo_publicados=True) if search else None
+
+    despues_de = None
+    if cursor:
+        tipos = (float, int) if relevancia is not None else (int,)
+        despues_de = tuple(decodificar_cursor(cursor, *tipos))
+    platos, clave_ultimo = await catalogo.listar_async(
+        db,
+        str(request.base_url).rstrip("/"),
+        categoria_id=categoria_id,
+        especie_id=especie_id,
+        etiquetas=etiquetas,
+        relevancia=relevancia,
+        despues_de=despues_de,
+        limite=limite,
     )
-    print("📥 Filtros recibidos →", categoria_id, especie_id, etiquetas, search)
-    # Filtros combinados
-    if categoria_id:
-        query = query.filter(PlatoCombinado.categoria_id == categoria_id)
-    if especie_id:
-        query = query.filter(PlatoCombinado.especie_id == especie_id)
-    if etiquetas and len(etiquetas) > 0:
-        query = query.filter(
-            PlatoCombinado.etiqueta_plato.any(
-                EtiquetaPlato.etiqueta_id.in_(etiquetas)
-            )
-        )
-    if search:
-        search_like = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                PlatoCombinado.nombre.ilike(search_like),
-                PlatoCombinado.descripcion.ilike(search_like),
-                PlatoCombinado.etiqueta_plato.any(
-                    EtiquetaPlato.etiqueta.has(Etiqueta.nombre.ilike(search_like))
-                ),
-            )
-        )
-    platos = query.all()
-    return [plato_to_dict(p, request) for p in platos]
+    encabezados = {"X-Siguiente-Cursor": codificar_cursor(*clave_ultimo)} if clave_ultimo is not None else None
+    # Respuesta directa: los platos ya vienen listos para JSON (sin jsonable_encoder).
+    return RespuestaJSONMedida(platos, headers=encabezados)
 # ---------------------------------------------------------------------------
 # 🔍 GET /cliente/platos-mascotas/id/{plato_id}
 # ---------------------------------------------------------------------------
 @router.get("/id/{plato_id}", summary="Obtener detalles de un plato")
-def obtener_plato(plato_id: str, request: Request, db: Session = Depends(get_db)):
+async def obtener_plato(plato_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Devuelve la información detallada de un plato específico."""
-    plato = (
-        db.query(PlatoCombinado)
-        .options(
-            joinedload(PlatoCombinado.categoria),
-            joinedload(PlatoCombinado.especie),
-            joinedload(PlatoCombinado.etiqueta_plato).joinedload(EtiquetaPlato.etiqueta),
-        )
-        .filter(
-            PlatoCombinado.id == plato_id,
-            PlatoCombinado.estado_registro == "A",
-            PlatoCombinado.publicado == 1,
-        )
-        .first()
-    )
+    plato = await catalogo.obtener_async(db, plato_id, str(request.base_url).rstrip("/"))
 
     if not plato:
         raise HTTPException(status_code=404, detail="Plato no encontrado")
 
-    return plato_to_dict(plato, request)
+    return plato
 
 # ---------------------------------------------------------------------------
 # 📂 GET /cliente/platos-mascotas/categorias
 # ---------------------------------------------------------------------------
 @router.get("/categorias", summary="Listar categorías activas")
-def listar_categorias(db: Session = Depends(get_db)):
+async def listar_categorias(db: AsyncSession = Depends(get_async_db)):
     """Devuelve todas las categorías activas con slug."""
-    categorias = db.query(Categoria).filter(Categoria.estado_registro == "A").all()
-    return [
-        {
-            "id": str(c.id),
-            "nombre": c.nombre,
-            "descripcion": c.descripcion,
-            "slug": slugify(c.nombre, separator="-"),
-        }
-        for c in categorias
-    ]
+    return (await referencia.obtener_async(db)).datos["categorias"]
 
 # ---------------------------------------------------------------------------
 # 🧬 GET /cliente/platos-mascotas/especies
 # ---------------------------------------------------------------------------
 @router.get("/especies", summary="Listar especies (solo perros y gatos)")
-def listar_especies(db: Session = Depends(get_db)):
+async def listar_especies(db: AsyncSession = Depends(get_async_db)):
     """Devuelve las especies activas (solo Perros y Gatos)."""
-    especies = db.query(Especie).filter(Especie.estado_registro == "A").all()
-    return [{"id": str(e.id), "nombre": e.nombre} for e in especies]
+    return (await referencia.obtener_async(db)).datos["especies"]
 
 # ---------------------------------------------------------------------------
 # 🏷️ GET /cliente/platos-mascotas/etiquetas
 # ---------------------------------------------------------------------------
 @router.get("/etiquetas", summary="Listar etiquetas asociadas a platos publicados")
-def listar_etiquetas(db: Session = Depends(get_db)):
+async def listar_etiquetas(db: AsyncSession = Depends(get_async_db)):
     """Devuelve las etiquetas vinculadas a platos activos y publicados."""
-    etiquetas = (
-        db.query(Etiqueta)
-        .join(Etiqueta.etiqueta_plato)
-        .join(EtiquetaPlato.plato_combinado)
-        .filter(
-            PlatoCombinado.estado_registro == "A",
-            PlatoCombinado.publicado == 1,
-        )
-        .distinct()
-        .all()
-    )
-    return [{"id": str(e.id), "nombre": e.nombre} for e in etiquetas]
+    return (await referencia.obtener_async(db)).datos["etiquetas"]
 
 
 @router.get("/especies/{especie_id}/razas", summary="Listar razas por especie")
@@ -183,12 +110,5 @@ def listar_razas_por_especie(especie_id: str):
     except ValueError:
         raise HTTPException(status_code=400, detail="El ID de la especie debe ser un número.")
 
-    razas_perro = ["Mestizo", "Labrador Retriever", "Bulldog Francés", "Pastor Alemán", "Golden Retriever", "Chihuahua", "Beagle"]
-    razas_gato = ["Mestizo", "Siamés", "Persa", "Maine Coon", "Bengalí", "Ragdoll", "Esfinge"]
-
-    if especie_id_int == 1: # ID de Perro
-        return sorted(razas_perro)
-    elif especie_id_int == 2: # ID de Gato
-        return sorted(razas_gato)
-    else:
-        return ["No especificado"] # Para otras especies o si el ID es inválido
\ No newline at end of file
+    # Para otras especies o si el ID es inválido: ["No especificado"]
+    return RAZAS_POR_ESPECIE.get(especie_id_int, RAZAS_POR_DEFECTO)
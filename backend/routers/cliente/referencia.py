@@ -0,0 +1,43 @@
+"""
+RUTAS DEL CLIENTE – DATOS DE REFERENCIA
+---------------------------------------
+Todo lo que la app necesita para su primera pantalla (categorías, especies,
+etiquetas, razas y planes de suscripción) en una sola respuesta, servida desde
+la instantánea precomprimida de utils/referencia.py.
+"""
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.cache_http import CACHE_HTTP_MAX_AGE_SEGUNDOS, coincide_etag
+from utils.db import get_async_db
+from utils.referencia import referencia
+
+router = APIRouter(prefix="/cliente/referencia", tags=["Datos de Referencia"])
+
+
+# ---------------------------------------------------------------------------
+# GET /cliente/referencia
+# ---------------------------------------------------------------------------
+@router.get("/", summary="Datos de referencia para el arranque de la app")
+async def obtener_referencia(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Devuelve {"version", "categorias", "especies", "etiquetas", "razas",
+    "subscripciones"}; `razas` va indexado por ID de especie. Con
+    `If-None-Match: <ETag>` responde 304 si la versión no cambió.
+    """
+    instantanea = await referencia.obtener_async(db)
+    etag = f'W/"{instantanea.version}"'
+    encabezados = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CACHE_HTTP_MAX_AGE_SEGUNDOS}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and coincide_etag(if_none_match.encode(), etag.encode()):
+        return Response(status_code=304, headers=encabezados)
+
+    cuerpo, codificacion = instantanea.cuerpo(request.headers.get("accept-encoding", ""))
+    if codificacion is not None:
+        encabezados["Content-Encoding"] = codificacion
+    return Response(cuerpo, media_type="application/json", headers=encabezados)
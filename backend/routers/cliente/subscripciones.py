@@ -6,9 +6,11 @@ ver su suscripción activa y cancelar su membresía si lo desea.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Form # <--- IMPORTANTE: Se agregó Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from utils.db import get_db
+from utils.db import get_async_db, get_db
 from models import MembresiaSubscripcion, Cliente
+from utils.referencia import referencia
 
 router = APIRouter(prefix="/cliente/subscripciones", tags=["Subscripciones del Cliente"])
 
@@ -16,28 +18,11 @@ router = APIRouter(prefix="/cliente/subscripciones", tags=["Subscripciones del C
 # ---------------------------------------------------------------------------
 # GET /cliente/subscripciones
 # ---------------------------------------------------------------------------
-# Lista todos los planes de membresía activos disponibles.
+# Lista todos los planes de membresía activos disponibles. Se sirve desde la
+# instantánea de datos de referencia (utils.referencia), sin consultar la base.
 @router.get("/")
-def listar_planes_activos(db: Session = Depends(get_db)):
-    planes = db.query(MembresiaSubscripcion).filter(
-        MembresiaSubscripcion.estado_registro == "A"
-    ).all()
-    
-    resultado = []
-    for p in planes:
-        # Convertimos la cadena de beneficios en una lista si existe
-        lista_beneficios = p.beneficios.split(',') if p.beneficios else []
-        
-        resultado.append({
-            "id": str(p.id),
-            "nombre": p.nombre,
-            "duracion": p.duracion,
-            "precio": float(p.precio),
-            "descripcion": p.descripcion,
-            "beneficios": lista_beneficios
-        })
-    
-    return resultado
+async def listar_planes_activos(db: AsyncSession = Depends(get_async_db)):
+    return (await referencia.obtener_async(db)).datos["subscripciones"]
 
 
 # ---------------------------------------------------------------------------
@@ -5,11 +5,18 @@ Implementación completa de la lógica de negocio para nutricionistas.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Query
-from sqlalchemy.orm import Session, joinedload
-from models import Notificacion, RegistroMascota
-from datetime import datetime
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from models import RegistroMascota
+from datetime import datetime, timedelta
 from utils import keygen, globals
 from utils.db import get_db
+from utils.archivos import guardar_subida
+from utils.medios import medios
+from utils.buscador import indice_platos
+from utils.expediente import expedientes
+from utils.notificaciones import crear_notificacion, no_leidas
+from utils.paginacion import codificar_cursor, decodificar_cursor
 from models import (
     PedidoEspecializado, Pedido, Cliente, RegistroMascota, 
     AlergiaMascota, CondicionSalud, PreferenciaAlimentaria, 
@@ -45,28 +52,10 @@ class CrearMixSchema(BaseModel):
 @router.get("/items/buscar")
 def buscar_items_para_dieta(q: str = Query(..., min_length=2), db: Session = Depends(get_db)):
     """
-    Busca productos (platos existentes o ingredientes base) por nombre.
+    Busca productos (platos existentes o ingredientes base) por nombre,
+    etiquetas o descripción, ordenados por relevancia (utils.buscador).
     """
-    items = (
-        db.query(PlatoCombinado)
-        .filter(
-            PlatoCombinado.nombre.ilike(f"%{q}%"),
-            PlatoCombinado.estado_registro == "A"
-        )
-        .limit(10)
-        .all()
-    )
-    
-    return [
-        {
-            "id": str(i.id),
-            "nombre": i.nombre,
-            "precio": float(i.precio),
-            "categoria": i.categoria.nombre if i.categoria else "General",
-            "imagen": i.imagen
-        }
-        for i in items
-    ]
+    return indice_platos.buscar_resumenes(db, q, limite=10)
 
 # ---------------------------------------------------------------------------
 # POST /nutricionista/platos/mix
@@ -107,20 +96,19 @@ def crear_plato_mix(data: CrearMixSchema, db: Session = Depends(get_db)):
     mascota = db.query(RegistroMascota).filter(RegistroMascota.id == data.registro_mascota_id).first()
     
     if mascota:
-        nueva_notificacion = Notificacion(
-            id=keygen.generate_uint64_key(),
+        crear_notificacion(
+            db,
             cliente_id=mascota.cliente_id,
             titulo="¡Dieta Lista! 🥗",
             mensaje=f"El menú personalizado para {mascota.nombre} está listo. Toca aquí para ver y comprar.",
-            fecha=datetime.now(),
-            leido=0, # 0 = No leído
             tipo="DIETA_LISTA", # Tipo de acción para la App
-            referencia_id=str(mascota.id) # Guardamos el ID de la mascota para redirigir al perfil
+            referencia_id=mascota.id # Guardamos el ID de la mascota para redirigir al perfil
         )
-        db.add(nueva_notificacion)
 
     # Guardar todo (Plato, Link y Notificación)
     db.commit()
+    if mascota:
+        no_leidas.descartar(mascota.cliente_id)
 
     return {"mensaje": "Mix personalizado creado y notificación enviada.", "plato_id": str(mix_id)}
 
@@ -146,56 +134,184 @@ def listar_pedidos_pendientes(db: Session = Depends(get_db)):
         .all()
     )
 
-    resultado = []
-    for p in pedidos:
-        cliente = p.pedido.cliente
-        mascota = p.registro_mascota
-        
-        resultado.append({
-            "id": str(p.id), # ID de la solicitud (PedidoEspecializado)
-            "pedido_id": str(p.pedido_id),
-            "fecha": p.pedido.fecha.isoformat(),
-            "cliente": {
-                "nombre": cliente.nombre if cliente else "Desconocido",
-                "telefono": cliente.telefono if cliente else "",
-                "foto": cliente.foto
-            },
-            "mascota": {
-                "nombre": mascota.nombre if mascota else "Desconocido",
-                "especie": mascota.especie.nombre if mascota and mascota.especie else "",
-                "raza": mascota.raza if mascota else "",
-                "foto": mascota.foto
-            },
-            "objetivo": p.objetivo_dieta,
-            "frecuencia": p.frecuencia_cantidad,
-            "consulta_requerida": bool(p.consulta_nutricionista)
-        })
-
+    resultado = [solicitud_a_dict(p) for p in pedidos]
     return {"total": len(resultado), "solicitudes": resultado}
 
+
+def solicitud_a_dict(p: PedidoEspecializado) -> dict:
+    cliente = p.pedido.cliente
+    mascota = p.registro_mascota
+    return {
+        "id": str(p.id), # ID de la solicitud (PedidoEspecializado)
+        "pedido_id": str(p.pedido_id),
+        "fecha": p.pedido.fecha.isoformat(),
+        "cliente": {
+            "nombre": cliente.nombre if cliente else "Desconocido",
+            "telefono": cliente.telefono if cliente else "",
+            "foto": cliente.foto if cliente else None
+        },
+        "mascota": {
+            "nombre": mascota.nombre if mascota else "Desconocido",
+            "especie": mascota.especie.nombre if mascota and mascota.especie else "",
+            "raza": mascota.raza if mascota else "",
+            "foto": mascota.foto if mascota else None
+        },
+        "objetivo": p.objetivo_dieta,
+        "frecuencia": p.frecuencia_cantidad,
+        "consulta_requerida": bool(p.consulta_nutricionista)
+    }
+
+# ---------------------------------------------------------------------------
+# GET /nutricionista/pedidos/cola
+# ---------------------------------------------------------------------------
+# Cola de trabajo: solicitudes activas cuyo pedido sigue 'pendiente', de la más
+# a la menos prioritaria y, a igual prioridad, de la más antigua a la más nueva.
+# La prioridad es:
+#   2 si el cliente pidió consulta con nutricionista
+# + 1 si la solicitud lleva más de COLA_ESPERA_LARGA_HORAS esperando
+# Filtros opcionales: especie de la mascota, si requiere consulta y antigüedad
+# mínima/máxima en horas.
+#
+# La prioridad no se calcula en SQL: ordenar por una expresión (CASE) obligaba
+# a ordenar todas las solicitudes pendientes en cada página, sin índice que
+# sirviera. Cada nivel de prioridad es un filtro simple (consulta_nutricionista
+# = x y fecha antes o después del corte), así que se resuelve con una consulta
+# por nivel, hasta cuatro por página: cada una recorre pedido(estado, fecha) en
+# orden y llega a la solicitud por su índice único pedido_id. Se consultan los
+# niveles de mayor a menor hasta llenar la página; la prioridad de cada fila es
+# la de su nivel.
+#
+# Paginación por keyset sobre (prioridad, fecha, pedido_id). El cursor guarda
+# además el instante de referencia de la primera página, para que la prioridad
+# de una solicitud no cambie mientras se recorren las páginas.
+PAGINA_COLA = 50
+COLA_ESPERA_LARGA_HORAS = 24
+
+# (prioridad, consulta_nutricionista, espera larga), de mayor a menor prioridad.
+NIVELES_COLA = [(3, 1, True), (2, 1, False), (1, 0, True), (0, 0, False)]
+
+
+@router.get("/pedidos/cola")
+def listar_cola_trabajo(
+    especie_id: str | None = Query(None, description="Filtrar por especie de la mascota"),
+    requiere_consulta: bool | None = Query(None, description="Solo solicitudes que piden (o no) consulta"),
+    antiguedad_min_horas: int | None = Query(None, ge=0, description="Esperando al menos N horas"),
+    antiguedad_max_horas: int | None = Query(None, ge=0, description="Esperando como máximo N horas"),
+    limite: int = Query(PAGINA_COLA, ge=1, le=200, description="Solicitudes por página"),
+    cursor: str | None = Query(None, description="Cursor devuelto como siguiente_cursor"),
+    db: Session = Depends(get_db),
+):
+    prioridad_ultima = None
+    if cursor:
+        ahora, prioridad_ultima, fecha_ultima, id_ultimo = decodificar_cursor(
+            cursor, datetime.fromisoformat, int, datetime.fromisoformat, int
+        )
+    else:
+        ahora = datetime.now().replace(microsecond=0)
+    corte = ahora - timedelta(hours=COLA_ESPERA_LARGA_HORAS)
+
+    consulta = (
+        db.query(PedidoEspecializado)
+        .join(Pedido, Pedido.id == PedidoEspecializado.pedido_id)
+        .outerjoin(RegistroMascota, RegistroMascota.id == PedidoEspecializado.registro_mascota_id)
+        .options(
+            contains_eager(PedidoEspecializado.pedido).joinedload(Pedido.cliente),
+            contains_eager(PedidoEspecializado.registro_mascota).joinedload(RegistroMascota.especie),
+        )
+        .filter(PedidoEspecializado.estado_registro == "A", Pedido.estado == "pendiente")
+    )
+    if especie_id:
+        consulta = consulta.filter(RegistroMascota.especie_id == especie_id)
+    if antiguedad_min_horas is not None:
+        consulta = consulta.filter(Pedido.fecha <= ahora - timedelta(hours=antiguedad_min_horas))
+    if antiguedad_max_horas is not None:
+        consulta = consulta.filter(Pedido.fecha >= ahora - timedelta(hours=antiguedad_max_horas))
+
+    # Se pide una fila extra para saber si existe una página siguiente.
+    filas = []
+    for prioridad, consulta_nutricionista, espera_larga in NIVELES_COLA:
+        if len(filas) > limite:
+            break
+        if prioridad_ultima is not None and prioridad > prioridad_ultima:
+            continue
+        if requiere_consulta is not None and consulta_nutricionista != int(requiere_consulta):
+            continue
+        nivel = consulta.filter(
+            PedidoEspecializado.consulta_nutricionista == consulta_nutricionista,
+            Pedido.fecha <= corte if espera_larga else Pedido.fecha > corte,
+        )
+        if prioridad == prioridad_ultima:
+            nivel = nivel.filter(or_(
+                Pedido.fecha > fecha_ultima,
+                and_(Pedido.fecha == fecha_ultima, Pedido.id > id_ultimo),
+            ))
+        solicitudes = (
+            nivel.order_by(Pedido.fecha.asc(), Pedido.id.asc())
+            .limit(limite + 1 - len(filas))
+            .all()
+        )
+        filas.extend((p, prioridad) for p in solicitudes)
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    resultado = [{**solicitud_a_dict(p), "prioridad": prioridad_fila} for p, prioridad_fila in filas]
+    siguiente = None
+    if hay_mas:
+        ultima, prioridad_fila = filas[-1]
+        siguiente = codificar_cursor(ahora, prioridad_fila, ultima.pedido.fecha, ultima.pedido_id)
+    return {"total": len(resultado), "solicitudes": resultado, "siguiente_cursor": siguiente}
+
 @router.get("/pacientes")
-def listar_pacientes_con_historial(db: Session = Depends(get_db)):
+def listar_pacientes_con_historial(
+    limite: int | None = Query(None, ge=1, le=200, description="Pacientes por página (sin límite: lista completa)"),
+    cursor: str | None = Query(None, description="Cursor devuelto como siguiente_cursor"),
+    db: Session = Depends(get_db),
+):
     """
-    Lista las mascotas que ya han tenido al menos una consulta con nutricionista.
+    Lista las mascotas que ya han tenido al menos una consulta con nutricionista,
+    de la atendida más recientemente a la más antigua.
+
+    El total de consultas y la fecha de la última se calculan en SQL (GROUP BY
+    sobre `consulta`), sin traer las filas de las consultas. Con `limite`, la
+    lista se pagina por keyset sobre (ultima_atencion, id); sin él se devuelve
+    completa, como espera el panel web.
     """
-    # Buscamos mascotas que tengan relación con la tabla 'consulta'
-    pacientes = (
-        db.query(RegistroMascota)
-        .join(Consulta) # Esto filtra solo los que tienen consultas
+    historial = (
+        select(
+            Consulta.registro_mascota_id,
+            func.count().label("total_consultas"),
+            func.max(Consulta.fecha).label("ultima_atencion"),
+        )
+        .group_by(Consulta.registro_mascota_id)
+        .subquery()
+    )
+
+    consulta = (
+        db.query(RegistroMascota, historial.c.total_consultas, historial.c.ultima_atencion)
+        .join(historial, historial.c.registro_mascota_id == RegistroMascota.id)
         .options(
             joinedload(RegistroMascota.cliente),
             joinedload(RegistroMascota.especie),
-            joinedload(RegistroMascota.consulta) # Cargamos consultas para sacar la fecha de la última
         )
-        .distinct() # Evita duplicados si tiene muchas consultas
-        .all()
     )
+    if cursor:
+        fecha_ultima, id_ultimo = decodificar_cursor(cursor, datetime.fromisoformat, int)
+        consulta = consulta.filter(or_(
+            historial.c.ultima_atencion < fecha_ultima,
+            and_(historial.c.ultima_atencion == fecha_ultima, RegistroMascota.id < id_ultimo),
+        ))
+
+    consulta = consulta.order_by(historial.c.ultima_atencion.desc(), RegistroMascota.id.desc())
+    if limite is None:
+        filas, hay_mas = consulta.all(), False
+    else:
+        # Se pide una fila extra para saber si existe una página siguiente.
+        filas = consulta.limit(limite + 1).all()
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
 
     resultado = []
-    for p in pacientes:
-        # Obtener la fecha de la última consulta
-        ultima_consulta = max(p.consulta, key=lambda x: x.fecha) if p.consulta else None
-        
+    for p, total_consultas, ultima_atencion in filas:
         resultado.append({
             "id": str(p.id),
             "nombre": p.nombre,
@@ -203,11 +319,15 @@ def listar_pacientes_con_historial(db: Session = Depends(get_db)):
             "raza": p.raza,
             "foto": p.foto,
             "cliente": p.cliente.nombre if p.cliente else "Desconocido",
-            "total_consultas": len(p.consulta),
-            "ultima_atencion": ultima_consulta.fecha.isoformat() if ultima_consulta else None
+            "total_consultas": total_consultas,
+            "ultima_atencion": ultima_atencion.isoformat() if ultima_atencion else None
         })
 
-    return {"total": len(resultado), "pacientes": resultado}
+    siguiente = None
+    if hay_mas:
+        ultima, _, ultima_atencion = filas[-1]
+        siguiente = codificar_cursor(ultima_atencion, ultima.id)
+    return {"total": len(resultado), "pacientes": resultado, "siguiente_cursor": siguiente}
 
 # ---------------------------------------------------------------------------
 # GET /nutricionista/pedidos/{pedido_id}
@@ -223,7 +343,6 @@ def obtener_detalle_pedido_especializado(pedido_id: str, db: Session = Depends(g
         db.query(PedidoEspecializado)
         .options(
             joinedload(PedidoEspecializado.pedido).joinedload(Pedido.cliente),
-            joinedload(PedidoEspecializado.registro_mascota).joinedload(RegistroMascota.especie),
             joinedload(PedidoEspecializado.receta_medica),
         )
         .filter(PedidoEspecializado.id == pedido_id)
@@ -233,14 +352,12 @@ def obtener_detalle_pedido_especializado(pedido_id: str, db: Session = Depends(g
     if not pedido_esp:
         raise HTTPException(status_code=404, detail="Solicitud no encontrada.")
 
-    mascota = pedido_esp.registro_mascota
     pedido = pedido_esp.pedido
 
-    # 2. Cargar historial clínico detallado de la mascota
-    alergias = db.query(AlergiaMascota).options(joinedload(AlergiaMascota.alergia_especie)).filter(AlergiaMascota.registro_mascota_id == mascota.id).all()
-    condiciones = db.query(CondicionSalud).filter(CondicionSalud.registro_mascota_id == mascota.id).all()
-    preferencias = db.query(PreferenciaAlimentaria).filter(PreferenciaAlimentaria.registro_mascota_id == mascota.id).all()
-    desc_alergias = db.query(DescripcionAlergias).filter(DescripcionAlergias.registro_mascota_id == mascota.id).order_by(DescripcionAlergias.fecha.desc()).first()
+    # 2. Expediente clínico de la mascota (en caché por unos segundos)
+    mascota = expedientes.obtener(db, pedido_esp.registro_mascota_id)
+    if not mascota:
+        raise HTTPException(status_code=404, detail="La solicitud no tiene una mascota asociada.")
 
     # 3. Construir respuesta estructurada
     return {
@@ -264,21 +381,21 @@ def obtener_detalle_pedido_especializado(pedido_id: str, db: Session = Depends(g
         "mascota": {
             "id": str(mascota.id),
             "nombre": mascota.nombre,
-            "especie": mascota.especie.nombre if mascota.especie else "",
+            "especie": mascota.especie or "",
             "raza": mascota.raza,
             "edad": mascota.edad,
-            "peso": float(mascota.peso) if mascota.peso else 0,
+            "peso": mascota.peso or 0,
             "sexo": mascota.sexo,
             "foto": mascota.foto
         },
         "detalles_nutricionales": {
             "alergias": [
-                {"id": str(a.id), "alergia": a.alergia_especie.nombre, "severidad": a.severidad} 
-                for a in alergias if a.alergia_especie
+                {"id": a["id"], "alergia": a["alergia"], "severidad": a["severidad"]}
+                for a in mascota.alergias if a["alergia"]
             ],
-            "descripcion_alergias": desc_alergias.descripcion if desc_alergias else None,
-            "condiciones_salud": [c.nombre for c in condiciones],
-            "preferencias": [p.nombre for p in preferencias]
+            "descripcion_alergias": mascota.descripcion_alergias,
+            "condiciones_salud": [c["nombre"] for c in mascota.condiciones],
+            "preferencias": [p["nombre"] for p in mascota.preferencias]
         },
         "archivos": {
             "recetas": [r.archivo for r in pedido_esp.receta_medica]
@@ -353,13 +470,7 @@ def subir_receta_medica(
 
     # Guardar archivo
     uploads_dir = os.path.join("static", "uploads", "recetas")
-    os.makedirs(uploads_dir, exist_ok=True)
-    
-    filename = f"receta_{pedido_id}_{archivo.filename}"
-    file_path = os.path.join(uploads_dir, filename)
-    
-    with open(file_path, "wb") as f:
-        f.write(archivo.file.read())
+    file_path = guardar_subida(archivo, uploads_dir, f"receta_{pedido_id}_{archivo.filename}").ruta
 
     # Crear registro en BD
     nueva_receta = RecetaMedica(
@@ -397,11 +508,7 @@ def crear_plato_personalizado(
     
     imagen_path = None
     if imagen:
-        uploads_dir = os.path.join("static", "uploads", "platos_personalizados")
-        os.makedirs(uploads_dir, exist_ok=True)
-        imagen_path = os.path.join(uploads_dir, f"plato_{plato_id}_{imagen.filename}")
-        with open(imagen_path, "wb") as f:
-            f.write(imagen.file.read())
+        imagen_path = medios.guardar(imagen)
 
     nuevo_plato = PlatoCombinado(
         id=plato_id,
@@ -467,33 +574,68 @@ def listar_platos_personalizados(mascota_id: str, db: Session = Depends(get_db))
 # ---------------------------------------------------------------------------
 # GET /nutricionista/historial
 # ---------------------------------------------------------------------------
+PAGINA_HISTORIAL = 50
+
+
 @router.get("/historial")
-def listar_historial_revisiones(db: Session = Depends(get_db)):
+def listar_historial_revisiones(
+    nutricionista_id: str | None = Query(None, description="Solo consultas de este nutricionista"),
+    desde: datetime | None = Query(None, description="Consultas desde esta fecha (inclusive)"),
+    hasta: datetime | None = Query(None, description="Consultas anteriores a esta fecha"),
+    limite: int = Query(PAGINA_HISTORIAL, ge=1, le=200, description="Consultas por página"),
+    cursor: str | None = Query(None, description="Cursor devuelto como siguiente_cursor"),
+    db: Session = Depends(get_db),
+):
     """
-    Lista el historial de consultas realizadas por los nutricionistas.
+    Lista el historial de consultas realizadas por los nutricionistas, de la más
+    reciente a la más antigua. Paginación por keyset sobre (fecha, id).
+
+    Solo se leen las columnas que se muestran (sin cargar objetos ORM); el
+    filtro por nutricionista y fecha usa el índice consulta(nutricionista_id, fecha).
     """
-    consultas = (
-        db.query(Consulta)
-        .options(
-            joinedload(Consulta.registro_mascota).joinedload(RegistroMascota.cliente),
-            joinedload(Consulta.nutricionista)
+    consulta = (
+        select(
+            Consulta.id,
+            Consulta.fecha,
+            Consulta.observaciones,
+            RegistroMascota.nombre.label("mascota"),
+            Cliente.nombre.label("cliente"),
+            Nutricionista.nombre.label("nutricionista"),
         )
-        .order_by(Consulta.fecha.desc())
-        .all()
+        .outerjoin(RegistroMascota, RegistroMascota.id == Consulta.registro_mascota_id)
+        .outerjoin(Cliente, Cliente.id == RegistroMascota.cliente_id)
+        .outerjoin(Nutricionista, Nutricionista.id == Consulta.nutricionista_id)
     )
+    if nutricionista_id:
+        consulta = consulta.where(Consulta.nutricionista_id == nutricionista_id)
+    if desde:
+        consulta = consulta.where(Consulta.fecha >= desde)
+    if hasta:
+        consulta = consulta.where(Consulta.fecha < hasta)
+    if cursor:
+        fecha_ultima, id_ultimo = decodificar_cursor(cursor, datetime.fromisoformat, int)
+        consulta = consulta.where(or_(
+            Consulta.fecha < fecha_ultima,
+            and_(Consulta.fecha == fecha_ultima, Consulta.id < id_ultimo),
+        ))
+
+    # Se pide una fila extra para saber si existe una página siguiente.
+    filas = db.execute(
+        consulta.order_by(Consulta.fecha.desc(), Consulta.id.desc()).limit(limite + 1)
+    ).all()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
 
     resultado = []
-    for c in consultas:
-        mascota = c.registro_mascota
-        cliente = mascota.cliente if mascota else None
-        
+    for c in filas:
         resultado.append({
             "consulta_id": str(c.id),
             "fecha": c.fecha.isoformat(),
-            "mascota": mascota.nombre if mascota else "Desconocido",
-            "cliente": cliente.nombre if cliente else "Desconocido",
+            "mascota": c.mascota or "Desconocido",
+            "cliente": c.cliente or "Desconocido",
             "observaciones": c.observaciones,
-            "nutricionista": c.nutricionista.nombre if c.nutricionista else "Sin asignar"
+            "nutricionista": c.nutricionista or "Sin asignar"
         })
 
-    return {"total": len(resultado), "historial": resultado}
\ No newline at end of file
+    siguiente = codificar_cursor(filas[-1].fecha, filas[-1].id) if hay_mas else None
+    return {"total": len(resultado), "historial": resultado, "siguiente_cursor": siguiente}
@@ -17,10 +17,15 @@ Notas:
     * 0 → Pendiente o devuelto
 - Solo el repartidor autenticado puede acceder o modificar sus propios pedidos.
 """
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, Session
 from fastapi import APIRouter, Depends, HTTPException
 from utils import keygen
-from utils.db import get_db
+from utils.db import get_db, get_async_db
+from utils.metricas import RespuestaJSONMedida
+from utils.detalle_pedido import DetallePedidoRepartidor, construir_detalle
+from models import ControlEntrega, DetallePedido, Pedido, Repartidor
 from datetime import datetime
 router = APIRouter(prefix="/repartidor", tags=["Repartidor"])
 
@@ -31,26 +36,27 @@ router = APIRouter(prefix="/repartidor", tags=["Repartidor"])
 # Incluye cliente, dirección, estado y fecha del pedido.
 # Si el repartidor no existe o no tiene pedidos pendientes, retorna un mensaje informativo.
 @router.get("/{repartidor_id}/pedidos")
-def listar_pedidos_asignados(
+async def listar_pedidos_asignados(
     repartidor_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Verificar si el repartidor existe
-    repartidor = db.query(Repartidor).filter(Repartidor.id == repartidor_id).first()
+    repartidor = await db.scalar(select(Repartidor).where(Repartidor.id == repartidor_id))
     if not repartidor:
         raise HTTPException(status_code=404, detail="Repartidor no encontrado.")
     entregas = (
-        db.query(ControlEntrega)
-        .join(ControlEntrega.pedido)
-        .options(
-            joinedload(ControlEntrega.pedido).joinedload(Pedido.cliente),
-            joinedload(ControlEntrega.pedido).joinedload(Pedido.direccion)
+        await db.scalars(
+            select(ControlEntrega)
+            .join(ControlEntrega.pedido)
+            .options(
+                joinedload(ControlEntrega.pedido).joinedload(Pedido.cliente),
+                joinedload(ControlEntrega.pedido).joinedload(Pedido.direccion)
+            )
+            .where(ControlEntrega.repartidor_id == repartidor_id)
+            .where(ControlEntrega.confirmacion_entrega == 0)
+            .order_by(Pedido.fecha.asc())
         )
-        .filter(ControlEntrega.repartidor_id == repartidor_id)
-        .filter(ControlEntrega.confirmacion_entrega == 0) 
-        .order_by(Pedido.fecha.asc())
-        .all()
-    )
+    ).all()
     if not entregas:
         return {"mensaje": "No hay pedidos pendientes asignados a este repartidor."}
     pedidos = []
@@ -60,9 +66,9 @@ def listar_pedidos_asignados(
         direccion = pedido.direccion if pedido else None
         pedidos.append({
             "pedido_id": str(pedido.id),
-            "fecha_pedido": pedido.fecha.isoformat(),
+            "fecha_pedido": pedido.fecha,
             "estado_pedido": pedido.estado,
-            "total": float(pedido.total),
+            "total": pedido.total,
             "cliente": {
                 "id": str(cliente.id),
                 "nombre": cliente.nombre,
@@ -71,11 +77,12 @@ def listar_pedidos_asignados(
             "direccion": {
                 "nombre": direccion.nombre if direccion else None,
                 "referencia": direccion.referencia if direccion else None,
-                "latitud": float(direccion.latitud) if direccion else None,
-                "longitud": float(direccion.longitud) if direccion else None,
+                "latitud": direccion.latitud,
+                "longitud": direccion.longitud,
             } if direccion else None,
         })
-    return {
+    # Fechas y decimales van tal cual: los serializa RespuestaJSONMedida, sin jsonable_encoder.
+    return RespuestaJSONMedida({
         "repartidor": {
             "id": str(repartidor.id),
             "nombre": repartidor.nombre,
@@ -83,14 +90,14 @@ def listar_pedidos_asignados(
         },
         "total_pedidos_pendientes": len(pedidos),
         "pedidos": pedidos,
-    }
+    })
 
 # ---------------------------------------------------------------------------
 # GET /repartidor/pedidos/{pedido_id}
 # ---------------------------------------------------------------------------
 # Devuelve los detalles de un pedido asignado al repartidor.
 # Incluye cliente, dirección, platos, total y confirmación de entrega.
-@router.get("/pedidos/{pedido_id}")
+@router.get("/pedidos/{pedido_id}", response_model=DetallePedidoRepartidor)
 def obtener_detalle_pedido_asignado(
     pedido_id: str,
     db: Session = Depends(get_db),
@@ -115,45 +122,12 @@ def obtener_detalle_pedido_asignado(
     pedido = control.pedido
     if not pedido:
         raise HTTPException(status_code=404, detail="Pedido no encontrado en la base de datos.")
-    cliente = pedido.cliente
-    direccion = pedido.direccion
-    repartidor = control.repartidor
-    platos_info = []
-    for det in pedido.detalle_pedido:
-        platos_info.append({
-            "id": str(det.id),
-            "plato": det.plato_combinado.nombre if det.plato_combinado else None,
-            "cantidad": det.cantidad,
-            "subtotal": float(det.subtotal),
-        })
-    respuesta = {
-        "pedido": {
-            "id": str(pedido.id),
-            "fecha": pedido.fecha.isoformat(),
-            "total": float(pedido.total),
-            "estado": pedido.estado,
-            "confirmacion_entrega": bool(control.confirmacion_entrega),
-        },
-        "cliente": {
-            "id": str(cliente.id),
-            "nombre": cliente.nombre,
-            "telefono": cliente.telefono,
-        } if cliente else None,
-        "direccion": {
-            "id": str(direccion.id),
-            "nombre": direccion.nombre,
-            "referencia": direccion.referencia,
-            "latitud": float(direccion.latitud),
-            "longitud": float(direccion.longitud),
-        } if direccion else None,
-        "platos": platos_info,
-        "repartidor": {
-            "id": str(repartidor.id),
-            "nombre": repartidor.nombre,
-            "telefono": repartidor.telefono,
-        } if repartidor else None,
-    }
-    return respuesta
+    return RespuestaJSONMedida(construir_detalle(
+        DetallePedidoRepartidor,
+        pedido,
+        cabecera_extra={"confirmacion_entrega": control.confirmacion_entrega},
+        repartidor=control.repartidor,
+    ))
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,140 @@
+#tests/conftest.py
+"""
+Las pruebas se ejecutan desde la carpeta backend (`python -m pytest -q`), con
+los mismos imports que la app (`from utils.db import ...`).
+
+La app se prueba contra una base SQLite temporal, con el esquema de
+`bench.datos.crear_esquema` y unos pocos datos fijos (`datos`). Las URLs se
+fijan antes de importar cualquier módulo de la app: utils.db las lee al
+importarse.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+# main.py monta `static` con una ruta relativa.
+os.chdir(BACKEND)
+
+_BASE_PRUEBAS = os.path.join(tempfile.mkdtemp(prefix="pawpals-tests-"), "pruebas.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BASE_PRUEBAS}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_BASE_PRUEBAS}"
+os.environ["CARRITO_STORE"] = "memoria"
+os.environ.setdefault("LOG_NIVEL", "WARNING")
+
+AHORA = datetime(2026, 1, 15, 12, 0, 0)
+
+
+def _sembrar(db):
+    from models import (
+        Categoria, Cliente, ControlEntrega, CuentaUsuario, DetallePedido, Direccion, Especie, Etiqueta,
+        EtiquetaPlato, MembresiaSubscripcion, Pago, PasarelaPago, Pedido, PlatoCombinado, Repartidor,
+    )
+
+    db.add_all([
+        Categoria(id=1, nombre="Platos caseros", descripcion="Comida casera", estado_registro="A"),
+        Categoria(id=2, nombre="Postres", descripcion=None, estado_registro="A"),
+        Especie(id=1, nombre="Perro", estado_registro="A"),
+        Especie(id=2, nombre="Gato", estado_registro="A"),
+        Etiqueta(id=1, nombre="Alto en proteína"),
+        MembresiaSubscripcion(id=1, nombre="Mensual", duracion=30, precio=Decimal("19.90"),
+                              estado_registro="A", descripcion="Plan base", beneficios="Envío gratis,Descuentos"),
+        CuentaUsuario(id=1, correo_electronico="ana@example.com", estado_registro="A"),
+        CuentaUsuario(id=2, correo_electronico="luis@example.com", estado_registro="A"),
+        PasarelaPago(id=1, nombre="Yape", estado_registro="A"),
+    ])
+    db.flush()
+    db.add_all([
+        PlatoCombinado(
+            id=i, nombre=f"Plato {i}", precio=Decimal("19.99") + i, incluye_plato=1, es_crudo=0,
+            publicado=1, creado_nutricionista=0, estado_registro="A",
+            categoria_id=1 if i % 2 else 2, especie_id=1, imagen=f"plato_{i}.png",
+        )
+        for i in range(1, 8)
+    ])
+    db.add_all([
+        Cliente(id=1, cuenta_usuario_id=1, nombre="Ana", telefono="999111222", estado_registro="A"),
+        Repartidor(id=1, cuenta_usuario_id=2, nombre="Luis", telefono="988777666", estado_registro="A"),
+    ])
+    db.flush()
+    db.add_all([
+        EtiquetaPlato(id=1, plato_combinado_id=1, etiqueta_id=1),
+        EtiquetaPlato(id=2, plato_combinado_id=4, etiqueta_id=1),
+        Direccion(id=1, cliente_id=1, nombre="Casa", referencia="Frente al parque",
+                  latitud=Decimal("-12.05"), longitud=Decimal("-77.04"), es_principal=1, estado_registro="A"),
+    ])
+    db.flush()
+    db.add(Pedido(id=1, cliente_id=1, direccion_id=1, fecha=AHORA, total=Decimal("64.97"),
+                  incluye_plato=1, estado="asignado"))
+    db.flush()
+    db.add_all([
+        DetallePedido(id=1, pedido_id=1, plato_combinado_id=1, cantidad=2, subtotal=Decimal("41.98")),
+        DetallePedido(id=2, pedido_id=1, plato_combinado_id=3, cantidad=1, subtotal=Decimal("22.99")),
+        Pago(id=1, pedido_id=1, monto=Decimal("64.97"), fecha=AHORA + timedelta(minutes=5),
+             estado="aprobado", pasarela_pago_id=1, referencia_pago="OP-1"),
+        ControlEntrega(id=1, pedido_id=1, repartidor_id=1, fecha_entrega=AHORA + timedelta(hours=2),
+                       confirmacion_entrega=0),
+    ])
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def datos():
+    """Crea el esquema y los datos fijos una vez por sesión."""
+    # Mismo esquema que los benchmarks (índices con nombre único en SQLite).
+    from bench.datos import crear_esquema
+    from utils.db import SessionLocal, engine
+
+    crear_esquema(engine)
+    with SessionLocal() as db:
+        _sembrar(db)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db(datos):
+    from utils.db import SessionLocal
+
+    with SessionLocal() as sesion:
+        yield sesion
+
+
+@pytest.fixture
+def sentencias(datos):
+    """Lista de las sentencias SQL que ejecutan ambos motores (síncrono y asíncrono) durante la prueba."""
+    from sqlalchemy import event
+
+    from utils.db import async_engine, engine
+
+    ejecutadas = []
+
+    def registrar(conexion, cursor, sql, *args):
+        ejecutadas.append(sql)
+
+    motores = (engine, async_engine.sync_engine)
+    for motor in motores:
+        event.listen(motor, "before_cursor_execute", registrar)
+    yield ejecutadas
+    for motor in motores:
+        event.remove(motor, "before_cursor_execute", registrar)
+
+
+@pytest.fixture(scope="session")
+def app(datos):
+    import main
+
+    return main.app
+
+
+@pytest.fixture
+def cliente(app):
+    """TestClient sin lifespan: las cachés se cargan en la primera petición."""
+    from fastapi.testclient import TestClient
+
+    return TestClient(app)
@@ -0,0 +1,75 @@
+#tests/test_archivos.py
+"""Guardado de subidas por trozos (utils.archivos)."""
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from utils import archivos
+from utils.archivos import guardar_subida, nombre_seguro
+
+
+def subida(contenido: bytes, nombre: str = "foto.png") -> UploadFile:
+    return UploadFile(file=io.BytesIO(contenido), filename=nombre)
+
+
+class ArchivoContado(io.BytesIO):
+    """BytesIO que anota el tamaño de cada lectura."""
+
+    def __init__(self, contenido: bytes):
+        super().__init__(contenido)
+        self.lecturas = []
+
+    def read(self, tamano=-1):
+        self.lecturas.append(tamano)
+        return super().read(tamano)
+
+
+def test_guarda_con_tamano_y_sha256(tmp_path):
+    contenido = b"\x89PNG" + bytes(range(256)) * 10
+    guardado = guardar_subida(subida(contenido), str(tmp_path / "fotos"), "foto.png")
+    assert guardado.ruta == str(tmp_path / "fotos" / "foto.png")
+    assert guardado.tamano == len(contenido)
+    assert guardado.sha256 == hashlib.sha256(contenido).hexdigest()
+    assert (tmp_path / "fotos" / "foto.png").read_bytes() == contenido
+    assert [p.name for p in (tmp_path / "fotos").iterdir()] == ["foto.png"]
+
+
+def test_lee_por_trozos_desde_el_inicio(tmp_path, monkeypatch):
+    monkeypatch.setattr(archivos, "TROZO", 4)
+    archivo = ArchivoContado(b"0123456789")
+    archivo.read(3)  # ya leído en parte (p. ej. para validar el tipo)
+    archivo.lecturas.clear()
+    guardado = guardar_subida(UploadFile(file=archivo, filename="x.bin"), str(tmp_path), "x.bin")
+    assert guardado.tamano == 10
+    assert archivo.lecturas == [4, 4, 4, 4]
+
+
+def test_excede_el_maximo_da_413_sin_dejar_nada(tmp_path, monkeypatch):
+    monkeypatch.setattr(archivos, "TROZO", 4)
+    with pytest.raises(HTTPException) as error:
+        guardar_subida(subida(b"x" * 11), str(tmp_path), "grande.bin", tamano_max=10)
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_justo_en_el_maximo(tmp_path):
+    assert guardar_subida(subida(b"x" * 10), str(tmp_path), "justo.bin", tamano_max=10).tamano == 10
+
+
+def test_reemplaza_el_archivo_anterior(tmp_path):
+    guardar_subida(subida(b"viejo"), str(tmp_path), "a.txt")
+    guardar_subida(subida(b"nuevo"), str(tmp_path), "a.txt")
+    assert (tmp_path / "a.txt").read_bytes() == b"nuevo"
+
+
+@pytest.mark.parametrize("nombre, esperado", [
+    ("receta.pdf", "receta.pdf"),
+    ("../../main.py", "_.._main.py"),
+    ("..\\x.png", "_x.png"),
+    ("...", "archivo"),
+    (".env", "env"),
+])
+def test_nombre_seguro(nombre, esperado):
+    assert nombre_seguro(nombre) == esperado
@@ -0,0 +1,105 @@
+#tests/test_buscador.py
+"""Índice invertido de platos (utils.buscador)."""
+from decimal import Decimal
+
+import pytest
+
+from models import PlatoCombinado
+from utils.buscador import FACTOR_PREFIJO, PESO_DESCRIPCION, PESO_ETIQUETA, PESO_NOMBRE, IndicePlatos, indice_platos, normalizar
+
+
+@pytest.fixture
+def plato_temporal(db):
+    """Crea (y al final borra) un plato activo sin publicar."""
+    creados = []
+
+    def crear(id, nombre, descripcion=None, publicado=0):
+        plato = PlatoCombinado(
+            id=id, nombre=nombre, descripcion=descripcion, precio=Decimal("10.00"), incluye_plato=1,
+            es_crudo=0, publicado=publicado, creado_nutricionista=0, estado_registro="A", categoria_id=1,
+        )
+        db.add(plato)
+        db.commit()
+        creados.append(id)
+        return plato
+
+    yield crear
+    for id in creados:
+        db.delete(db.get(PlatoCombinado, id))
+    db.commit()
+
+
+def test_normalizar_quita_tildes_y_puntuacion():
+    assert normalizar("Atún con POLLO, ¡y arroz!") == ["atun", "con", "pollo", "y", "arroz"]
+    assert normalizar(None) == []
+
+
+def test_pesos_por_campo_y_prefijo(db):
+    indice = IndicePlatos()
+    # Nombre exacto.
+    assert indice.buscar(db, "Plato 3") == {3: PESO_NOMBRE * 2}
+    # Etiqueta "Alto en proteína" de los platos 1 y 4, por prefijo y sin tilde.
+    assert indice.buscar(db, "protein") == {1: PESO_ETIQUETA * FACTOR_PREFIJO, 4: PESO_ETIQUETA * FACTOR_PREFIJO}
+    assert indice.buscar(db, "proteína") == {1: PESO_ETIQUETA, 4: PESO_ETIQUETA}
+
+
+def test_todas_las_palabras_deben_coincidir(db):
+    indice = IndicePlatos()
+    assert set(indice.buscar(db, "plato proteina")) == {1, 4}
+    assert indice.buscar(db, "plato inexistente") == {}
+
+
+def test_palabras_vacias(db):
+    indice = IndicePlatos()
+    # "de" se ignora si hay otras palabras; sola, se busca tal cual.
+    assert set(indice.buscar(db, "plato de")) == set(range(1, 8))
+    assert indice.buscar(db, "de") == {}
+    assert indice.buscar(db, "  ¡! ") == {}
+
+
+def test_descripcion_y_solo_publicados(db, plato_temporal):
+    plato_temporal(60, "Mix casero", descripcion="Con zanahoria rallada")
+    indice = IndicePlatos()
+    assert indice.buscar(db, "zanahoria") == {60: PESO_DESCRIPCION}
+    assert indice.buscar(db, "zanahoria", solo_publicados=True) == {}
+
+
+def test_actualizacion_incremental_tras_commit(db, plato_temporal):
+    assert indice_platos.buscar(db, "calabaza") == {}
+    plato = plato_temporal(61, "Calabaza asada")
+    assert indice_platos.buscar(db, "calabaza") == {61: PESO_NOMBRE}
+
+    plato.nombre = "Camote asado"
+    db.commit()
+    assert indice_platos.buscar(db, "calabaza") == {}
+    assert indice_platos.buscar(db, "camote") == {61: PESO_NOMBRE}
+
+    plato.estado_registro = "I"
+    db.commit()
+    assert indice_platos.buscar(db, "camote") == {}
+
+
+def test_consulta_fallida_reencola_el_trabajo(db, plato_temporal, monkeypatch):
+    indice_platos.buscar(db, "plato")
+    plato_temporal(62, "Quinua")
+
+    def fallar(*args, **kwargs):
+        raise RuntimeError("sin conexión")
+
+    monkeypatch.setattr(db, "scalars", fallar)
+    with pytest.raises(RuntimeError):
+        indice_platos.buscar(db, "quinua")
+    monkeypatch.undo()
+    assert indice_platos.buscar(db, "quinua") == {62: PESO_NOMBRE}
+
+
+def test_buscar_resumenes_por_relevancia(db):
+    resumenes = IndicePlatos().buscar_resumenes(db, "plato proteina", limite=1)
+    assert resumenes == [{"id": "1", "nombre": "Plato 1", "precio": 20.99, "categoria": "Platos caseros",
+                          "imagen": "plato_1.png"}]
+
+
+def test_busqueda_del_nutricionista(cliente):
+    r = cliente.get("/nutricionista/items/buscar", params={"q": "plato 4"})
+    assert r.status_code == 200
+    assert [p["id"] for p in r.json()] == ["4"]
@@ -0,0 +1,107 @@
+#tests/test_cache_http.py
+"""ETag / Cache-Control / 304 (utils.cache_http)."""
+import pytest
+
+from models import Especie
+from utils.cache_http import calcular_etag, coincide_etag
+from utils.catalogo import catalogo
+from utils.medios import medios
+
+
+@pytest.mark.parametrize("if_none_match, esperado", [
+    (b'W/"ab12"', True),
+    (b'"ab12"', True),
+    (b'"otro", W/"ab12"', True),
+    (b"*", True),
+    (b'W/"ab13"', False),
+])
+def test_coincide_etag_es_debil(if_none_match, esperado):
+    assert coincide_etag(if_none_match, b'W/"ab12"') is esperado
+
+
+def test_etag_es_un_resumen_del_cuerpo():
+    assert calcular_etag(b'{"a":1}') == calcular_etag(b'{"a":1}')
+    assert calcular_etag(b'{"a":1}') != calcular_etag(b'{"a":2}')
+    assert calcular_etag(b"").startswith(b'W/"')
+
+
+def test_etag_y_304(cliente):
+    r = cliente.get("/cliente/platos-mascotas/categorias")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag.startswith('W/"')
+    assert r.headers["cache-control"].startswith("public, max-age=")
+
+    r = cliente.get("/cliente/platos-mascotas/categorias", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    assert cliente.get("/cliente/platos-mascotas/categorias", headers={"If-None-Match": 'W/"viejo"'}).status_code == 200
+
+
+def test_304_no_consulta_la_base(cliente, sentencias):
+    etag = cliente.get("/cliente/platos-mascotas/id/1").headers["etag"]
+    sentencias.clear()
+    assert cliente.get("/cliente/platos-mascotas/id/1", headers={"If-None-Match": etag}).status_code == 304
+    assert sentencias == []
+
+
+def test_etag_cambia_solo_si_cambia_el_cuerpo(cliente, db):
+    etag = cliente.get("/cliente/platos-mascotas/especies").headers["etag"]
+    especie = db.get(Especie, 2)
+    # La descripción no sale en la respuesta: mismo cuerpo, mismo ETag.
+    especie.descripcion = "Felinos"
+    db.commit()
+    r = cliente.get("/cliente/platos-mascotas/especies", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    especie.nombre = "Felino"
+    db.commit()
+    try:
+        r = cliente.get("/cliente/platos-mascotas/especies", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+    finally:
+        especie.nombre = "Gato"
+        especie.descripcion = None
+        db.commit()
+
+
+def test_etag_no_depende_del_proceso(cliente):
+    # Los mismos datos recargados (p. ej. en otro worker) dan el mismo ETag.
+    ruta = "/cliente/platos-mascotas/id/2"
+    etag = cliente.get(ruta).headers["etag"]
+    catalogo.invalidar()
+    assert cliente.get(ruta).headers["etag"] == etag
+
+
+def test_etag_cambia_con_las_variantes_de_imagen(cliente, monkeypatch):
+    ruta = "/cliente/platos-mascotas/id/3"
+    r = cliente.get(ruta)
+    assert r.json()["imagen_variantes"]["miniatura"] == r.json()["imagen"]
+
+    # Terminó la generación en segundo plano: las variantes tienen su propia URL.
+    rutas = medios.rutas
+    monkeypatch.setattr(medios, "rutas", lambda original: {k: f"{v}.webp" for k, v in rutas(original).items()})
+    nueva = cliente.get(ruta, headers={"If-None-Match": r.headers["etag"]})
+    assert nueva.status_code == 200
+    assert nueva.json()["imagen_variantes"]["miniatura"].endswith(".webp")
+
+
+def test_planes_se_sirven_de_la_instantanea(cliente, sentencias):
+    etag = cliente.get("/cliente/subscripciones/").headers["etag"]
+    sentencias.clear()
+    assert cliente.get("/cliente/subscripciones/", headers={"If-None-Match": etag}).status_code == 304
+    assert sentencias == []
+
+
+def test_etag_depende_del_host(cliente):
+    ruta = "/cliente/platos-mascotas/id/1"
+    assert cliente.get(ruta).headers["etag"] != cliente.get(ruta, headers={"Host": "otro.example"}).headers["etag"]
+
+
+def test_sin_etag_en_otras_rutas_ni_en_errores(cliente):
+    assert "etag" not in cliente.get("/cliente/pedido/detalle/1").headers
+    r = cliente.get("/cliente/platos-mascotas/id/999")
+    assert r.status_code == 404
+    assert "etag" not in r.headers
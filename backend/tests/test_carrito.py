@@ -0,0 +1,89 @@
+#tests/test_carrito.py
+"""Rutas del carrito con el almacén en memoria."""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from migraciones import m0007_carritos_antiguos
+from models import DetallePedido, Pedido
+from utils.carrito_store import carrito_store, crear_store
+from utils.db import engine
+
+
+def test_precio_en_centavos_sin_truncar(cliente):
+    carrito_store.vaciar("1")
+    # Plato 1 cuesta 20.99: int(20.99 * 100) daría 2098 con un float.
+    r = cliente.post("/cliente/carrito/agregar", json={"cliente_id": "1", "plato_id": "1", "cantidad": 3})
+    assert r.json()["total_carrito"] == 62.97
+    assert carrito_store.obtener("1")["lineas"] == {"1": (3, 6297)}
+    carrito_store.vaciar("1")
+
+
+def test_checkout_vacia_el_carrito(cliente):
+    carrito_store.vaciar("1")
+    cliente.post("/cliente/carrito/agregar", json={"cliente_id": "1", "plato_id": "2", "cantidad": 2})
+    r = cliente.post("/cliente/carrito/1/checkout", json={"direccion_id": "1"})
+    assert r.status_code == 200
+    assert r.json()["total"] == 43.98
+    assert carrito_store.obtener("1") == {"lineas": {}, "total": 0}
+    assert cliente.post("/cliente/carrito/1/checkout", json={"direccion_id": "1"}).status_code == 400
+
+
+def test_checkout_fallido_devuelve_las_lineas(cliente):
+    carrito_store.vaciar("1")
+    carrito_store.agregar("1", "999", 1, 1000)  # plato que ya no existe
+    r = cliente.post("/cliente/carrito/1/checkout", json={"direccion_id": "1"})
+    assert r.status_code == 404
+    assert carrito_store.obtener("1") == {"lineas": {"999": (1, 1000)}, "total": 1000}
+    carrito_store.vaciar("1")
+
+
+def test_checkout_con_direccion_ajena_no_toca_el_carrito(cliente):
+    carrito_store.vaciar("1")
+    carrito_store.agregar("1", "2", 1, 2199)
+    assert cliente.post("/cliente/carrito/1/checkout", json={"direccion_id": "77"}).status_code == 400
+    assert carrito_store.obtener("1")["total"] == 2199
+    carrito_store.vaciar("1")
+
+
+def test_agregar_con_cliente_inexistente(cliente):
+    r = cliente.post("/cliente/carrito/agregar", json={"cliente_id": "77", "plato_id": "1"})
+    assert r.status_code == 404
+    assert carrito_store.obtener("77") == {"lineas": {}, "total": 0}
+
+
+def test_ver_carrito_quita_platos_inexistentes(cliente):
+    carrito_store.vaciar("1")
+    carrito_store.agregar("1", "2", 2, 4398)
+    carrito_store.agregar("1", "999", 1, 1000)
+    cuerpo = cliente.get("/cliente/carrito/1").json()
+    assert cuerpo["total"] == 43.98
+    assert [(i["detalle_id"], i["plato_id"], i["cantidad"], i["subtotal"]) for i in cuerpo["items"]] == [
+        ("2", "2", 2, 43.98),
+    ]
+    assert carrito_store.obtener("1") == {"lineas": {"2": (2, 4398)}, "total": 4398}
+    carrito_store.vaciar("1")
+
+
+def test_memoria_no_arranca_con_varios_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError, match="CARRITO_STORE=redis"):
+        crear_store()
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert crear_store().obtener("1") == {"lineas": {}, "total": 0}
+
+
+def test_migracion_borra_los_carritos_antiguos(db):
+    db.add(Pedido(id=75, cliente_id=1, direccion_id=1, fecha=datetime(2026, 1, 1), total=Decimal("20.99"),
+                  incluye_plato=1, estado="carrito"))
+    db.flush()
+    db.add(DetallePedido(id=75, pedido_id=75, plato_combinado_id=1, cantidad=1, subtotal=Decimal("20.99")))
+    db.commit()
+    with engine.begin() as conexion:
+        m0007_carritos_antiguos.aplicar(conexion)
+    db.expire_all()
+    assert db.get(Pedido, 75) is None and db.get(DetallePedido, 75) is None
+    # Los pedidos reales y sus detalles quedan.
+    assert db.get(Pedido, 1).estado == "asignado"
+    assert db.query(DetallePedido).filter(DetallePedido.pedido_id == 1).count() == 2
@@ -0,0 +1,114 @@
+#tests/test_carrito_store.py
+import fakeredis
+import pytest
+import redis
+
+from utils.carrito_store import CarritoOcupado, MemoriaCarritoStore, RedisCarritoStore
+
+
+@pytest.fixture(params=["memoria", "redis"])
+def store(request):
+    if request.param == "memoria":
+        return MemoriaCarritoStore(capacidad=10)
+    return RedisCarritoStore(fakeredis.FakeRedis(decode_responses=True), ttl=60)
+
+
+def test_agregar_acumula_lineas_y_total(store):
+    assert store.agregar("1", "10", 2, 3998) == 3998
+    assert store.agregar("1", "10", 1, 1999) == 5997
+    assert store.agregar("1", "11", 1, 500) == 6497
+    assert store.obtener("1") == {"lineas": {"10": (3, 5997), "11": (1, 500)}, "total": 6497}
+
+
+def test_fijar_reemplaza_y_elimina(store):
+    store.agregar("1", "10", 2, 2000)
+    store.agregar("1", "11", 1, 500)
+    assert store.fijar("1", "10", 5, 5000) == 5500
+    assert store.fijar("1", "11", 0, 0) == 5000
+    assert store.obtener("1") == {"lineas": {"10": (5, 5000)}, "total": 5000}
+    assert store.fijar("1", "99", 1, 100) is None
+    assert store.fijar("2", "10", 1, 100) is None
+
+
+def test_vaciar(store):
+    store.agregar("1", "10", 1, 100)
+    store.vaciar("1")
+    assert store.obtener("1") == {"lineas": {}, "total": 0}
+
+
+def test_tomar_lee_y_borra(store):
+    store.agregar("1", "10", 2, 2000)
+    assert store.tomar("1") == {"lineas": {"10": (2, 2000)}, "total": 2000}
+    assert store.obtener("1") == {"lineas": {}, "total": 0}
+    # Lo agregado después de tomar queda en un carrito nuevo.
+    store.agregar("1", "11", 1, 500)
+    assert store.obtener("1")["lineas"] == {"11": (1, 500)}
+
+
+def test_devolver_suma_a_lo_agregado_despues(store):
+    store.agregar("1", "10", 2, 2000)
+    carrito = store.tomar("1")
+    store.agregar("1", "10", 1, 1000)
+    store.devolver("1", carrito)
+    assert store.obtener("1") == {"lineas": {"10": (3, 3000)}, "total": 3000}
+
+
+# ---------------------------------------------------------------------------
+# Solo Redis
+# ---------------------------------------------------------------------------
+class ClienteConInterferencia:
+    """Envuelve un FakeRedis y modifica el carrito justo después del WATCH."""
+
+    def __init__(self, cliente, veces: int):
+        self._cliente = cliente
+        self.veces = veces
+
+    def __getattr__(self, nombre):
+        return getattr(self._cliente, nombre)
+
+    def pipeline(self):
+        pipe = self._cliente.pipeline()
+        hmget = pipe.hmget
+
+        def hmget_interferido(clave, *campos):
+            resultado = hmget(clave, *campos)
+            if self.veces:
+                self.veces -= 1
+                self._cliente.hincrby(clave, "total", 0)
+            return resultado
+
+        pipe.hmget = hmget_interferido
+        return pipe
+
+
+def test_fijar_reintenta_tras_conflicto_de_watch():
+    cliente = ClienteConInterferencia(fakeredis.FakeRedis(decode_responses=True), veces=2)
+    store = RedisCarritoStore(cliente, ttl=60)
+    store.agregar("1", "10", 2, 2000)
+    assert store.fijar("1", "10", 1, 1000) == 1000
+    assert cliente.veces == 0
+    assert store.obtener("1") == {"lineas": {"10": (1, 1000)}, "total": 1000}
+
+
+def test_fijar_agota_reintentos():
+    cliente = ClienteConInterferencia(fakeredis.FakeRedis(decode_responses=True), veces=RedisCarritoStore.REINTENTOS)
+    store = RedisCarritoStore(cliente, ttl=60)
+    store.agregar("1", "10", 2, 2000)
+    with pytest.raises(CarritoOcupado):
+        store.fijar("1", "10", 1, 1000)
+    assert store.obtener("1")["total"] == 2000
+
+
+def test_error_dentro_de_exec_se_lanza():
+    cliente = fakeredis.FakeRedis(decode_responses=True)
+    cliente.set("carrito:1", "no es un hash")
+    store = RedisCarritoStore(cliente, ttl=60)
+    with pytest.raises(redis.ResponseError):
+        store.agregar("1", "10", 1, 100)
+
+
+def test_agregar_renueva_ttl():
+    cliente = fakeredis.FakeRedis(decode_responses=True)
+    store = RedisCarritoStore(cliente, ttl=60)
+    store.agregar("1", "10", 1, 100)
+    assert 0 < cliente.ttl("carrito:1") <= 60
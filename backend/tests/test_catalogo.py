@@ -0,0 +1,95 @@
+#tests/test_catalogo.py
+"""Catálogo en memoria (utils.catalogo): cursores, páginas e invalidación tras commit."""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from models import Etiqueta, PlatoCombinado
+from utils.catalogo import catalogo
+from utils.eventos_db import al_confirmar
+from utils.paginacion import codificar_cursor, decodificar_cursor
+
+avisos = []
+al_confirmar(Etiqueta)(avisos.append)
+
+
+def test_cursor_ida_y_vuelta():
+    fecha = datetime(2026, 1, 15, 12, 30, 5)
+    cursor = codificar_cursor(fecha, 42, Decimal("19.99"))
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor, datetime.fromisoformat, int, Decimal) == [fecha, 42, Decimal("19.99")]
+
+
+@pytest.mark.parametrize("cursor", ["no-es-base64!", codificar_cursor(1), codificar_cursor("x", 2)])
+def test_cursor_invalido_da_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decodificar_cursor(cursor, int, int)
+    assert error.value.status_code == 400
+
+
+def recorrer_catalogo(cliente, **params) -> list[str]:
+    ids, cursor = [], None
+    while True:
+        r = cliente.get("/cliente/platos-mascotas/", params={**params, "limite": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        ids += [p["id"] for p in r.json()]
+        cursor = r.headers.get("x-siguiente-cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("params", [{}, {"categoria_id": "1"}, {"etiquetas": ["1"]}, {"search": "plato"}])
+def test_catalogo_por_paginas_coincide_con_la_lista_completa(cliente, params):
+    completa = [p["id"] for p in cliente.get("/cliente/platos-mascotas/", params=params).json()]
+    assert completa
+    assert recorrer_catalogo(cliente, **params) == completa
+
+
+def test_catalogo_ordenado_por_id_y_filtrado(cliente):
+    assert recorrer_catalogo(cliente) == [str(i) for i in range(1, 8)]
+    assert recorrer_catalogo(cliente, categoria_id="2") == ["2", "4", "6"]
+    assert recorrer_catalogo(cliente, etiquetas=["1"]) == ["1", "4"]
+
+
+def test_catalogo_cursor_manipulado(cliente):
+    r = cliente.get("/cliente/platos-mascotas/", params={"limite": 2, "cursor": "abc"})
+    assert r.status_code == 400
+
+
+def test_aviso_solo_tras_commit(db):
+    avisos.clear()
+    etiqueta = Etiqueta(id=90, nombre="Temporal")
+    db.add(etiqueta)
+    db.flush()
+    db.rollback()
+    assert avisos == []
+
+    db.add(Etiqueta(id=90, nombre="Temporal"))
+    db.commit()
+    assert avisos == [{(Etiqueta, 90)}]
+    db.delete(db.get(Etiqueta, 90))
+    db.commit()
+
+
+@pytest.fixture
+def plato_renombrado(db):
+    plato = db.get(PlatoCombinado, 5)
+    original = plato.nombre
+    yield plato
+    plato.nombre = original
+    db.commit()
+
+
+def test_catalogo_se_invalida_tras_commit(cliente, db, plato_renombrado):
+    assert cliente.get("/cliente/platos-mascotas/id/5").json()["nombre"] == "Plato 5"
+    generacion = catalogo.generacion
+
+    plato_renombrado.nombre = "Plato renombrado"
+    db.flush()
+    # Sin commit la caché sigue sirviendo el nombre anterior.
+    assert catalogo.generacion == generacion
+    db.commit()
+    assert catalogo.generacion == generacion + 1
+    assert cliente.get("/cliente/platos-mascotas/id/5").json()["nombre"] == "Plato renombrado"
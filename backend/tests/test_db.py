@@ -0,0 +1,26 @@
+#tests/test_db.py
+"""Configuración de los pools de conexiones (utils.db)."""
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from utils.db import _opciones_pool
+
+
+def test_pool_por_defecto_y_desde_el_entorno(monkeypatch):
+    opciones = _opciones_pool("DB_PRUEBA_", 5, 5)
+    assert (opciones["pool_size"], opciones["max_overflow"]) == (5, 5)
+    monkeypatch.setenv("DB_PRUEBA_POOL_SIZE", "2")
+    monkeypatch.setenv("DB_PRUEBA_MAX_OVERFLOW", "0")
+    opciones = _opciones_pool("DB_PRUEBA_", 5, 5)
+    assert (opciones["pool_size"], opciones["max_overflow"]) == (2, 0)
+
+
+def test_tamano_cero_desactiva_el_pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("DB_PRUEBA_POOL_SIZE", "0")
+    opciones = _opciones_pool("DB_PRUEBA_", 5, 5)
+    assert opciones["poolclass"] is NullPool and "pool_size" not in opciones
+    motor = create_engine(f"sqlite:///{tmp_path / 'p.db'}", **opciones)
+    with motor.connect() as conexion:
+        assert conexion.scalar(text("SELECT 1")) == 1
+    assert motor.pool.status() == "NullPool"
+    assert isinstance(create_engine(f"sqlite:///{tmp_path / 'q.db'}", **_opciones_pool("DB_OTRO_", 5, 5)).pool, QueuePool)
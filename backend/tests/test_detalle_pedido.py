@@ -0,0 +1,73 @@
+#tests/test_detalle_pedido.py
+"""Las tres vistas del detalle de un pedido (utils.detalle_pedido)."""
+from sqlalchemy.orm import joinedload
+
+from models import DetallePedido, Pago, Pedido
+from utils.detalle_pedido import DetallePedidoAdmin, DetallePedidoRespuesta, construir_detalle
+
+CLAVES_BASE = {"pedido", "cliente", "direccion", "platos"}
+PLATOS = [
+    {"id": "1", "plato": "Plato 1", "cantidad": 2, "subtotal": 41.98},
+    {"id": "2", "plato": "Plato 3", "cantidad": 1, "subtotal": 22.99},
+]
+
+
+def test_detalle_cliente(cliente):
+    r = cliente.get("/cliente/pedido/detalle/1")
+    assert r.status_code == 200
+    detalle = r.json()
+    assert set(detalle) == CLAVES_BASE
+    assert detalle["pedido"] == {"id": "1", "fecha": "2026-01-15T12:00:00", "estado": "asignado", "total": 64.97}
+    assert detalle["cliente"] == {"id": "1", "nombre": "Ana", "telefono": "999111222"}
+    assert detalle["direccion"] == {
+        "id": "1", "nombre": "Casa", "referencia": "Frente al parque", "latitud": -12.05, "longitud": -77.04,
+    }
+    assert sorted(detalle["platos"], key=lambda p: p["id"]) == PLATOS
+
+
+def test_detalle_admin(cliente):
+    detalle = cliente.get("/admin/pedidos/1").json()
+    assert set(detalle) == CLAVES_BASE | {"pago"}
+    assert detalle["pedido"]["incluye_plato"] is True
+    assert detalle["pago"] == {
+        "id": "1", "monto": 64.97, "fecha": "2026-01-15T12:05:00", "estado": "aprobado",
+        "referencia_pago": "OP-1", "pasarela": "Yape",
+    }
+
+
+def test_detalle_repartidor(cliente):
+    detalle = cliente.get("/repartidor/pedidos/1").json()
+    assert set(detalle) == CLAVES_BASE | {"repartidor"}
+    assert detalle["pedido"]["confirmacion_entrega"] is False
+    assert "incluye_plato" not in detalle["pedido"]
+    assert detalle["repartidor"] == {"id": "1", "nombre": "Luis", "telefono": "988777666"}
+
+
+def test_detalle_inexistente(cliente):
+    assert cliente.get("/cliente/pedido/detalle/999").status_code == 404
+    assert cliente.get("/admin/pedidos/999").status_code == 404
+    assert cliente.get("/repartidor/pedidos/999").status_code == 404
+
+
+def test_construir_detalle_sin_pago_ni_plato(db):
+    pedido = (
+        db.query(Pedido)
+        .options(
+            joinedload(Pedido.cliente),
+            joinedload(Pedido.direccion),
+            joinedload(Pedido.detalle_pedido).joinedload(DetallePedido.plato_combinado),
+            joinedload(Pedido.pago).joinedload(Pago.pasarela_pago),
+        )
+        .filter(Pedido.id == 1)
+        .one()
+    )
+    admin = construir_detalle(DetallePedidoAdmin, pedido, pago=None)
+    assert admin.pago is None
+    assert admin.pedido.incluye_plato is True
+
+    pedido.detalle_pedido[0].plato_combinado = None
+    try:
+        base = construir_detalle(DetallePedidoRespuesta, pedido)
+        assert {p.plato for p in base.platos} == {None, "Plato 3"}
+    finally:
+        db.rollback()
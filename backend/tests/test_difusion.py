@@ -0,0 +1,206 @@
+#tests/test_difusion.py
+"""Eventos en vivo (utils.difusion y routers/cliente/eventos.py)."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from models import Pedido
+from routers.cliente.eventos import flujo_eventos
+from utils.difusion import Difusor, crear_difusor, difusor
+from utils.notificaciones import crear_notificacion
+
+
+def esperar(cola: asyncio.Queue, segundos: float = 2.0):
+    return asyncio.wait_for(cola.get(), segundos)
+
+
+def test_entrega_solo_al_cliente_suscrito():
+    async def probar():
+        d = Difusor()
+        ana, otro = d.suscribir(1), d.suscribir("2")
+        assert d.conexiones == 2
+        d.publicar("1", "aviso", {"n": 1})
+        evento = await esperar(ana.cola)
+        assert (evento["tipo"], evento["datos"]) == ("aviso", {"n": 1})
+        assert otro.cola.empty()
+
+        d.cancelar(ana)
+        d.cancelar(ana)
+        d.publicar(1, "aviso", {"n": 2})
+        await asyncio.sleep(0)
+        assert ana.cola.empty()
+        assert d.conexiones == 1
+
+    asyncio.run(probar())
+
+
+def test_publicar_desde_otro_hilo():
+    async def probar():
+        d = Difusor()
+        suscripcion = d.suscribir(1)
+        hilo = threading.Thread(target=d.publicar, args=(1, "aviso", {"desde": "hilo"}))
+        hilo.start()
+        hilo.join()
+        assert (await esperar(suscripcion.cola))["datos"] == {"desde": "hilo"}
+
+    asyncio.run(probar())
+
+
+def test_cola_llena_descarta_y_cuenta():
+    async def probar():
+        d = Difusor(capacidad=2)
+        suscripcion = d.suscribir(1)
+        for n in range(5):
+            d.publicar(1, "aviso", {"n": n})
+        await asyncio.sleep(0)
+        assert suscripcion.cola.qsize() == 2
+        assert suscripcion.descartados == 3
+        return d, suscripcion
+
+    d, suscripcion = asyncio.run(probar())
+    # Con el loop cerrado, publicar cancela la suscripción.
+    d.publicar(1, "aviso", {})
+    assert d.conexiones == 0
+
+
+@pytest.fixture
+def eventos():
+    """Eventos que publica `difusor` durante la prueba."""
+    publicados = []
+    original = difusor.publicar
+
+    def capturar(cliente_id, tipo, datos):
+        publicados.append((str(cliente_id), tipo, datos))
+        original(cliente_id, tipo, datos)
+
+    difusor.publicar = capturar
+    yield publicados
+    del difusor.publicar
+
+
+def test_notificacion_se_publica_tras_commit(db, eventos):
+    notificacion = crear_notificacion(db, 1, "Hola", "Tu dieta está lista", "DIETA_LISTA", 80)
+    notificacion.id = 110
+    db.flush()
+    fecha = notificacion.fecha.isoformat()
+    assert eventos == []
+    db.commit()
+    try:
+        assert eventos == [("1", "notificacion", {
+            "id": "110", "titulo": "Hola", "mensaje": "Tu dieta está lista", "fecha": fecha,
+            "tipo": "DIETA_LISTA", "referencia_id": "80",
+        })]
+    finally:
+        db.delete(notificacion)
+        db.commit()
+
+
+def test_rollback_no_publica(db, eventos):
+    crear_notificacion(db, 1, "Hola", "Mensaje", "AVISO", 1)
+    db.flush()
+    db.rollback()
+    db.commit()
+    assert eventos == []
+
+
+def test_cambio_de_estado_del_pedido(db, eventos):
+    pedido = db.get(Pedido, 1)
+    pedido.estado = "en_camino"
+    db.commit()
+    try:
+        assert eventos == [("1", "pedido_estado", {"pedido_id": "1", "estado_anterior": "asignado", "estado": "en_camino"})]
+        eventos.clear()
+        pedido.total = pedido.total
+        db.commit()
+        assert eventos == []
+    finally:
+        pedido.estado = "asignado"
+        db.commit()
+
+
+def test_websocket_recibe_la_notificacion(cliente, db):
+    with cliente.websocket_connect("/cliente/1/eventos/ws") as ws:
+        assert difusor.conexiones == 1
+        notificacion = crear_notificacion(db, 1, "Hola", "Mensaje", "AVISO", 1)
+        notificacion.id = 111
+        db.commit()
+        try:
+            evento = ws.receive_json()
+            assert (evento["tipo"], evento["datos"]["id"]) == ("notificacion", "111")
+        finally:
+            db.delete(notificacion)
+            db.commit()
+    assert difusor.conexiones == 0
+
+
+def test_sse_formato_y_latido(monkeypatch):
+    monkeypatch.setattr("routers.cliente.eventos.EVENTOS_LATIDO_SEGUNDOS", 0.05)
+
+    async def probar():
+        respuesta = await flujo_eventos("1")
+        assert respuesta.media_type == "text/event-stream"
+        assert respuesta.headers["cache-control"] == "no-cache"
+        flujo = respuesta.body_iterator
+        assert await anext(flujo) == "retry: 3000\n\n"
+        assert await anext(flujo) == ": latido\n\n"
+        difusor.publicar("1", "aviso", {"n": 1})
+        linea_evento, linea_datos, _, _ = (await anext(flujo)).split("\n")
+        assert linea_evento == "event: aviso"
+        assert json.loads(linea_datos.removeprefix("data: "))["datos"] == {"n": 1}
+        await flujo.aclose()
+        assert difusor.conexiones == 0
+
+    asyncio.run(probar())
+
+
+def test_redis_reparte_entre_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def probar():
+        servidor = fakeredis.FakeServer()
+        # Dos workers: uno confirma la transacción, el otro tiene la conexión del cliente.
+        origen = Difusor(redis=fakeredis.FakeRedis(server=servidor, decode_responses=True))
+        destino = Difusor(redis=fakeredis.FakeRedis(server=servidor, decode_responses=True))
+        suscripcion = destino.suscribir(1)
+        try:
+            origen.publicar(1, "aviso", {"n": 1})
+            origen.publicar(2, "aviso", {"n": 2})
+            evento = await esperar(suscripcion.cola)
+            assert (evento["tipo"], evento["datos"]) == ("aviso", {"n": 1})
+            await asyncio.sleep(0.2)
+            assert suscripcion.cola.empty()
+        finally:
+            destino.detener()
+
+    asyncio.run(probar())
+
+
+def test_redis_caido_entrega_en_el_proceso(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def probar():
+        cliente_redis = fakeredis.FakeRedis(decode_responses=True)
+        d = Difusor(redis=cliente_redis)
+        suscripcion = d.suscribir(1)
+        try:
+            def fallar(*args):
+                raise ConnectionError("sin conexión")
+
+            monkeypatch.setattr(cliente_redis, "publish", fallar)
+            d.publicar(1, "aviso", {"n": 1})
+            assert (await esperar(suscripcion.cola))["datos"] == {"n": 1}
+        finally:
+            d.detener()
+
+    asyncio.run(probar())
+
+
+def test_sin_redis_no_arranca_con_varios_workers(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    with pytest.raises(RuntimeError, match="REDIS_URL"):
+        crear_difusor()
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert crear_difusor()._redis is None
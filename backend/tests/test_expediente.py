@@ -0,0 +1,58 @@
+#tests/test_expediente.py
+"""Expediente clínico en bloque con caché (utils.expediente)."""
+from datetime import date, datetime
+
+import pytest
+
+from models import CondicionSalud, RegistroMascota
+from utils.expediente import CacheExpedientes, expedientes
+
+
+@pytest.fixture
+def mascota(db):
+    db.add(RegistroMascota(id=50, cliente_id=1, nombre="Toby", sexo="M", cambio_edad=date(2025, 1, 1),
+                           edad=3, estado_registro="A", especie_id=1))
+    db.commit()
+    yield db.get(RegistroMascota, 50)
+    db.query(CondicionSalud).filter(CondicionSalud.registro_mascota_id == 50).delete()
+    db.delete(db.get(RegistroMascota, 50))
+    db.commit()
+
+
+def test_carga_en_bloque_y_luego_desde_cache(db, mascota, sentencias):
+    cache = CacheExpedientes(ttl=60)
+    expediente = cache.obtener(db, 50)
+    assert (expediente.nombre, expediente.especie, expediente.condiciones) == ("Toby", "Perro", [])
+    # La mascota (con su especie) y un SELECT por cada grupo de sub-registros.
+    assert len(sentencias) == 5
+    sentencias.clear()
+    assert cache.obtener(db, "50") is expediente
+    assert sentencias == []
+
+
+def test_inexistente_o_id_invalido(db):
+    assert expedientes.obtener(db, 999) is None
+    assert expedientes.obtener(db, "abc") is None
+
+
+def test_expediente_se_descarta_al_cambiar_la_mascota(db, mascota):
+    assert expedientes.obtener(db, 50).nombre == "Toby"
+    mascota.nombre = "Toby II"
+    db.commit()
+    assert expedientes.obtener(db, 50).nombre == "Toby II"
+
+    # Un sub-registro vacía la caché completa.
+    generacion = expedientes.generacion
+    db.add(CondicionSalud(id=50, registro_mascota_id=50, nombre="Obesidad", fecha=datetime(2026, 1, 1),
+                          estado_registro="A"))
+    db.commit()
+    assert expedientes.generacion > generacion
+    assert [c["nombre"] for c in expedientes.obtener(db, 50).condiciones] == ["Obesidad"]
+
+
+def test_ttl_vencido_vuelve_a_consultar(db, mascota, sentencias):
+    cache = CacheExpedientes(ttl=0)
+    primero = cache.obtener(db, 50)
+    sentencias.clear()
+    assert cache.obtener(db, 50) is not primero
+    assert sentencias
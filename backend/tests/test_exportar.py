@@ -0,0 +1,89 @@
+#tests/test_exportar.py
+"""Exportación de pedidos a CSV y Parquet (routers.admin.exportar)."""
+import csv
+import io
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from models import Pedido
+from routers.admin import exportar
+
+RANGO = {"fecha_inicio": "2026-01-15", "fecha_fin": "2026-01-15"}
+
+
+@pytest.fixture
+def carrito_del_dia(db):
+    """Un pedido en estado "carrito" dentro del rango, que no debe exportarse."""
+    db.add(Pedido(id=70, cliente_id=1, direccion_id=1, fecha=datetime(2026, 1, 15, 9, 0), total=Decimal("0"),
+                  incluye_plato=1, estado="carrito"))
+    db.commit()
+    yield
+    db.delete(db.get(Pedido, 70))
+    db.commit()
+
+
+def leer_csv(contenido: str) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(contenido)))
+
+
+def test_csv_una_fila_por_linea_con_pago(cliente, carrito_del_dia):
+    r = cliente.get("/admin/exportar/pedidos", params=RANGO)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert r.headers["content-disposition"] == 'attachment; filename="pedidos_2026-01-15_2026-01-15.csv"'
+    filas = leer_csv(r.text)
+    assert list(filas[0]) == exportar.COLUMNAS
+    assert [(f["pedido_id"], f["detalle_id"], f["plato_id"], f["cantidad"], f["subtotal"]) for f in filas] == [
+        ("1", "1", "1", "2", "41.98"),
+        ("1", "2", "3", "1", "22.99"),
+    ]
+    assert filas[0]["fecha"] == "2026-01-15T12:00:00"
+    assert (filas[0]["pago_monto"], filas[0]["pago_estado"], filas[0]["pasarela"]) == ("64.97", "aprobado", "Yape")
+
+
+def test_csv_fuera_de_rango_solo_cabecera(cliente):
+    r = cliente.get("/admin/exportar/pedidos", params={"fecha_inicio": "2026-01-16", "fecha_fin": "2026-02-01"})
+    assert r.text.strip() == ",".join(exportar.COLUMNAS)
+
+
+def test_csv_se_envia_por_lotes(datos, monkeypatch):
+    monkeypatch.setattr(exportar, "LOTE_EXPORTACION", 1)
+    partes = list(exportar.generar_csv(datetime(2026, 1, 15), datetime(2026, 1, 16)))
+    # Cabecera + primera fila, segunda fila, y el resto (vacío) al terminar.
+    assert len(partes) == 3
+    assert partes[0].count("\n") == 2 and partes[1].count("\n") == 1
+    assert leer_csv("".join(partes))[1]["detalle_id"] == "2"
+
+
+@pytest.mark.parametrize("params", [
+    {"fecha_inicio": "15/01/2026", "fecha_fin": "2026-01-15"},
+    {"fecha_inicio": "2026-01-16", "fecha_fin": "2026-01-15"},
+])
+def test_fechas_invalidas(cliente, params):
+    assert cliente.get("/admin/exportar/pedidos", params=params).status_code == 400
+
+
+def test_formato_desconocido(cliente):
+    assert cliente.get("/admin/exportar/pedidos", params={**RANGO, "formato": "xlsx"}).status_code == 422
+
+
+def test_parquet_un_row_group_por_lote(cliente, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(exportar, "LOTE_EXPORTACION", 1)
+    r = cliente.get("/admin/exportar/pedidos", params={**RANGO, "formato": "parquet"})
+    assert r.status_code == 200
+    archivo = pq.ParquetFile(io.BytesIO(r.content))
+    assert archivo.metadata.num_row_groups == 2
+    tabla = archivo.read()
+    assert tabla.column_names == exportar.COLUMNAS
+    assert tabla.column("subtotal").to_pylist() == [41.98, 22.99]
+    assert tabla.column("fecha").to_pylist() == [datetime(2026, 1, 15, 12, 0)] * 2
+
+
+def test_parquet_sin_pyarrow_da_501(cliente, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    r = cliente.get("/admin/exportar/pedidos", params={**RANGO, "formato": "parquet"})
+    assert r.status_code == 501
@@ -0,0 +1,109 @@
+#tests/test_notificaciones.py
+"""Bandeja de notificaciones (utils.notificaciones y rutas /cliente/{id}/notificaciones)."""
+from datetime import datetime
+
+import pytest
+
+from models import Notificacion
+from utils.notificaciones import crear_notificacion, marcar_leidas, no_leidas
+
+BANDEJA = "/cliente/1/notificaciones"
+
+
+@pytest.fixture
+def bandeja(db):
+    """Cinco notificaciones del cliente 1 (ids 101-105); la 102 ya leída y la 104 y 105 a la misma hora."""
+    fechas = {
+        101: datetime(2026, 1, 10, 9), 102: datetime(2026, 1, 11, 9), 103: datetime(2026, 1, 12, 9),
+        104: datetime(2026, 1, 13, 9), 105: datetime(2026, 1, 13, 9),
+    }
+    db.add_all(
+        Notificacion(id=i, cliente_id=1, titulo=f"Aviso {i}", mensaje="Tu pedido está en camino", fecha=fecha,
+                     leido=int(i == 102), tipo="PEDIDO", referencia_id="1")
+        for i, fecha in fechas.items()
+    )
+    db.commit()
+    no_leidas.descartar(1)
+    yield
+    db.query(Notificacion).filter(Notificacion.cliente_id == 1).delete()
+    db.commit()
+    no_leidas.descartar(1)
+
+
+def recorrer_bandeja(cliente, **params) -> list[str]:
+    ids, cursor = [], None
+    while True:
+        r = cliente.get(BANDEJA, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        ids += [n["id"] for n in r.json()]
+        cursor = r.headers.get("x-siguiente-cursor")
+        if not cursor:
+            return ids
+
+
+def test_bandeja_de_la_mas_reciente_con_contador(cliente, bandeja):
+    r = cliente.get(BANDEJA)
+    assert [n["id"] for n in r.json()] == ["105", "104", "103", "102", "101"]
+    assert r.headers["x-no-leidas"] == "4"
+    assert "x-siguiente-cursor" not in r.headers
+    assert r.json()[3] == {
+        "id": "102", "titulo": "Aviso 102", "mensaje": "Tu pedido está en camino", "fecha": "2026-01-11T09:00:00",
+        "leido": True, "tipo": "PEDIDO", "referencia_id": "1",
+    }
+
+
+@pytest.mark.parametrize("params, esperado", [
+    ({"limite": 2}, ["105", "104", "103", "102", "101"]),
+    ({"limite": 1, "solo_no_leidas": "true"}, ["105", "104", "103", "101"]),
+])
+def test_bandeja_por_paginas(cliente, bandeja, params, esperado):
+    assert recorrer_bandeja(cliente, **params) == esperado
+
+
+def test_contador_en_cache_hasta_descartar(cliente, db, bandeja, sentencias):
+    assert cliente.get(f"{BANDEJA}/no-leidas").json() == {"no_leidas": 4}
+    sentencias.clear()
+    assert cliente.get(f"{BANDEJA}/no-leidas").json() == {"no_leidas": 4}
+    assert sentencias == []
+
+    crear_notificacion(db, 1, "Nueva", "Mensaje", "AVISO", 1)
+    db.commit()
+    # Quien crea la notificación descarta el contador.
+    no_leidas.descartar(1)
+    assert cliente.get(f"{BANDEJA}/no-leidas").json() == {"no_leidas": 5}
+
+
+def test_contador_no_guarda_un_conteo_viejo(db, bandeja, monkeypatch):
+    # Si se descarta mientras se cuenta, el conteo (ya viejo) no se guarda.
+    contar = db.scalar
+
+    def contar_y_descartar(*args, **kwargs):
+        total = contar(*args, **kwargs)
+        no_leidas.descartar(1)
+        return total
+
+    monkeypatch.setattr(db, "scalar", contar_y_descartar)
+    assert no_leidas.obtener(db, 1) == 4
+    assert "1" not in no_leidas._entradas
+
+
+def test_marcar_todas_en_una_sentencia(cliente, bandeja, sentencias):
+    r = cliente.post(f"{BANDEJA}/leidas")
+    assert r.json() == {"marcadas": 4, "no_leidas": 0}
+    assert sum(sql.startswith("UPDATE notificacion") for sql in sentencias) == 1
+    assert cliente.get(BANDEJA, params={"solo_no_leidas": "true"}).json() == []
+
+
+@pytest.mark.parametrize("cuerpo, marcadas, restantes", [
+    ({"ids": ["101", "102", "103"]}, 2, ["105", "104"]),
+    ({"hasta": "2026-01-12T09:00:00"}, 2, ["105", "104"]),
+    ({"ids": ["105"], "hasta": "2026-01-12T09:00:00"}, 0, ["105", "104", "103", "101"]),
+])
+def test_marcar_algunas(cliente, bandeja, cuerpo, marcadas, restantes):
+    assert cliente.post(f"{BANDEJA}/leidas", json=cuerpo).json() == {"marcadas": marcadas, "no_leidas": len(restantes)}
+    assert recorrer_bandeja(cliente, solo_no_leidas="true") == restantes
+
+
+def test_marcar_solo_las_del_cliente(db, bandeja):
+    assert marcar_leidas(db, 2, ids=["101"]) == 0
+    db.rollback()
@@ -0,0 +1,216 @@
+#tests/test_nutricionista.py
+"""Listados del nutricionista: cola de trabajo, pacientes e historial."""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from models import Consulta, CuentaUsuario, Nutricionista, Pedido, PedidoEspecializado, RegistroMascota
+from routers.nutricionista import COLA_ESPERA_LARGA_HORAS
+
+
+def _borrar(db, *objetos):
+    for objeto in reversed(objetos):
+        db.delete(objeto)
+    db.commit()
+
+
+@pytest.fixture(scope="module")
+def mascotas(datos):
+    from utils.db import SessionLocal
+
+    with SessionLocal() as db:
+        creadas = [
+            RegistroMascota(id=80, cliente_id=1, nombre="Rocky", sexo="M", cambio_edad=date(2025, 1, 1), edad=4,
+                            estado_registro="A", especie_id=1),
+            RegistroMascota(id=81, cliente_id=1, nombre="Misha", sexo="H", cambio_edad=date(2025, 1, 1), edad=2,
+                            estado_registro="A", especie_id=2),
+        ]
+        db.add_all(creadas)
+        db.commit()
+        yield
+        _borrar(db, *creadas)
+
+
+# pedido/solicitud → (consulta_nutricionista, horas de espera, mascota, estado del pedido, estado de la solicitud)
+SOLICITUDES = {
+    80: (1, 30, 80, "pendiente", "A"),
+    81: (1, 48, 80, "pendiente", "A"),
+    82: (1, 2, 80, "pendiente", "A"),
+    83: (0, 25, 81, "pendiente", "A"),
+    84: (0, 1, 80, "pendiente", "A"),
+    85: (0, 3, 81, "pendiente", "A"),
+    86: (1, 5, 80, "atendido", "A"),
+    87: (0, 10, 80, "pendiente", "I"),
+}
+# Prioridad 3 (consulta y espera larga), 2, 1 y 0; a igual prioridad, la más antigua primero.
+ORDEN_COLA = ["81", "80", "82", "83", "85", "84"]
+PRIORIDADES = {"81": 3, "80": 3, "82": 2, "83": 1, "85": 0, "84": 0}
+
+
+@pytest.fixture(scope="module")
+def cola(mascotas):
+    from utils.db import SessionLocal
+
+    assert COLA_ESPERA_LARGA_HORAS == 24
+    ahora = datetime.now()
+    with SessionLocal() as db:
+        creados = []
+        for i, (consulta, horas, mascota, estado, estado_registro) in SOLICITUDES.items():
+            creados.append(Pedido(id=i, cliente_id=1, direccion_id=1, fecha=ahora - timedelta(hours=horas),
+                                  total=Decimal("50.00"), incluye_plato=0, estado=estado))
+            creados.append(PedidoEspecializado(id=i, pedido_id=i, frecuencia_cantidad="Diaria",
+                                               consulta_nutricionista=consulta, estado_registro=estado_registro,
+                                               registro_mascota_id=mascota, objetivo_dieta="Bajar de peso"))
+        db.add_all(creados)
+        db.commit()
+        yield
+        _borrar(db, *creados)
+
+
+def recorrer(cliente, ruta, clave, **params) -> list[str]:
+    """IDs de todas las páginas de un listado con `siguiente_cursor`."""
+    ids, cursor = [], None
+    while True:
+        r = cliente.get(ruta, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        cuerpo = r.json()
+        assert cuerpo["total"] == len(cuerpo[clave])
+        ids += [fila.get("id") or fila.get("consulta_id") for fila in cuerpo[clave]]
+        cursor = cuerpo["siguiente_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_cola_por_prioridad_y_antiguedad(cliente, cola):
+    cuerpo = cliente.get("/nutricionista/pedidos/cola").json()
+    assert [s["id"] for s in cuerpo["solicitudes"]] == ORDEN_COLA
+    assert {s["id"]: s["prioridad"] for s in cuerpo["solicitudes"]} == PRIORIDADES
+    assert cuerpo["siguiente_cursor"] is None
+    primera = cuerpo["solicitudes"][0]
+    assert (primera["cliente"]["nombre"], primera["mascota"]["especie"], primera["consulta_requerida"]) == (
+        "Ana", "Perro", True,
+    )
+
+
+@pytest.mark.parametrize("limite", [1, 2, 4])
+def test_cola_por_paginas(cliente, cola, limite):
+    assert recorrer(cliente, "/nutricionista/pedidos/cola", "solicitudes", limite=limite) == ORDEN_COLA
+
+
+@pytest.mark.parametrize("params, esperado", [
+    ({"especie_id": "2"}, ["83", "85"]),
+    ({"requiere_consulta": "true"}, ["81", "80", "82"]),
+    ({"requiere_consulta": "false"}, ["83", "85", "84"]),
+    ({"antiguedad_min_horas": 24}, ["81", "80", "83"]),
+    ({"antiguedad_max_horas": 4}, ["82", "85", "84"]),
+])
+def test_cola_filtros(cliente, cola, params, esperado):
+    assert recorrer(cliente, "/nutricionista/pedidos/cola", "solicitudes", limite=2, **params) == esperado
+
+
+def test_cola_cursor_invalido(cliente, cola):
+    assert cliente.get("/nutricionista/pedidos/cola", params={"cursor": "abc"}).status_code == 400
+
+
+@pytest.fixture(scope="module")
+def consultas(mascotas):
+    """Rocky (80): dos consultas; Misha (81): una, el mismo día que la última de Rocky."""
+    from utils.db import SessionLocal
+
+    with SessionLocal() as db:
+        cuentas = [CuentaUsuario(id=i, correo_electronico=f"nutri{i}@example.com", estado_registro="A") for i in (3, 4)]
+        db.add_all(cuentas)
+        db.flush()
+        nutricionistas = [
+            Nutricionista(id=1, cuenta_usuario_id=3, nombre="Rosa", telefono="977000111", estado_registro="A"),
+            Nutricionista(id=2, cuenta_usuario_id=4, nombre="Pablo", telefono="977000222", estado_registro="A"),
+        ]
+        db.add_all(nutricionistas)
+        db.flush()
+        filas = [
+            Consulta(id=90, registro_mascota_id=80, nutricionista_id=1, fecha=datetime(2026, 1, 10, 10), estado_registro="A",
+                     observaciones="Control inicial"),
+            Consulta(id=91, registro_mascota_id=80, nutricionista_id=2, fecha=datetime(2026, 1, 12, 10), estado_registro="A"),
+            Consulta(id=92, registro_mascota_id=81, nutricionista_id=1, fecha=datetime(2026, 1, 12, 10), estado_registro="A"),
+        ]
+        db.add_all(filas)
+        db.commit()
+        yield
+        _borrar(db, *cuentas, *nutricionistas, *filas)
+
+
+def test_pacientes_lista_completa_sin_limite(cliente, consultas):
+    cuerpo = cliente.get("/nutricionista/pacientes").json()
+    assert cuerpo["siguiente_cursor"] is None
+    # Misma última atención: desempata el id, de mayor a menor.
+    assert cuerpo["pacientes"] == [
+        {"id": "81", "nombre": "Misha", "especie": "Gato", "raza": None, "foto": None, "cliente": "Ana",
+         "total_consultas": 1, "ultima_atencion": "2026-01-12T10:00:00"},
+        {"id": "80", "nombre": "Rocky", "especie": "Perro", "raza": None, "foto": None, "cliente": "Ana",
+         "total_consultas": 2, "ultima_atencion": "2026-01-12T10:00:00"},
+    ]
+
+
+def test_pacientes_por_paginas(cliente, consultas):
+    assert recorrer(cliente, "/nutricionista/pacientes", "pacientes", limite=1) == ["81", "80"]
+
+
+def test_pacientes_en_una_sola_consulta(cliente, consultas, sentencias):
+    cliente.get("/nutricionista/pacientes")
+    # Conteo y última fecha agregados en SQL; cliente y especie por joinedload.
+    assert len(sentencias) == 1
+    assert "GROUP BY" in sentencias[0]
+
+
+def test_historial_de_la_mas_reciente_a_la_mas_antigua(cliente, consultas):
+    cuerpo = cliente.get("/nutricionista/historial").json()
+    assert [c["consulta_id"] for c in cuerpo["historial"]] == ["92", "91", "90"]
+    assert cuerpo["historial"][-1] == {
+        "consulta_id": "90", "fecha": "2026-01-10T10:00:00", "mascota": "Rocky", "cliente": "Ana",
+        "observaciones": "Control inicial", "nutricionista": "Rosa",
+    }
+
+
+@pytest.mark.parametrize("params, esperado", [
+    ({"nutricionista_id": "1"}, ["92", "90"]),
+    ({"nutricionista_id": "2"}, ["91"]),
+    ({"desde": "2026-01-11T00:00:00"}, ["92", "91"]),
+    ({"hasta": "2026-01-12T10:00:00"}, ["90"]),
+    ({"nutricionista_id": "1", "desde": "2026-01-01T00:00:00", "hasta": "2026-01-11T00:00:00"}, ["90"]),
+])
+def test_historial_filtros_y_paginas(cliente, consultas, params, esperado):
+    assert recorrer(cliente, "/nutricionista/historial", "historial", limite=1, **params) == esperado
+
+
+def test_historial_sin_nutricionista_asignado(cliente, consultas, db):
+    db.get(Consulta, 91).nutricionista_id = None
+    db.commit()
+    try:
+        fila = cliente.get("/nutricionista/historial", params={"limite": 2}).json()["historial"][1]
+        assert (fila["consulta_id"], fila["nutricionista"]) == ("91", "Sin asignar")
+    finally:
+        db.get(Consulta, 91).nutricionista_id = 2
+        db.commit()
+
+
+def test_migracion_elimina_el_indice_sin_uso(datos):
+    from sqlalchemy import inspect, text
+
+    from migraciones import m0008_sin_indice_estado_consulta
+    from utils.db import engine
+
+    def indices():
+        with engine.connect() as conexion:
+            return {i["name"] for i in inspect(conexion).get_indexes("pedido_especializado")}
+
+    with engine.begin() as conexion:
+        conexion.execute(text(
+            "CREATE INDEX estado_consulta ON pedido_especializado (estado_registro, consulta_nutricionista, pedido_id)"
+        ))
+    antes = indices()
+    assert "estado_consulta" in antes
+    for _ in range(2):  # se puede repetir sin error
+        with engine.begin() as conexion:
+            m0008_sin_indice_estado_consulta.aplicar(conexion)
+    assert indices() == antes - {"estado_consulta"}
@@ -0,0 +1,86 @@
+#tests/test_pedidos.py
+"""Creación de pedidos (utils.pedidos)."""
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from models import DetallePedido, Pedido
+from utils.pedidos import agrupar_items, registrar_pedido
+
+
+def test_agrupar_items_suma_lineas_repetidas():
+    platos = [{"plato_id": "1", "cantidad": 2}, {"plato_id": 3}, {"plato_id": 1, "cantidad": "1"}]
+    assert agrupar_items(platos) == {1: 3, 3: 1}
+
+
+@pytest.mark.parametrize("platos", [
+    [{"plato_id": "uno"}],
+    [{"cantidad": 1}],
+    ["1"],
+    [{"plato_id": 1, "cantidad": 0}],
+])
+def test_agrupar_items_rechaza_lineas_invalidas(platos):
+    with pytest.raises(HTTPException) as error:
+        agrupar_items(platos)
+    assert error.value.status_code == 400
+
+
+def test_registrar_pedido_con_precios_del_catalogo(db):
+    try:
+        pedido = registrar_pedido(db, "1", "1", {1: 2, 3: 1}, total_esperado=64.97)
+        assert pedido.total == Decimal("64.97")
+        assert pedido.estado == "pendiente"
+        detalles = db.query(DetallePedido).filter(DetallePedido.pedido_id == pedido.id).all()
+        assert {(d.plato_combinado_id, d.cantidad, d.subtotal) for d in detalles} == {
+            (1, 2, Decimal("41.98")),
+            (3, 1, Decimal("22.99")),
+        }
+    finally:
+        db.rollback()
+
+
+def test_registrar_pedido_no_depende_de_la_cantidad_de_lineas(db, sentencias):
+    try:
+        registrar_pedido(db, "1", "1", {i: 1 for i in range(1, 8)})
+        # Precios (un SELECT ... IN), el pedido y un único INSERT de los detalles.
+        assert len(sentencias) == 3
+        assert sum(sql.startswith("INSERT INTO detalle_pedido") for sql in sentencias) == 1
+    finally:
+        db.rollback()
+
+
+def test_registrar_pedido_plato_inexistente(db):
+    with pytest.raises(HTTPException) as error:
+        registrar_pedido(db, "1", "1", {1: 1, 999: 1})
+    assert error.value.status_code == 404
+    assert not any(isinstance(o, Pedido) for o in db.new)
+
+
+def test_registrar_pedido_total_distinto(db):
+    with pytest.raises(HTTPException) as error:
+        registrar_pedido(db, "1", "1", {1: 1}, total_esperado=19.99)
+    assert error.value.status_code == 400
+    assert "20.99" in error.value.detail
+
+
+def test_crear_pedido_ignora_precios_enviados(cliente, db):
+    r = cliente.post("/cliente/pedido/1", json={
+        "direccion_id": "1",
+        "platos": [{"plato_id": "2", "cantidad": 1, "precio_unitario": 0.01}, {"plato_id": "2"}],
+    })
+    assert r.status_code == 200
+    pedido_id = r.json()["pedido_id"]
+    try:
+        assert r.json()["total"] == 43.98
+        detalle = db.query(DetallePedido).filter(DetallePedido.pedido_id == pedido_id).one()
+        assert (detalle.cantidad, detalle.subtotal) == (2, Decimal("43.98"))
+    finally:
+        db.query(DetallePedido).filter(DetallePedido.pedido_id == pedido_id).delete()
+        db.query(Pedido).filter(Pedido.id == pedido_id).delete()
+        db.commit()
+
+
+def test_crear_pedido_valida_direccion(cliente):
+    r = cliente.post("/cliente/pedido/1", json={"direccion_id": "77", "platos": [{"plato_id": "1"}]})
+    assert r.status_code == 400
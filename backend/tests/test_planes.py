@@ -0,0 +1,75 @@
+#tests/test_planes.py
+"""
+Planes de ejecución de las consultas críticas (migraciones/planes.py) y lock
+de migraciones. Necesitan MySQL con el esquema migrado y datos
+representativos (p. ej. `python -m bench.datos`):
+
+    TEST_MYSQL_URL=mysql+pymysql://root:@localhost/mascotas_bench python -m pytest tests/test_planes.py
+
+Sin TEST_MYSQL_URL solo se comprueba que cada consulta declare su índice.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+TEST_MYSQL_URL = os.getenv("TEST_MYSQL_URL")
+
+requiere_mysql = pytest.mark.skipif(
+    not (TEST_MYSQL_URL or "").startswith("mysql"),
+    reason="TEST_MYSQL_URL no apunta a una base MySQL",
+)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    motor = create_engine(TEST_MYSQL_URL)
+    yield motor
+    motor.dispose()
+
+
+@pytest.fixture(scope="module")
+def conexion(engine):
+    with engine.connect() as c:
+        yield c
+
+
+def _nombres():
+    from migraciones.planes import CONSULTAS_CRITICAS
+
+    return list(CONSULTAS_CRITICAS)
+
+
+def test_cada_consulta_tiene_indice_esperado():
+    from migraciones.planes import CONSULTAS_CRITICAS, INDICES_ESPERADOS, ORDEN_POR_INDICE
+
+    assert set(INDICES_ESPERADOS) == set(CONSULTAS_CRITICAS)
+    assert ORDEN_POR_INDICE <= set(CONSULTAS_CRITICAS)
+
+
+@requiere_mysql
+@pytest.mark.parametrize("nombre", _nombres())
+def test_consulta_usa_el_indice_esperado(conexion, nombre):
+    from migraciones.planes import CONSULTAS_CRITICAS, INDICES_ESPERADOS, ORDEN_POR_INDICE, explicar
+
+    plan = explicar(conexion, CONSULTAS_CRITICAS[nombre])
+    resumen = [(f.get("table"), f.get("type"), f.get("key"), f.get("Extra")) for f in plan]
+    assert all(f.get("type") != "ALL" for f in plan), resumen
+    assert any(f.get("key") == INDICES_ESPERADOS[nombre] for f in plan), resumen
+    if nombre in ORDEN_POR_INDICE:
+        assert not any("filesort" in (f.get("Extra") or "") for f in plan), resumen
+
+
+@requiere_mysql
+def test_migraciones_abortan_si_otro_proceso_tiene_el_lock(engine, monkeypatch):
+    import migraciones
+    from migraciones import NOMBRE_LOCK, aplicar_migraciones
+
+    monkeypatch.setattr(migraciones, "ESPERA_LOCK_SEGUNDOS", 0)
+    with engine.connect() as otro:
+        assert otro.scalar(text("SELECT GET_LOCK(:n, 0)"), {"n": NOMBRE_LOCK}) == 1
+        try:
+            with pytest.raises(RuntimeError, match="lock"):
+                aplicar_migraciones(engine)
+        finally:
+            otro.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": NOMBRE_LOCK})
@@ -0,0 +1,51 @@
+#tests/test_referencia.py
+"""Instantánea de datos de referencia (utils.referencia, GET /cliente/referencia/)."""
+import gzip
+import json
+
+from models import Categoria
+
+
+def test_referencia_304_y_precomprimida(cliente):
+    r = cliente.get("/cliente/referencia/", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    datos = r.json()
+    assert r.headers["etag"] == f'W/"{datos["version"]}"'
+    assert set(datos) == {"version", "categorias", "especies", "etiquetas", "razas", "subscripciones"}
+
+    r = cliente.get("/cliente/referencia/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert json.loads(r.content) == datos
+
+    r = cliente.get("/cliente/referencia/", headers={"If-None-Match": f'W/"{datos["version"]}"'})
+    assert r.status_code == 304
+
+
+def test_referencia_gzip_es_el_mismo_json(cliente):
+    with cliente.stream("GET", "/cliente/referencia/", headers={"Accept-Encoding": "gzip"}) as r:
+        crudo = b"".join(r.iter_raw())
+    assert json.loads(gzip.decompress(crudo)) == cliente.get("/cliente/referencia/").json()
+
+
+def test_referencia_cambia_de_version_tras_commit(cliente, db):
+    antes = cliente.get("/cliente/referencia/").json()
+    categoria = db.get(Categoria, 2)
+    categoria.descripcion = "Dulces para mascotas"
+    db.commit()
+    try:
+        despues = cliente.get("/cliente/referencia/").json()
+        assert despues["version"] != antes["version"]
+        assert {"id": "2", "nombre": "Postres", "descripcion": "Dulces para mascotas", "slug": "postres"} in despues["categorias"]
+    finally:
+        categoria.descripcion = None
+        db.commit()
+
+
+def test_rutas_individuales_leen_de_la_instantanea(cliente, sentencias):
+    datos = cliente.get("/cliente/referencia/").json()
+    sentencias.clear()
+    assert cliente.get("/cliente/platos-mascotas/categorias").json() == datos["categorias"]
+    assert cliente.get("/cliente/platos-mascotas/especies").json() == datos["especies"]
+    assert sentencias == []
@@ -0,0 +1,139 @@
+#tests/test_respuestas.py
+"""Serialización (utils.respuestas.serializar) y negociación de compresión."""
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from utils.detalle_pedido import ContactoResumen
+from utils.respuestas import BROTLI_DISPONIBLE, MiddlewareCompresion, RespuestaJSON, codificaciones_aceptadas, serializar
+
+GRANDE = [{"id": str(i), "nombre": f"Plato {i}", "precio": 19.99} for i in range(200)]
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    app = FastAPI(default_response_class=RespuestaJSON)
+    app.add_middleware(MiddlewareCompresion, minimum_size=1024)
+
+    @app.get("/grande")
+    def grande():
+        return RespuestaJSON(GRANDE)
+
+    @app.get("/chica")
+    def chica():
+        return {"ok": True}
+
+    @app.get("/eventos")
+    def eventos():
+        return StreamingResponse(iter([b"data: " + b"x" * 2000 + b"\n\n"]), media_type="text/event-stream")
+
+    @app.get("/flujo")
+    def flujo():
+        return StreamingResponse(iter([b"a" * 10, b"b" * 3000, b"c"]), media_type="text/csv")
+
+    @app.get("/precomprimida")
+    def precomprimida():
+        return Response(gzip.compress(b"x" * 3000), headers={"Content-Encoding": "gzip"}, media_type="text/plain")
+
+    return TestClient(app)
+
+
+def test_serializar_tipos_de_columnas():
+    contenido = {
+        "fecha": datetime(2026, 1, 15, 12, 0),
+        "total": Decimal("64.97"),
+        "id": UUID(int=1),
+        1: "clave numérica",
+        "texto": "ñandú",
+    }
+    assert json.loads(serializar(contenido)) == {
+        "fecha": "2026-01-15T12:00:00",
+        "total": 64.97,
+        "id": "00000000-0000-0000-0000-000000000001",
+        "1": "clave numérica",
+        "texto": "ñandú",
+    }
+    assert b" " not in serializar({"a": [1, 2]})
+
+
+def test_serializar_modelo_pydantic():
+    modelo = ContactoResumen(id="1", nombre="Ana", telefono=None)
+    assert serializar(modelo) == b'{"id":"1","nombre":"Ana","telefono":null}'
+
+
+@pytest.mark.parametrize("cabecera, esperadas", [
+    ("gzip, deflate, br", {"gzip", "deflate", "br"}),
+    ("gzip;q=0, br;q=0.5", {"br"}),
+    ("GZIP;q=1.0", {"gzip"}),
+    ("gzip;q=x", set()),
+    ("", set()),
+])
+def test_codificaciones_aceptadas(cabecera, esperadas):
+    assert codificaciones_aceptadas(cabecera) == esperadas
+
+
+def test_gzip_si_el_cliente_lo_acepta(cliente):
+    with cliente.stream("GET", "/grande", headers={"Accept-Encoding": "gzip"}) as r:
+        crudo = b"".join(r.iter_raw())
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert json.loads(gzip.decompress(crudo)) == GRANDE
+
+
+def test_brotli_preferido_si_esta_instalado(cliente):
+    r = cliente.get("/grande", headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["content-encoding"] == ("br" if BROTLI_DISPONIBLE else "gzip")
+
+
+@pytest.mark.parametrize("ruta, cabecera", [
+    ("/grande", "identity"),
+    ("/grande", "gzip;q=0"),
+    ("/chica", "gzip"),
+    ("/eventos", "gzip"),
+])
+def test_sin_compresion(cliente, ruta, cabecera):
+    r = cliente.get(ruta, headers={"Accept-Encoding": cabecera})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+
+
+def test_flujo_comprimido_trozo_a_trozo(cliente):
+    with cliente.stream("GET", "/flujo", headers={"Accept-Encoding": "gzip"}) as r:
+        crudo = b"".join(r.iter_raw())
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert gzip.decompress(crudo) == b"a" * 10 + b"b" * 3000 + b"c"
+
+
+def test_respuesta_ya_comprimida_pasa_sin_tocar(cliente):
+    with cliente.stream("GET", "/precomprimida", headers={"Accept-Encoding": "gzip"}) as r:
+        crudo = b"".join(r.iter_raw())
+    assert gzip.decompress(crudo) == b"x" * 3000
+    assert "vary" not in r.headers
+
+
+def test_vary_aunque_el_cliente_no_acepte_compresion(cliente):
+    r = cliente.get("/grande", headers={"Accept-Encoding": "identity"})
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.json() == GRANDE
+
+
+def test_cuerpo_grande_comprimido_en_un_hilo():
+    app = FastAPI()
+    app.add_middleware(MiddlewareCompresion, minimum_size=10, minimo_hilo=100)
+
+    @app.get("/grande")
+    def grande():
+        return RespuestaJSON(GRANDE)
+
+    with TestClient(app).stream("GET", "/grande", headers={"Accept-Encoding": "gzip"}) as r:
+        crudo = b"".join(r.iter_raw())
+    assert int(r.headers["content-length"]) == len(crudo)
+    assert json.loads(gzip.decompress(crudo)) == GRANDE
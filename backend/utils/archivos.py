@@ -0,0 +1,74 @@
+#utils/archivos.py
+"""
+GUARDADO DE ARCHIVOS SUBIDOS
+----------------------------
+`guardar_subida` copia un `UploadFile` a disco por trozos de `TROZO` bytes en
+lugar de leerlo entero en memoria (`upload.file.read()`):
+
+- el tamaño se controla mientras se copia; si supera el máximo responde 413 y
+  no deja nada en disco;
+- se escribe en un archivo temporal de la misma carpeta y se renombra al
+  terminar, de modo que nunca queda un archivo a medias con el nombre final;
+- de paso calcula el SHA-256 del contenido.
+
+Es bloqueante: se llama desde rutas `def`, que FastAPI ya ejecuta en el
+threadpool, así que el loop de eventos no espera por el disco.
+
+Variable de entorno: `SUBIDA_TAMANO_MAX_MB` (10).
+"""
+import contextlib
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+
+TROZO = 1024 * 1024
+SUBIDA_TAMANO_MAX = int(float(os.getenv("SUBIDA_TAMANO_MAX_MB", "10")) * 1024 * 1024)
+
+
+@dataclass(frozen=True)
+class ArchivoGuardado:
+    ruta: str
+    tamano: int
+    sha256: str
+
+
+def nombre_seguro(nombre: str) -> str:
+    """Evita que el nombre enviado por el cliente salga de la carpeta destino."""
+    return nombre.replace("/", "_").replace("\\", "_").lstrip(".") or "archivo"
+
+
+def guardar_subida(
+    archivo: UploadFile,
+    carpeta: str,
+    nombre: str,
+    tamano_max: int = SUBIDA_TAMANO_MAX,
+) -> ArchivoGuardado:
+    """Guarda `archivo` como `carpeta/nombre` (creando la carpeta si hace falta)."""
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, nombre_seguro(nombre))
+    temporal = f"{ruta}.{uuid.uuid4().hex}.parte"
+
+    resumen = hashlib.sha256()
+    tamano = 0
+    try:
+        archivo.file.seek(0)
+        with open(temporal, "wb") as destino:
+            while trozo := archivo.file.read(TROZO):
+                tamano += len(trozo)
+                if tamano > tamano_max:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El archivo supera el tamaño máximo de {tamano_max // (1024 * 1024)} MB.",
+                    )
+                resumen.update(trozo)
+                destino.write(trozo)
+        os.replace(temporal, ruta)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporal)
+        raise
+
+    return ArchivoGuardado(ruta=ruta, tamano=tamano, sha256=resumen.hexdigest())
@@ -0,0 +1,58 @@
+#utils/arranque.py
+"""
+Arranque y apagado de cada worker (lifespan de FastAPI).
+
+El esquema ya no se revisa al importar main.py: se gestiona aparte con
+`python -m migraciones`. Al arrancar, el worker solo abre una conexión de cada
+pool y precarga las cachés en memoria (catálogo, índice de búsqueda y datos
+de referencia), para que la primera petición no pague ese costo. Si la base de datos no responde, el
+worker arranca igual y las cachés se cargan en la primera petición.
+
+El registro en cola (utils.registro) se inicia antes de calentar y se detiene
+al final, vaciando lo pendiente. Al apagar también se cancela la generación de
+variantes de imágenes que no haya empezado (utils.medios) y se detiene el
+oyente del canal de eventos en Redis, si lo hay (utils.difusion).
+"""
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from utils.buscador import indice_platos
+from utils.catalogo import catalogo
+from utils.db import AsyncSessionLocal, async_engine, engine
+from utils.difusion import difusor
+from utils.medios import medios
+from utils.referencia import referencia
+from utils.registro import configurar_registro, detener_registro
+
+logger = logging.getLogger(__name__)
+
+
+def _ping_sync():
+    with engine.connect() as conexion:
+        conexion.execute(text("SELECT 1"))
+
+
+async def calentar():
+    try:
+        await run_in_threadpool(_ping_sync)
+        async with AsyncSessionLocal() as db:
+            await catalogo.precargar_async(db)
+            await indice_platos.precargar_async(db)
+            await referencia.precargar_async(db)
+    except Exception as e:
+        logger.warning("no se pudo precargar al iniciar", extra={"error": f"{e.__class__.__name__}: {e}"})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    configurar_registro()
+    await calentar()
+    yield
+    difusor.detener()
+    medios.detener()
+    await async_engine.dispose()
+    engine.dispose()
+    detener_registro()
@@ -0,0 +1,278 @@
+#utils/buscador.py
+"""
+ÍNDICE INVERTIDO PARA BÚSQUEDA DE PLATOS
+-----------------------------------------
+Reemplaza los `ILIKE '%texto%'` (que obligan a recorrer toda la tabla) por un
+índice en memoria sobre los `PlatoCombinado` activos:
+
+- Texto normalizado: minúsculas y sin tildes ("Atún" → "atun").
+- Campos indexados con peso: nombre (3), etiquetas (2), descripción (1).
+- Coincidencia por prefijo: "pol" encuentra "pollo". Las coincidencias exactas
+  puntúan más que las de prefijo.
+- Todas las palabras de la búsqueda deben coincidir (AND); el puntaje final
+  es la suma del mejor peso obtenido por cada palabra.
+
+El índice se actualiza de forma incremental: cada commit que toca un plato
+encola su ID y, en la siguiente búsqueda, solo esos platos se vuelven a leer
+de la base de datos. Los cambios en etiquetas o categorías (poco frecuentes)
+provocan una reconstrucción completa. El candado del índice nunca se retiene
+mientras se consulta la base de datos, así que `buscar` y `buscar_async`
+pueden convivir en el mismo proceso.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models import Categoria, Etiqueta, EtiquetaPlato, PlatoCombinado
+from utils.eventos_db import al_confirmar
+
+PESO_NOMBRE = 3.0
+PESO_ETIQUETA = 2.0
+PESO_DESCRIPCION = 1.0
+FACTOR_PREFIJO = 0.6
+
+PALABRAS_VACIAS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "para", "por", "sin", "su", "un", "una", "y",
+})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalizar(texto: str | None) -> list[str]:
+    """Convierte un texto en tokens en minúsculas y sin tildes."""
+    if not texto:
+        return []
+    plano = unicodedata.normalize("NFKD", texto.lower())
+    plano = "".join(c for c in plano if not unicodedata.combining(c))
+    return _TOKEN.findall(plano)
+
+
+class _Documento:
+    __slots__ = ("id", "publicado", "pesos", "resumen")
+
+    def __init__(self, p: PlatoCombinado):
+        self.id = int(p.id)
+        self.publicado = bool(p.publicado)
+        pesos: dict[str, float] = {}
+        campos = (
+            (PESO_NOMBRE, [p.nombre]),
+            (PESO_ETIQUETA, [ep.etiqueta.nombre for ep in p.etiqueta_plato if ep.etiqueta]),
+            (PESO_DESCRIPCION, [p.descripcion]),
+        )
+        for peso, textos in campos:
+            for texto in textos:
+                for token in normalizar(texto):
+                    if token not in PALABRAS_VACIAS and pesos.get(token, 0) < peso:
+                        pesos[token] = peso
+        self.pesos = pesos
+        self.resumen = {
+            "id": str(p.id),
+            "nombre": p.nombre,
+            "precio": float(p.precio),
+            "categoria": p.categoria.nombre if p.categoria else "General",
+            "imagen": p.imagen,
+        }
+
+
+class IndicePlatos:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: dict[int, _Documento] = {}
+        self._postings: dict[str, dict[int, float]] = {}
+        self._vocabulario: list[str] = []
+        self._vocabulario_sucio = False
+        self._cargado = False
+        self._pendientes: set[int] = set()
+        self._reconstruir = False
+
+    # -----------------------------------------------------------------------
+    # Mantenimiento
+    # -----------------------------------------------------------------------
+    def marcar_pendientes(self, plato_ids):
+        """Encola platos para reindexarlos en la próxima búsqueda."""
+        with self._lock:
+            self._pendientes.update(int(i) for i in plato_ids if i is not None)
+
+    def marcar_reconstruccion(self):
+        with self._lock:
+            self._reconstruir = True
+
+    @staticmethod
+    def _consulta(ids: list[int] | None = None):
+        consulta = (
+            select(PlatoCombinado)
+            .options(
+                joinedload(PlatoCombinado.categoria),
+                selectinload(PlatoCombinado.etiqueta_plato).joinedload(EtiquetaPlato.etiqueta),
+            )
+            .where(PlatoCombinado.estado_registro == "A")
+        )
+        if ids is not None:
+            consulta = consulta.where(PlatoCombinado.id.in_(ids))
+        return consulta
+
+    def _quitar(self, plato_id: int):
+        doc = self._docs.pop(plato_id, None)
+        if not doc:
+            return
+        for token in doc.pesos:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(plato_id, None)
+            if not posting:
+                del self._postings[token]
+                self._vocabulario_sucio = True
+
+    def _agregar(self, p: PlatoCombinado):
+        doc = _Documento(p)
+        self._docs[doc.id] = doc
+        for token, peso in doc.pesos.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._vocabulario_sucio = True
+            posting[doc.id] = peso
+
+    def _reclamar(self) -> list[int] | bool:
+        """
+        Toma el trabajo pendiente: True si hay que cargar todo, la lista de IDs
+        a reindexar, o False si el índice está al día. Requiere `self._lock`.
+        """
+        if not self._cargado or self._reconstruir:
+            self._reconstruir = False
+            self._pendientes.clear()
+            return True
+        if self._pendientes:
+            ids = list(self._pendientes)
+            self._pendientes.clear()
+            return ids
+        return False
+
+    def _devolver(self, trabajo):
+        """Vuelve a encolar un trabajo reclamado cuya consulta falló."""
+        with self._lock:
+            if trabajo is True:
+                self._reconstruir = True
+            else:
+                self._pendientes.update(trabajo)
+
+    def _aplicar(self, trabajo, platos: list[PlatoCombinado]):
+        with self._lock:
+            if trabajo is True:
+                self._docs, self._postings = {}, {}
+                self._cargado = True
+                self._vocabulario_sucio = True
+            else:
+                for plato_id in trabajo:
+                    self._quitar(plato_id)
+            for p in platos:
+                self._agregar(p)
+            if self._vocabulario_sucio:
+                self._vocabulario = sorted(self._postings)
+                self._vocabulario_sucio = False
+
+    def _sincronizar(self, db: Session):
+        """Aplica la carga inicial, la reconstrucción o los pendientes encolados."""
+        with self._lock:
+            trabajo = self._reclamar()
+        if trabajo is False:
+            return
+        try:
+            platos = db.scalars(self._consulta(None if trabajo is True else trabajo)).all()
+        except Exception:
+            self._devolver(trabajo)
+            raise
+        self._aplicar(trabajo, platos)
+
+    async def _sincronizar_async(self, db: AsyncSession):
+        with self._lock:
+            trabajo = self._reclamar()
+        if trabajo is False:
+            return
+        try:
+            platos = (await db.scalars(self._consulta(None if trabajo is True else trabajo))).all()
+        except Exception:
+            self._devolver(trabajo)
+            raise
+        self._aplicar(trabajo, platos)
+
+    async def precargar_async(self, db: AsyncSession):
+        """Construye el índice por adelantado (al arrancar el worker)."""
+        await self._sincronizar_async(db)
+
+    # -----------------------------------------------------------------------
+    # Búsqueda
+    # -----------------------------------------------------------------------
+    def _terminos(self, token: str) -> list[str]:
+        """Términos del vocabulario que empiezan con `token`."""
+        inicio = bisect.bisect_left(self._vocabulario, token)
+        fin = bisect.bisect_left(self._vocabulario, token + "\uffff")
+        return self._vocabulario[inicio:fin]
+
+    @staticmethod
+    def _tokens(texto: str) -> list[str]:
+        tokens = normalizar(texto)
+        return [t for t in tokens if t not in PALABRAS_VACIAS] or tokens
+
+    def _puntuar(self, tokens: list[str], solo_publicados: bool) -> dict[int, float]:
+        with self._lock:
+            puntajes: dict[int, float] | None = None
+            for token in tokens:
+                mejores: dict[int, float] = {}
+                for termino in self._terminos(token):
+                    factor = 1.0 if termino == token else FACTOR_PREFIJO
+                    for plato_id, peso in self._postings[termino].items():
+                        valor = peso * factor
+                        if valor > mejores.get(plato_id, 0):
+                            mejores[plato_id] = valor
+                if puntajes is None:
+                    puntajes = mejores
+                else:
+                    puntajes = {i: s + mejores[i] for i, s in puntajes.items() if i in mejores}
+                if not puntajes:
+                    return {}
+            if solo_publicados:
+                puntajes = {i: s for i, s in puntajes.items() if self._docs[i].publicado}
+            return puntajes
+
+    def buscar(self, db: Session, texto: str, solo_publicados: bool = False) -> dict[int, float]:
+        """Devuelve {plato_id: puntaje} de los platos que coinciden con `texto`."""
+        tokens = self._tokens(texto)
+        if not tokens:
+            return {}
+        self._sincronizar(db)
+        return self._puntuar(tokens, solo_publicados)
+
+    async def buscar_async(self, db: AsyncSession, texto: str, solo_publicados: bool = False) -> dict[int, float]:
+        tokens = self._tokens(texto)
+        if not tokens:
+            return {}
+        await self._sincronizar_async(db)
+        return self._puntuar(tokens, solo_publicados)
+
+    def buscar_resumenes(self, db: Session, texto: str, limite: int = 10) -> list[dict]:
+        """Los `limite` platos más relevantes, con sus datos básicos."""
+        puntajes = self.buscar(db, texto)
+        mejores = sorted(puntajes.items(), key=lambda par: (-par[1], par[0]))[:limite]
+        with self._lock:
+            return [self._docs[i].resumen for i, _ in mejores if i in self._docs]
+
+
+indice_platos = IndicePlatos()
+
+
+@al_confirmar(PlatoCombinado)
+def _reindexar_platos(cambios):
+    indice_platos.marcar_pendientes(plato_id for _, plato_id in cambios)
+
+
+@al_confirmar(EtiquetaPlato, Etiqueta, Categoria)
+def _reconstruir_indice(cambios):
+    indice_platos.marcar_reconstruccion()
@@ -0,0 +1,102 @@
+#utils/cache_http.py
+"""
+CACHÉ HTTP (ETag / Cache-Control / 304)
+---------------------------------------
+Los datos de referencia (categorías, especies, etiquetas, razas, planes de
+suscripción y el detalle de los platos) cambian muy poco, pero la app los pide
+en cada arranque. `MiddlewareCacheHttp` les agrega:
+
+- `ETag` débil con un resumen (BLAKE2b) del cuerpo que devolvió la ruta. Dos
+  workers con los mismos datos dan el mismo ETag, y el ETag cambia en cuanto
+  cambia el cuerpo: también cuando terminan de generarse las variantes de una
+  imagen (`imagen_variantes`) o cambia el host de las URLs.
+- `Cache-Control: public, max-age=CACHE_HTTP_MAX_AGE_SEGUNDOS` (60): durante
+  ese tiempo la app ni siquiera pregunta; después revalida con `If-None-Match`.
+
+Si el `If-None-Match` coincide con el ETag del cuerpo se responde 304 sin
+cuerpo. La ruta se ejecuta igual, pero todas las rutas de `RUTAS` se sirven
+desde memoria (utils.catalogo, utils.referencia), así que un 304 no consulta
+la base de datos ni envía bytes de más. Un worker puede servir datos viejos
+como mucho hasta que vence su propia caché (`CATALOGO_TTL_SEGUNDOS` desde que
+la cargó), igual que sin ETag.
+"""
+import hashlib
+import os
+import re
+
+CACHE_HTTP_MAX_AGE_SEGUNDOS = int(os.getenv("CACHE_HTTP_MAX_AGE_SEGUNDOS", "60"))
+
+RUTAS = [
+    "/cliente/platos-mascotas/categorias",
+    "/cliente/platos-mascotas/especies",
+    "/cliente/platos-mascotas/etiquetas",
+    "/cliente/platos-mascotas/especies/{especie_id}/razas",
+    "/cliente/platos-mascotas/id/{plato_id}",
+    "/cliente/subscripciones/",
+]
+_PATRONES = [re.compile(re.sub(r"\{[^/]+\}", "[^/]+", ruta) + "$") for ruta in RUTAS]
+
+
+def _es_cacheable(ruta: str) -> bool:
+    return any(patron.match(ruta) for patron in _PATRONES)
+
+
+def calcular_etag(cuerpo: bytes) -> bytes:
+    # Débil: el mismo contenido puede viajar comprimido de distintas formas.
+    return f'W/"{hashlib.blake2b(cuerpo, digest_size=12).hexdigest()}"'.encode()
+
+
+def coincide_etag(if_none_match: bytes, etag: bytes) -> bool:
+    if if_none_match.strip() == b"*":
+        return True
+    # La comparación de If-None-Match es débil: W/"x" equivale a "x".
+    valor = etag.removeprefix(b"W/")
+    return any(e.strip().removeprefix(b"W/") == valor for e in if_none_match.split(b","))
+
+
+class MiddlewareCacheHttp:
+    """
+    Middleware ASGI. Solo actúa sobre GET de las rutas en `RUTAS` y solo
+    agrega ETag a las respuestas 200, cuyo cuerpo retiene hasta completarlo
+    (son respuestas chicas).
+    """
+
+    def __init__(self, app, max_age: int = CACHE_HTTP_MAX_AGE_SEGUNDOS):
+        self.app = app
+        self.cache_control = f"public, max-age={max_age}".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not _es_cacheable(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        inicio = None
+        partes = []
+
+        async def enviar(mensaje):
+            nonlocal inicio
+            if mensaje["type"] == "http.response.start":
+                if mensaje["status"] != 200:
+                    return await send(mensaje)
+                inicio = mensaje
+                return
+            if inicio is None or mensaje["type"] != "http.response.body":
+                return await send(mensaje)
+
+            partes.append(mensaje.get("body", b""))
+            if mensaje.get("more_body", False):
+                return
+            cuerpo = b"".join(partes)
+            etag = calcular_etag(cuerpo)
+            if if_none_match is not None and coincide_etag(if_none_match, etag):
+                encabezados = [(b"etag", etag), (b"cache-control", self.cache_control)]
+                await send({"type": "http.response.start", "status": 304, "headers": encabezados})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({
+                **inicio,
+                "headers": [*inicio.get("headers", []), (b"etag", etag), (b"cache-control", self.cache_control)],
+            })
+            await send({"type": "http.response.body", "body": cuerpo})
+
+        await self.app(scope, receive, enviar)
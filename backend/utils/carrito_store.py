@@ -0,0 +1,231 @@
+#utils/carrito_store.py
+"""
+ALMACÉN DE CARRITOS
+-------------------
+Los carritos ya no se guardan como filas `Pedido` en estado "carrito": viven en
+un almacén clave-valor y solo se convierten en `Pedido` en el checkout. Así los
+carritos abandonados no llegan a la tabla de pedidos y agregar un producto no
+escribe en MySQL.
+
+Backends (variable de entorno `CARRITO_STORE`):
+- "memoria" (por defecto): diccionario LRU en el proceso, limitado a
+  `CARRITO_CAPACIDAD` carritos. Solo para desarrollo: cada worker tiene sus
+  propios carritos y se pierden al reiniciar. Si `WEB_CONCURRENCY` (la variable
+  que leen uvicorn y gunicorn para el número de workers) es mayor que 1, el
+  arranque falla en lugar de repartir los carritos entre workers.
+- "redis": cualquier servidor que hable el protocolo de Redis (`REDIS_URL`),
+  con el cliente `redis` (`pip install redis`). Cada carrito es un hash
+  `carrito:{cliente_id}` que expira tras `CARRITO_TTL_SEGUNDOS` sin cambios.
+
+Los importes se manejan en centavos (enteros). Cada línea guarda su cantidad y
+su subtotal, y el total del carrito se ajusta con la diferencia de la línea
+modificada, igual que con el modelo anterior.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+CARRITO_CAPACIDAD = int(os.getenv("CARRITO_CAPACIDAD", "10000"))
+CARRITO_TTL_SEGUNDOS = int(os.getenv("CARRITO_TTL_SEGUNDOS", str(7 * 24 * 3600)))
+
+
+class CarritoOcupado(Exception):
+    """Escrituras concurrentes sobre el mismo carrito agotaron los reintentos."""
+
+
+class CarritoStore(ABC):
+    """
+    Interfaz común. Los carritos se devuelven como
+    `{"lineas": {plato_id: (cantidad, subtotal_centavos)}, "total": centavos}`.
+    """
+
+    @abstractmethod
+    def obtener(self, cliente_id: str) -> dict:
+        ...
+
+    @abstractmethod
+    def tomar(self, cliente_id: str) -> dict:
+        """Lee y elimina el carrito en una sola operación atómica (checkout)."""
+
+    @abstractmethod
+    def agregar(self, cliente_id: str, plato_id: str, cantidad: int, subtotal: int) -> int:
+        """Suma `cantidad` unidades a la línea (creándola si no existe). Devuelve el total."""
+
+    @abstractmethod
+    def fijar(self, cliente_id: str, plato_id: str, cantidad: int, subtotal: int) -> int | None:
+        """Reemplaza una línea existente (cantidad 0 la elimina). None si la línea no existe."""
+
+    @abstractmethod
+    def vaciar(self, cliente_id: str):
+        ...
+
+    def devolver(self, cliente_id: str, carrito: dict):
+        """Vuelve a sumar al carrito las líneas de un `tomar` cuyo checkout falló."""
+        for plato_id, (cantidad, subtotal) in carrito["lineas"].items():
+            self.agregar(cliente_id, plato_id, cantidad, subtotal)
+
+
+# ---------------------------------------------------------------------------
+# Memoria (LRU)
+# ---------------------------------------------------------------------------
+class MemoriaCarritoStore(CarritoStore):
+    def __init__(self, capacidad: int = CARRITO_CAPACIDAD):
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        self._carritos: OrderedDict[str, dict] = OrderedDict()
+
+    def _carrito(self, cliente_id: str, crear: bool = False) -> dict | None:
+        carrito = self._carritos.get(cliente_id)
+        if carrito is None and crear:
+            carrito = self._carritos[cliente_id] = {"lineas": {}, "total": 0}
+            while len(self._carritos) > self.capacidad:
+                self._carritos.popitem(last=False)
+        if carrito is not None:
+            self._carritos.move_to_end(cliente_id)
+        return carrito
+
+    def obtener(self, cliente_id: str) -> dict:
+        with self._lock:
+            carrito = self._carrito(cliente_id)
+            if carrito is None:
+                return {"lineas": {}, "total": 0}
+            return {"lineas": dict(carrito["lineas"]), "total": carrito["total"]}
+
+    def tomar(self, cliente_id):
+        with self._lock:
+            carrito = self._carritos.pop(cliente_id, None)
+            return carrito or {"lineas": {}, "total": 0}
+
+    def agregar(self, cliente_id, plato_id, cantidad, subtotal):
+        with self._lock:
+            carrito = self._carrito(cliente_id, crear=True)
+            cantidad_actual, subtotal_actual = carrito["lineas"].get(plato_id, (0, 0))
+            carrito["lineas"][plato_id] = (cantidad_actual + cantidad, subtotal_actual + subtotal)
+            carrito["total"] += subtotal
+            return carrito["total"]
+
+    def fijar(self, cliente_id, plato_id, cantidad, subtotal):
+        with self._lock:
+            carrito = self._carrito(cliente_id)
+            if carrito is None or plato_id not in carrito["lineas"]:
+                return None
+            _, subtotal_anterior = carrito["lineas"].pop(plato_id)
+            if cantidad > 0:
+                carrito["lineas"][plato_id] = (cantidad, subtotal)
+            else:
+                subtotal = 0
+            carrito["total"] += subtotal - subtotal_anterior
+            return carrito["total"]
+
+    def vaciar(self, cliente_id):
+        with self._lock:
+            self._carritos.pop(cliente_id, None)
+
+
+# ---------------------------------------------------------------------------
+# Redis
+# ---------------------------------------------------------------------------
+class RedisCarritoStore(CarritoStore):
+    """
+    Hash por carrito: `c:{plato_id}` → cantidad, `s:{plato_id}` → subtotal en
+    centavos y `total` → total en centavos. Las altas usan MULTI/EXEC con
+    HINCRBY; los reemplazos usan WATCH para calcular la diferencia sin carreras.
+
+    `cliente` es un `redis.Redis` con `decode_responses=True` (o un cliente
+    compatible, como `fakeredis.FakeRedis` en las pruebas).
+    """
+    REINTENTOS = 5
+
+    def __init__(self, cliente, ttl: int = CARRITO_TTL_SEGUNDOS):
+        self._redis = cliente
+        self.ttl = ttl
+
+    @staticmethod
+    def _clave(cliente_id: str) -> str:
+        return f"carrito:{cliente_id}"
+
+    @staticmethod
+    def _a_carrito(valores: dict) -> dict:
+        lineas = {
+            campo[2:]: (int(cantidad), int(valores.get(f"s:{campo[2:]}", 0)))
+            for campo, cantidad in valores.items()
+            if campo.startswith("c:")
+        }
+        return {"lineas": lineas, "total": int(valores.get("total", 0))}
+
+    def obtener(self, cliente_id):
+        return self._a_carrito(self._redis.hgetall(self._clave(cliente_id)))
+
+    def tomar(self, cliente_id):
+        clave = self._clave(cliente_id)
+        # MULTI/EXEC: ninguna escritura puede colarse entre la lectura y el borrado.
+        with self._redis.pipeline() as pipe:
+            valores, _ = pipe.hgetall(clave).delete(clave).execute()
+        return self._a_carrito(valores)
+
+    def agregar(self, cliente_id, plato_id, cantidad, subtotal):
+        clave = self._clave(cliente_id)
+        with self._redis.pipeline() as pipe:
+            pipe.hincrby(clave, f"c:{plato_id}", cantidad)
+            pipe.hincrby(clave, f"s:{plato_id}", subtotal)
+            pipe.hincrby(clave, "total", subtotal)
+            pipe.expire(clave, self.ttl)
+            # Un error dentro del EXEC (p. ej. WRONGTYPE) se lanza como ResponseError.
+            resultado = pipe.execute()
+        return int(resultado[2])
+
+    def fijar(self, cliente_id, plato_id, cantidad, subtotal):
+        import redis
+
+        clave = self._clave(cliente_id)
+        with self._redis.pipeline() as pipe:
+            for _ in range(self.REINTENTOS):
+                try:
+                    pipe.watch(clave)
+                    cantidad_actual, subtotal_anterior = pipe.hmget(clave, f"c:{plato_id}", f"s:{plato_id}")
+                    if cantidad_actual is None:
+                        pipe.unwatch()
+                        return None
+                    pipe.multi()
+                    if cantidad > 0:
+                        pipe.hset(clave, mapping={f"c:{plato_id}": cantidad, f"s:{plato_id}": subtotal})
+                    else:
+                        pipe.hdel(clave, f"c:{plato_id}", f"s:{plato_id}")
+                        subtotal = 0
+                    pipe.hincrby(clave, "total", subtotal - int(subtotal_anterior or 0))
+                    pipe.expire(clave, self.ttl)
+                    return int(pipe.execute()[1])
+                except redis.WatchError:
+                    # Otra escritura tocó el carrito entre WATCH y EXEC: reintentar.
+                    continue
+        raise CarritoOcupado("No se pudo actualizar el carrito por escrituras concurrentes")
+
+    def vaciar(self, cliente_id):
+        self._redis.delete(self._clave(cliente_id))
+
+
+def crear_store() -> CarritoStore:
+    tipo = os.getenv("CARRITO_STORE", "memoria")
+    if tipo == "redis":
+        import redis
+
+        return RedisCarritoStore(
+            redis.Redis.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                socket_timeout=2.0,
+                decode_responses=True,
+            )
+        )
+    if tipo == "memoria":
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+        if workers > 1:
+            raise RuntimeError(
+                f"CARRITO_STORE=memoria no sirve con {workers} workers (WEB_CONCURRENCY): "
+                "usar CARRITO_STORE=redis."
+            )
+        return MemoriaCarritoStore()
+    raise ValueError(f"CARRITO_STORE desconocido: {tipo!r}")
+
+
+carrito_store = crear_store()
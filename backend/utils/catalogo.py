@@ -0,0 +1,240 @@
+#utils/catalogo.py
+"""
+CACHÉ DEL CATÁLOGO DE PLATOS PUBLICADOS
+----------------------------------------
+Mantiene en memoria los `PlatoCombinado` activos y publicados, ya convertidos a
+la forma que devuelve la API, junto con índices por categoría, especie y
+etiqueta. Así el listado del menú se sirve sin consultar MySQL en cada carga
+de la pantalla de inicio.
+
+- La caché se reconstruye de forma perezosa: en la primera petición tras una
+  invalidación o cuando vence el TTL (`CATALOGO_TTL_SEGUNDOS`, 300 s por
+  defecto). El TTL sirve para que los demás workers, que no reciben el aviso
+  de invalidación, converjan solos.
+- Cualquier commit que toque platos, etiquetas, categorías o especies invalida
+  la caché de este proceso (ver utils.eventos_db).
+- Las páginas se sirven por keyset sobre el ID del plato: el cursor es el ID
+  del último plato entregado, por lo que el costo no depende del número de página.
+- Cada lectura tiene su variante `*_async` para rutas con `AsyncSession`; solo
+  difieren en cómo se consulta la base de datos al recargar.
+"""
+import asyncio
+import bisect
+import os
+import threading
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models import Categoria, Especie, Etiqueta, EtiquetaPlato, PlatoCombinado
+from utils.eventos_db import al_confirmar
+from utils.globals import PLATO
+from utils.medios import medios, ruta_imagen
+
+CATALOGO_TTL_SEGUNDOS = float(os.getenv("CATALOGO_TTL_SEGUNDOS", "300"))
+
+
+class _Entrada:
+    """Plato precomputado: datos listos para JSON + claves de filtrado."""
+    __slots__ = ("id", "datos", "ruta_imagen", "categoria_id", "especie_id", "etiquetas")
+
+    def __init__(self, p: PlatoCombinado):
+        self.id = int(p.id)
+        self.ruta_imagen = ruta_imagen(p.imagen, PLATO)
+        self.categoria_id = str(p.categoria_id) if p.categoria_id else None
+        self.especie_id = str(p.especie_id) if p.especie_id else None
+        self.etiquetas = frozenset(str(ep.etiqueta_id) for ep in p.etiqueta_plato)
+        nombres_etiquetas = [ep.etiqueta.nombre for ep in p.etiqueta_plato if ep.etiqueta]
+        self.datos = {
+            "id": str(p.id),
+            "nombre": p.nombre,
+            "descripcion": p.descripcion,
+            "precio": float(p.precio),
+            "imagen": None,
+            "imagen_variantes": None,
+            "categoria": p.categoria.nombre if p.categoria else None,
+            "especie": p.especie.nombre if p.especie else None,
+            "etiquetas": nombres_etiquetas,
+        }
+
+    def a_dict(self, base_url: str) -> dict:
+        if not self.ruta_imagen:
+            return self.datos
+        return {
+            **self.datos,
+            "imagen": f"{base_url}/{self.ruta_imagen}",
+            "imagen_variantes": medios.urls(base_url, self.ruta_imagen),
+        }
+
+
+class _Indice:
+    """Instantánea inmutable del catálogo; se reemplaza completa en cada recarga."""
+    __slots__ = ("entradas", "ids", "por_id", "por_categoria", "por_especie", "por_etiqueta")
+
+    def __init__(self, platos: list[PlatoCombinado]):
+        self.entradas = sorted((_Entrada(p) for p in platos), key=lambda e: e.id)
+        # IDs en el mismo orden que `entradas`, para ubicar el cursor con bisect.
+        self.ids = [e.id for e in self.entradas]
+        self.por_id = {e.id: e for e in self.entradas}
+        self.por_categoria: dict[str, set[int]] = {}
+        self.por_especie: dict[str, set[int]] = {}
+        self.por_etiqueta: dict[str, set[int]] = {}
+        for e in self.entradas:
+            if e.categoria_id:
+                self.por_categoria.setdefault(e.categoria_id, set()).add(e.id)
+            if e.especie_id:
+                self.por_especie.setdefault(e.especie_id, set()).add(e.id)
+            for etiqueta_id in e.etiquetas:
+                self.por_etiqueta.setdefault(etiqueta_id, set()).add(e.id)
+
+
+class CatalogoPlatos:
+    def __init__(self, ttl: float = CATALOGO_TTL_SEGUNDOS):
+        self.ttl = ttl
+        self.generacion = 0
+        self._lock = threading.Lock()
+        self._lock_async = asyncio.Lock()
+        self._indice: _Indice | None = None
+        self._vence = 0.0
+
+    # -----------------------------------------------------------------------
+    # Carga e invalidación
+    # -----------------------------------------------------------------------
+    def invalidar(self):
+        """Marca la caché como obsoleta; se reconstruye en la siguiente lectura."""
+        self._vence = 0.0
+        self.generacion += 1
+
+    def _vigente(self) -> bool:
+        return self._indice is not None and time.monotonic() < self._vence
+
+    @staticmethod
+    def _consulta():
+        return (
+            select(PlatoCombinado)
+            .options(
+                joinedload(PlatoCombinado.categoria),
+                joinedload(PlatoCombinado.especie),
+                selectinload(PlatoCombinado.etiqueta_plato).joinedload(EtiquetaPlato.etiqueta),
+            )
+            .where(
+                PlatoCombinado.estado_registro == "A",
+                PlatoCombinado.publicado == 1,
+            )
+        )
+
+    def _instalar(self, platos: list[PlatoCombinado], generacion: int) -> _Indice:
+        self._indice = _Indice(platos)
+        # Si llegó una invalidación mientras se consultaba, no extender la vigencia.
+        if generacion == self.generacion:
+            self._vence = time.monotonic() + self.ttl
+        return self._indice
+
+    def _asegurar(self, db: Session) -> _Indice:
+        if self._vigente():
+            return self._indice
+        with self._lock:
+            if self._vigente():
+                return self._indice
+            generacion = self.generacion
+            return self._instalar(db.scalars(self._consulta()).all(), generacion)
+
+    async def _asegurar_async(self, db: AsyncSession) -> _Indice:
+        if self._vigente():
+            return self._indice
+        async with self._lock_async:
+            if self._vigente():
+                return self._indice
+            generacion = self.generacion
+            return self._instalar((await db.scalars(self._consulta())).all(), generacion)
+
+    async def precargar_async(self, db: AsyncSession):
+        """Carga la caché por adelantado (al arrancar el worker)."""
+        await self._asegurar_async(db)
+
+    # -----------------------------------------------------------------------
+    # Lecturas
+    # -----------------------------------------------------------------------
+    def obtener(self, db: Session, plato_id: str, base_url: str) -> dict | None:
+        """Devuelve un plato publicado por ID, o None si no existe."""
+        return _obtener(self._asegurar(db), plato_id, base_url)
+
+    async def obtener_async(self, db: AsyncSession, plato_id: str, base_url: str) -> dict | None:
+        return _obtener(await self._asegurar_async(db), plato_id, base_url)
+
+    def listar(self, db: Session, base_url: str, **filtros) -> tuple[list[dict], tuple | None]:
+        """Devuelve (platos, clave_ultimo) aplicando los filtros sobre la caché (ver `_listar`)."""
+        return _listar(self._asegurar(db), base_url, **filtros)
+
+    async def listar_async(self, db: AsyncSession, base_url: str, **filtros) -> tuple[list[dict], tuple | None]:
+        return _listar(await self._asegurar_async(db), base_url, **filtros)
+
+
+def _obtener(indice: _Indice, plato_id: str, base_url: str) -> dict | None:
+    try:
+        entrada = indice.por_id.get(int(plato_id))
+    except ValueError:
+        return None
+    return entrada.a_dict(base_url) if entrada else None
+
+
+def _listar(
+    indice: _Indice,
+    base_url: str,
+    categoria_id: str | None = None,
+    especie_id: str | None = None,
+    etiquetas: list[str] | None = None,
+    relevancia: dict[int, float] | None = None,
+    despues_de: tuple | None = None,
+    limite: int | None = None,
+) -> tuple[list[dict], tuple | None]:
+    """
+    Sin `relevancia` los platos se ordenan por ID y la clave es `(id,)`.
+    Con `relevancia` ({plato_id: puntaje}, ver utils.buscador) solo se
+    devuelven esos platos, del más al menos relevante, y la clave es
+    `(-puntaje, id)`. `clave_ultimo` es None cuando no quedan más páginas.
+    """
+    candidatos = None
+    if categoria_id:
+        candidatos = indice.por_categoria.get(categoria_id, set())
+    if especie_id:
+        por_especie = indice.por_especie.get(especie_id, set())
+        candidatos = por_especie if candidatos is None else candidatos & por_especie
+    if etiquetas:
+        por_etiquetas = set().union(*(indice.por_etiqueta.get(e, set()) for e in etiquetas))
+        candidatos = por_etiquetas if candidatos is None else candidatos & por_etiquetas
+
+    if relevancia is None:
+        # `indice.ids` ya está ordenado: se busca la posición sin armar claves.
+        claves = None
+        entradas = indice.entradas
+        inicio = bisect.bisect_right(indice.ids, despues_de[0]) if despues_de is not None else 0
+    else:
+        claves = sorted(
+            (-puntaje, plato_id) for plato_id, puntaje in relevancia.items() if plato_id in indice.por_id
+        )
+        entradas = [indice.por_id[plato_id] for _, plato_id in claves]
+        inicio = bisect.bisect_right(claves, tuple(despues_de)) if despues_de is not None else 0
+
+    pagina, clave_ultimo = [], None
+    for i in range(inicio, len(entradas)):
+        e = entradas[i]
+        if candidatos is not None and e.id not in candidatos:
+            continue
+        if limite is not None and len(pagina) == limite:
+            break
+        pagina.append(e)
+        clave_ultimo = (e.id,) if claves is None else claves[i]
+    else:
+        clave_ultimo = None
+    return [e.a_dict(base_url) for e in pagina], clave_ultimo
+
+
+catalogo = CatalogoPlatos()
+
+
+@al_confirmar(PlatoCombinado, EtiquetaPlato, Etiqueta, Categoria, Especie)
+def _invalidar_catalogo(cambios):
+    catalogo.invalidar()
@@ -1,12 +1,60 @@
 #utils/db.py
+import os
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-# Datos de conexión a MySQL
-DATABASE_URL = "mysql+pymysql://root:@localhost/mascotas"
+from sqlalchemy.pool import NullPool
+# Datos de conexión a MySQL (se pueden sobrescribir por variables de entorno)
+DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root:@localhost/mascotas")
+# Misma base de datos con el driver asíncrono (aiomysql)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", DATABASE_URL.replace("+pymysql", "+aiomysql", 1)
+)
+
+
+def _opciones_pool(prefijo: str, tamano: int, desborde: int) -> dict:
+    """
+    Parámetros del pool de conexiones leídos del entorno, p. ej. para el motor
+    síncrono: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING. El motor asíncrono usa el prefijo DB_ASYNC_.
+    - recycle: segundos antes de renovar una conexión (MySQL cierra las
+      inactivas tras `wait_timeout`, 8 h por defecto).
+    - pre_ping: comprueba la conexión antes de entregarla y la reemplaza si
+      el servidor la cerró.
+    - POOL_SIZE=0 desactiva el pool de ese motor (NullPool): no guarda
+      conexiones inactivas y cada sesión abre y cierra la suya. Con QueuePool,
+      pool_size=0 significaría "sin límite", por eso no se pasa tal cual.
+    """
+    opciones = {
+        "pool_recycle": int(os.getenv(f"{prefijo}POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv(f"{prefijo}POOL_PRE_PING", "1") == "1",
+    }
+    tamano = int(os.getenv(f"{prefijo}POOL_SIZE", tamano))
+    if tamano == 0:
+        return {**opciones, "poolclass": NullPool}
+    return {
+        **opciones,
+        "pool_size": tamano,
+        "max_overflow": int(os.getenv(f"{prefijo}MAX_OVERFLOW", desborde)),
+        "pool_timeout": float(os.getenv(f"{prefijo}POOL_TIMEOUT", 30)),
+    }
+
+
+# Presupuesto de conexiones: cada worker abre como máximo
+# DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW
+# (20 con los valores por defecto). Multiplicado por el número de workers debe
+# quedar por debajo de `max_connections` de MySQL (151 por defecto), dejando
+# margen para migraciones, scripts y conexiones de administración.
 # Crea el motor de conexión
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(DATABASE_URL, echo=False, **_opciones_pool("DB_", 5, 5))
 # Sesión para interactuar con la base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Motor y sesiones asíncronas: las rutas `async def` esperan a MySQL sin ocupar
+# un hilo del threadpool. Crear el motor no abre conexiones: el pool solo
+# crece hasta lo que usen las peticiones.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **_opciones_pool("DB_ASYNC_", 5, 5))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 # Clase base para modelos (ORM)
 Base = declarative_base()
 # 🔹 ESTA FUNCIÓN ES CLAVE
@@ -16,4 +64,14 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Equivalente asíncrono de `get_db` para rutas `async def`.
+    Las relaciones deben cargarse de forma explícita (joinedload/selectinload):
+    la carga perezosa no está disponible con AsyncSession.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,114 @@
+#utils/detalle_pedido.py
+"""
+Modelos de respuesta del detalle de un pedido.
+
+El detalle que ven el cliente (GET /cliente/pedido/detalle/{id}), el admin
+(GET /admin/pedidos/{id}) y el repartidor (GET /repartidor/pedidos/{id})
+comparte la misma base: cabecera del pedido, cliente, dirección y platos. Cada
+vista agrega lo suyo (pago o repartidor).
+
+Los modelos leen directamente los objetos del ORM (`from_attributes`): los IDs
+pasan a `str` y los DECIMAL a `float` al validar, una sola vez. Al serializar,
+`RespuestaJSONMedida` usa el serializador ya compilado de Pydantic
+(utils.respuestas), sin `jsonable_encoder` ni dicts intermedios.
+
+Las relaciones (cliente, direccion, detalle_pedido.plato_combinado, etc.)
+deben venir cargadas con `joinedload` para no disparar consultas al validar.
+"""
+from datetime import datetime
+from typing import TypeVar
+
+from pydantic import AliasPath, BaseModel, ConfigDict, Field
+
+from models import Pedido
+
+
+class _DesdeORM(BaseModel):
+    model_config = ConfigDict(from_attributes=True, coerce_numbers_to_str=True)
+
+
+class ContactoResumen(_DesdeORM):
+    """Cliente o repartidor."""
+    id: str
+    nombre: str
+    telefono: str | None
+
+
+class DireccionResumen(_DesdeORM):
+    id: str
+    nombre: str
+    referencia: str | None
+    latitud: float
+    longitud: float
+
+
+class PlatoPedido(_DesdeORM):
+    """Una línea de `DetallePedido`."""
+    id: str
+    plato: str | None = Field(None, validation_alias=AliasPath("plato_combinado", "nombre"))
+    cantidad: int
+    subtotal: float
+
+
+class PagoResumen(_DesdeORM):
+    id: str
+    monto: float
+    fecha: datetime
+    estado: str
+    referencia_pago: str | None
+    pasarela: str | None = Field(None, validation_alias=AliasPath("pasarela_pago", "nombre"))
+
+
+class CabeceraPedido(_DesdeORM):
+    id: str
+    fecha: datetime
+    estado: str
+    total: float
+
+
+class CabeceraPedidoAdmin(CabeceraPedido):
+    incluye_plato: bool
+
+
+class CabeceraPedidoRepartidor(CabeceraPedido):
+    confirmacion_entrega: bool
+
+
+class DetallePedidoRespuesta(_DesdeORM):
+    pedido: CabeceraPedido
+    cliente: ContactoResumen | None
+    direccion: DireccionResumen | None
+    platos: list[PlatoPedido]
+
+
+class DetallePedidoAdmin(DetallePedidoRespuesta):
+    pedido: CabeceraPedidoAdmin
+    pago: PagoResumen | None
+
+
+class DetallePedidoRepartidor(DetallePedidoRespuesta):
+    pedido: CabeceraPedidoRepartidor
+    repartidor: ContactoResumen | None
+
+
+Detalle = TypeVar("Detalle", bound=DetallePedidoRespuesta)
+
+
+def construir_detalle(modelo: type[Detalle], pedido: Pedido, cabecera_extra: dict | None = None, **extra) -> Detalle:
+    """
+    Valida `pedido` contra `modelo`. `cabecera_extra` completa los campos de
+    la cabecera que no son columnas de `Pedido` (p. ej. `confirmacion_entrega`);
+    `extra`, las secciones propias de cada vista (`pago`, `repartidor`).
+    """
+    cabecera = pedido
+    if cabecera_extra:
+        campos = modelo.model_fields["pedido"].annotation.model_fields
+        cabecera = {campo: getattr(pedido, campo) for campo in campos if campo not in cabecera_extra}
+        cabecera.update(cabecera_extra)
+    return modelo.model_validate({
+        "pedido": cabecera,
+        "cliente": pedido.cliente,
+        "direccion": pedido.direccion,
+        "platos": pedido.detalle_pedido,
+        **extra,
+    })
@@ -0,0 +1,199 @@
+#utils/difusion.py
+"""
+Difusión de eventos en vivo al cliente (SSE / WebSocket).
+
+`difusor` reparte eventos a las conexiones abiertas en
+routers/cliente/eventos.py: cada una se suscribe con el id del cliente y
+recibe los eventos que se publiquen para él. Los eventos se generan solos a partir de la
+unidad de trabajo del ORM y se publican únicamente tras un commit exitoso:
+
+- "notificacion": se insertó una `Notificacion` del cliente.
+- "pedido_estado": cambió `Pedido.estado` de un pedido del cliente.
+
+Las sentencias masivas (`update()` de Core) no generan eventos.
+
+Cada suscripción tiene una cola acotada (`EVENTOS_COLA`, 100). Si el cliente
+no la vacía a tiempo, los eventos nuevos se descartan y se cuentan en
+`descartados`. El canal solo avisa: al reconectar, la app vuelve a consultar
+los endpoints REST para recuperar lo que se perdió.
+
+Entre procesos:
+- Con `REDIS_URL` definida, `publicar` envía el evento al canal de Redis
+  `EVENTOS_CANAL` y cada worker con conexiones abiertas lo recibe en un hilo
+  suscrito al canal y lo entrega a las suyas. Así un evento confirmado en un
+  worker llega a los clientes conectados a cualquier otro. Si Redis no
+  responde al publicar, el evento se entrega solo en el proceso.
+- Sin `REDIS_URL`, el pub/sub es en memoria del proceso y solo sirve con un
+  único worker: si `WEB_CONCURRENCY` es mayor que 1, el arranque falla.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import Notificacion, Pedido
+
+EVENTOS_COLA = int(os.getenv("EVENTOS_COLA", "100"))
+EVENTOS_CANAL = os.getenv("EVENTOS_CANAL", "pawpals:eventos")
+
+logger = logging.getLogger(__name__)
+
+
+class Suscripcion:
+    def __init__(self, cliente_id: str, capacidad: int):
+        self.cliente_id = cliente_id
+        self.loop = asyncio.get_running_loop()
+        self.cola: asyncio.Queue[dict] = asyncio.Queue(capacidad)
+        self.descartados = 0
+
+    def _entregar(self, evento: dict):
+        # Corre siempre en el loop de la suscripción.
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.descartados += 1
+
+
+class Difusor:
+    """
+    `redis`: cliente `redis.Redis` con `decode_responses=True` (o compatible,
+    como `fakeredis.FakeRedis` en las pruebas). None: solo en memoria.
+    """
+
+    def __init__(self, capacidad: int = EVENTOS_COLA, redis=None, canal: str = EVENTOS_CANAL):
+        self.capacidad = capacidad
+        self.canal = canal
+        self._redis = redis
+        self._oyente = None
+        self._lock = threading.Lock()
+        self._suscripciones: dict[str, set[Suscripcion]] = {}
+
+    def suscribir(self, cliente_id) -> Suscripcion:
+        """Debe llamarse desde el loop que va a consumir la cola."""
+        suscripcion = Suscripcion(str(cliente_id), self.capacidad)
+        with self._lock:
+            self._suscripciones.setdefault(suscripcion.cliente_id, set()).add(suscripcion)
+            if self._redis is not None and self._oyente is None:
+                # Solo escuchan el canal los workers que tienen conexiones abiertas.
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.canal: self._recibir})
+                self._oyente = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._error_oyente)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        with self._lock:
+            conjunto = self._suscripciones.get(suscripcion.cliente_id)
+            if conjunto is not None:
+                conjunto.discard(suscripcion)
+                if not conjunto:
+                    del self._suscripciones[suscripcion.cliente_id]
+
+    def publicar(self, cliente_id, tipo: str, datos: dict):
+        """Publica el evento para las conexiones del cliente en todos los workers. Se puede llamar desde cualquier hilo."""
+        evento = {"tipo": tipo, "fecha": datetime.now().isoformat(), "datos": datos}
+        if self._redis is not None:
+            try:
+                self._redis.publish(self.canal, json.dumps({"cliente_id": str(cliente_id), "evento": evento}))
+                return
+            except Exception as e:
+                logger.warning("no se pudo publicar el evento en Redis", extra={"error": f"{e.__class__.__name__}: {e}"})
+        self.entregar(cliente_id, evento)
+
+    def entregar(self, cliente_id, evento: dict):
+        """Entrega el evento a las conexiones del cliente abiertas en este proceso."""
+        with self._lock:
+            suscripciones = list(self._suscripciones.get(str(cliente_id), ()))
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, evento)
+            except RuntimeError:
+                # El loop ya se cerró (apagado del worker).
+                self.cancelar(suscripcion)
+
+    def _recibir(self, mensaje: dict):
+        # Corre en el hilo del oyente de Redis.
+        try:
+            carga = json.loads(mensaje["data"])
+            self.entregar(carga["cliente_id"], carga["evento"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("evento mal formado en el canal", extra={"canal": self.canal})
+
+    def _error_oyente(self, error, pubsub, hilo):
+        # El hilo sigue: el siguiente get_message reconecta y vuelve a suscribirse.
+        logger.warning("error escuchando el canal de eventos", extra={"error": f"{error.__class__.__name__}: {error}"})
+        time.sleep(1.0)
+
+    def detener(self):
+        """Detiene el oyente de Redis (apagado del worker)."""
+        with self._lock:
+            oyente, self._oyente = self._oyente, None
+        if oyente is not None:
+            oyente.stop()
+
+    @property
+    def conexiones(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._suscripciones.values())
+
+
+def crear_difusor() -> Difusor:
+    url = os.getenv("REDIS_URL")
+    if url:
+        import redis
+
+        return Difusor(redis=redis.Redis.from_url(url, socket_timeout=2.0, decode_responses=True))
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        raise RuntimeError(
+            f"Los eventos en vivo no se reparten entre {workers} workers (WEB_CONCURRENCY) "
+            "sin Redis: definir REDIS_URL."
+        )
+    return Difusor()
+
+
+difusor = crear_difusor()
+
+
+# ---------------------------------------------------------------------------
+# Eventos a partir de la sesión del ORM
+# ---------------------------------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _registrar_eventos(session, flush_context):
+    pendientes = session.info.setdefault("eventos_difusion", [])
+    for obj in session.new:
+        if isinstance(obj, Notificacion):
+            pendientes.append((obj.cliente_id, "notificacion", {
+                "id": str(obj.id),
+                "titulo": obj.titulo,
+                "mensaje": obj.mensaje,
+                "fecha": obj.fecha.isoformat() if obj.fecha else None,
+                "tipo": obj.tipo,
+                "referencia_id": obj.referencia_id,
+            }))
+    for obj in session.dirty:
+        if isinstance(obj, Pedido):
+            # En after_flush el historial del atributo todavía no se reinició.
+            historial = inspect(obj).attrs.estado.history
+            if historial.has_changes():
+                pendientes.append((obj.cliente_id, "pedido_estado", {
+                    "pedido_id": str(obj.id),
+                    "estado_anterior": historial.deleted[0] if historial.deleted else None,
+                    "estado": obj.estado,
+                }))
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_eventos(session):
+    for cliente_id, tipo, datos in session.info.pop("eventos_difusion", ()):
+        difusor.publicar(cliente_id, tipo, datos)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_eventos(session):
+    session.info.pop("eventos_difusion", None)
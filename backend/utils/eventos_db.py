@@ -0,0 +1,53 @@
+#utils/eventos_db.py
+"""
+Avisos de cambios confirmados en la base de datos.
+
+Las cachés en memoria (catálogo, índices, etc.) se registran con `al_confirmar`
+para enterarse de qué filas de ciertos modelos se insertaron, modificaron o
+eliminaron en cada transacción. El aviso solo se emite tras un commit exitoso;
+si la transacción se revierte, los cambios registrados se descartan.
+
+Nota: las sentencias masivas (`query.update()`, `insert()` de Core) no pasan
+por la unidad de trabajo del ORM y por lo tanto no generan aviso.
+"""
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_suscriptores: list[tuple[tuple[type, ...], Callable]] = []
+
+
+def al_confirmar(*modelos):
+    """
+    Decorador: registra `callback(cambios)` para que se ejecute después de cada
+    commit que haya tocado instancias de `modelos`.
+    `cambios` es un conjunto de tuplas (Modelo, id).
+    """
+    def decorador(callback):
+        _suscriptores.append((modelos, callback))
+        return callback
+    return decorador
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios(session, flush_context):
+    cambios = session.info.setdefault("cambios_confirmables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        cambios.add((type(obj), getattr(obj, "id", None)))
+
+
+@event.listens_for(Session, "after_commit")
+def _notificar_cambios(session):
+    cambios = session.info.pop("cambios_confirmables", None)
+    if not cambios:
+        return
+    for modelos, callback in _suscriptores:
+        relevantes = {(m, i) for (m, i) in cambios if issubclass(m, modelos)}
+        if relevantes:
+            callback(relevantes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(session):
+    session.info.pop("cambios_confirmables", None)
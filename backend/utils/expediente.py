@@ -0,0 +1,164 @@
+#utils/expediente.py
+"""
+EXPEDIENTE CLÍNICO DE UNA MASCOTA
+----------------------------------
+Carga en bloque los datos de la mascota y sus sub-registros clínicos
+(alergias, condiciones de salud, preferencias alimentarias y la última
+descripción de alergias): una consulta para la mascota y una por cada grupo
+con `selectinload`, en lugar de una consulta por tabla en cada endpoint.
+
+El resultado se guarda ya convertido a tipos simples en una caché con TTL
+corto (`EXPEDIENTE_TTL_SEGUNDOS`, 60 s por defecto) por `registro_mascota_id`:
+el nutricionista suele abrir el mismo expediente varias veces seguidas.
+
+- Un commit que modifica la mascota descarta su entrada; uno que toca
+  cualquier sub-registro vacía la caché completa (los avisos de
+  utils.eventos_db solo traen el id del sub-registro, no el de la mascota).
+- Las sentencias masivas no generan aviso: en ese caso vale el TTL, que también
+  es lo que hace converger a los demás workers.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from models import AlergiaMascota, CondicionSalud, DescripcionAlergias, PreferenciaAlimentaria, RegistroMascota
+from utils.eventos_db import al_confirmar
+
+EXPEDIENTE_TTL_SEGUNDOS = float(os.getenv("EXPEDIENTE_TTL_SEGUNDOS", "60"))
+EXPEDIENTE_CAPACIDAD = int(os.getenv("EXPEDIENTE_CAPACIDAD", "2000"))
+
+
+@dataclass(frozen=True)
+class ExpedienteClinico:
+    """Instantánea de solo lectura; las listas se comparten entre peticiones."""
+    id: int
+    nombre: str
+    sexo: str
+    edad: int
+    raza: str | None
+    peso: float | None
+    foto: str | None
+    observaciones: str | None
+    estado_registro: str
+    especie: str | None
+    # {"id", "alergia_especie_id", "alergia", "severidad"}
+    alergias: list[dict]
+    # {"id", "nombre", "fecha", "estado_registro"}
+    condiciones: list[dict]
+    # {"id", "nombre", "descripcion"}
+    preferencias: list[dict]
+    descripcion_alergias: str | None
+
+
+def _construir(m: RegistroMascota) -> ExpedienteClinico:
+    ultima_descripcion = max(m.descripcion_alergias, key=lambda d: d.fecha, default=None)
+    return ExpedienteClinico(
+        id=int(m.id),
+        nombre=m.nombre,
+        sexo=m.sexo,
+        edad=m.edad,
+        raza=m.raza,
+        peso=float(m.peso) if m.peso else None,
+        foto=m.foto,
+        observaciones=m.observaciones,
+        estado_registro=m.estado_registro,
+        especie=m.especie.nombre if m.especie else None,
+        alergias=[
+            {
+                "id": str(a.id),
+                "alergia_especie_id": a.alergia_especie_id,
+                "alergia": a.alergia_especie.nombre if a.alergia_especie else None,
+                "severidad": a.severidad,
+            }
+            for a in m.alergia_mascota
+        ],
+        condiciones=[
+            {
+                "id": str(c.id),
+                "nombre": c.nombre,
+                "fecha": c.fecha.isoformat() if c.fecha else None,
+                "estado_registro": c.estado_registro,
+            }
+            for c in m.condicion_salud
+        ],
+        preferencias=[
+            {"id": str(p.id), "nombre": p.nombre, "descripcion": p.descripcion}
+            for p in m.preferencia_alimentaria
+        ],
+        descripcion_alergias=ultima_descripcion.descripcion if ultima_descripcion else None,
+    )
+
+
+class CacheExpedientes:
+    def __init__(self, ttl: float = EXPEDIENTE_TTL_SEGUNDOS, capacidad: int = EXPEDIENTE_CAPACIDAD):
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        self._entradas: OrderedDict[int, tuple[float, ExpedienteClinico]] = OrderedDict()
+        # Sube con cada invalidación: una carga que empezó antes no se guarda.
+        self.generacion = 0
+
+    def obtener(self, db: Session, registro_mascota_id) -> ExpedienteClinico | None:
+        """Expediente de la mascota, o None si no existe."""
+        try:
+            clave = int(registro_mascota_id)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                return entrada[1]
+            generacion = self.generacion
+
+        mascota = db.execute(
+            select(RegistroMascota)
+            .options(
+                joinedload(RegistroMascota.especie),
+                selectinload(RegistroMascota.alergia_mascota).joinedload(AlergiaMascota.alergia_especie),
+                selectinload(RegistroMascota.condicion_salud),
+                selectinload(RegistroMascota.preferencia_alimentaria),
+                selectinload(RegistroMascota.descripcion_alergias),
+            )
+            .where(RegistroMascota.id == clave)
+        ).scalar_one_or_none()
+        if mascota is None:
+            return None
+        expediente = _construir(mascota)
+
+        with self._lock:
+            if generacion == self.generacion:
+                self._entradas[clave] = (time.monotonic() + self.ttl, expediente)
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.capacidad:
+                    self._entradas.popitem(last=False)
+        return expediente
+
+    def descartar(self, *ids):
+        with self._lock:
+            self.generacion += 1
+            for i in ids:
+                self._entradas.pop(int(i), None)
+
+    def vaciar(self):
+        with self._lock:
+            self.generacion += 1
+            self._entradas.clear()
+
+
+expedientes = CacheExpedientes()
+
+
+@al_confirmar(RegistroMascota)
+def _invalidar_mascotas(cambios):
+    expedientes.descartar(*(i for _, i in cambios if i is not None))
+
+
+@al_confirmar(AlergiaMascota, CondicionSalud, PreferenciaAlimentaria, DescripcionAlergias)
+def _invalidar_sub_registros(cambios):
+    expedientes.vaciar()
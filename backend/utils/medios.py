@@ -0,0 +1,203 @@
+#utils/medios.py
+"""
+ALMACÉN DE IMÁGENES Y VARIANTES
+-------------------------------
+Las imágenes subidas (fotos de cliente y de mascota, platos del nutricionista)
+se guardan direccionadas por contenido: `static/medios/<ab>/<sha256>.<ext>`.
+Subir dos veces la misma imagen no ocupa espacio extra.
+
+Por cada imagen se generan variantes redimensionadas (`VARIANTES`) en un pool
+de hilos en segundo plano, junto al original:
+`static/medios/<ab>/<clave>_<variante>.webp`. Para las imágenes que ya
+estaban en `static/imagenes` (catálogo, fotos por defecto) la clave se deriva
+de la ruta, la fecha de modificación y el tamaño.
+
+`medios.urls(base_url, ruta)` devuelve {variante: url}. Mientras una variante
+no está lista (recién subida, o primer uso tras reiniciar el worker), su URL
+apunta al original y se programa la generación; la petición nunca espera al
+redimensionado ni hace `stat` de archivos.
+
+Requiere Pillow (`pip install pillow`). Sin Pillow las imágenes se guardan y
+deduplican igual, pero todas las variantes apuntan al original.
+
+Variables de entorno:
+- MEDIOS_FORMATO: "webp" (por defecto) o "jpeg".
+- MEDIOS_HILOS: hilos del pool de generación (2).
+- MEDIOS_CAPACIDAD: imágenes recordadas como "variantes listas" (50000).
+"""
+import contextlib
+import hashlib
+import importlib.util
+import logging
+import os
+import posixpath
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, UploadFile
+
+from utils.archivos import SUBIDA_TAMANO_MAX, guardar_subida
+
+logger = logging.getLogger(__name__)
+
+MEDIOS = "static/medios"
+MEDIOS_FORMATO = os.getenv("MEDIOS_FORMATO", "webp").lower()
+MEDIOS_HILOS = int(os.getenv("MEDIOS_HILOS", "2"))
+MEDIOS_CAPACIDAD = int(os.getenv("MEDIOS_CAPACIDAD", "50000"))
+
+# nombre → (ancho, alto, recortar al cuadro). Sin recorte, la imagen cabe en el
+# cuadro manteniendo la proporción y nunca se agranda.
+VARIANTES = {
+    "miniatura": (320, 320, False),  # listados
+    "detalle": (1080, 1080, False),  # pantalla de detalle
+    "avatar": (128, 128, True),  # fotos de perfil
+}
+EXTENSIONES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+_CONTENIDO = re.compile(r"[0-9a-f]{64}")
+
+
+def ruta_imagen(imagen: str | None, carpeta: str) -> str | None:
+    """
+    Ruta relativa de una imagen guardada en la base de datos. Las del almacén
+    de medios ya traen la ruta completa (`static/medios/...`); las anteriores
+    solo el nombre del archivo dentro de `carpeta` (p. ej. globals.PLATO).
+    """
+    if not imagen:
+        return None
+    imagen = imagen.replace("\\", "/")
+    if not imagen.startswith("static/"):
+        imagen = f"{carpeta}/{imagen.lstrip('/')}"
+    return posixpath.normpath(imagen)
+
+
+class AlmacenMedios:
+    def __init__(self, carpeta: str = MEDIOS, hilos: int = MEDIOS_HILOS, capacidad: int = MEDIOS_CAPACIDAD):
+        self.carpeta = carpeta
+        self.hilos = hilos
+        self.capacidad = capacidad
+        self.extension = ".jpg" if MEDIOS_FORMATO == "jpeg" else ".webp"
+        self.disponible = importlib.util.find_spec("PIL") is not None
+        self._lock = threading.Lock()
+        # ruta del original → {variante: ruta}; solo imágenes ya procesadas.
+        self._listas: OrderedDict[str, dict[str, str]] = OrderedDict()
+        self._en_curso: set[str] = set()
+        self._ejecutor: ThreadPoolExecutor | None = None
+
+    # -----------------------------------------------------------------------
+    # Subida
+    # -----------------------------------------------------------------------
+    def guardar(self, archivo: UploadFile, tamano_max: int = SUBIDA_TAMANO_MAX) -> str:
+        """Guarda la imagen por contenido y programa sus variantes. Devuelve la ruta del original."""
+        extension = os.path.splitext(archivo.filename or "")[1].lower()
+        if extension not in EXTENSIONES:
+            raise HTTPException(status_code=415, detail="Formato de imagen no soportado.")
+
+        subida = guardar_subida(archivo, self.carpeta, f"{uuid.uuid4().hex}.subida", tamano_max)
+        ruta = f"{self.carpeta}/{subida.sha256[:2]}/{subida.sha256}{extension}"
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        if os.path.exists(ruta):
+            os.remove(subida.ruta)  # Misma imagen ya guardada
+        else:
+            os.replace(subida.ruta, ruta)
+        self._programar(ruta)
+        return ruta
+
+    # -----------------------------------------------------------------------
+    # Lectura
+    # -----------------------------------------------------------------------
+    def rutas(self, ruta: str) -> dict[str, str]:
+        """{variante: ruta relativa}; las que aún no existen apuntan al original."""
+        ruta = ruta.replace("\\", "/")
+        with self._lock:
+            listas = self._listas.get(ruta)
+            if listas is not None:
+                self._listas.move_to_end(ruta)
+                return listas
+        self._programar(ruta)
+        return {nombre: ruta for nombre in VARIANTES}
+
+    def urls(self, base_url: str, ruta: str | None) -> dict[str, str] | None:
+        if not ruta:
+            return None
+        return {nombre: f"{base_url}/{r}" for nombre, r in self.rutas(ruta).items()}
+
+    # -----------------------------------------------------------------------
+    # Generación en segundo plano
+    # -----------------------------------------------------------------------
+    def _programar(self, ruta: str):
+        if not self.disponible:
+            return
+        with self._lock:
+            if ruta in self._en_curso or ruta in self._listas:
+                return
+            self._en_curso.add(ruta)
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(self.hilos, thread_name_prefix="medios")
+            ejecutor = self._ejecutor
+        ejecutor.submit(self._preparar, ruta)
+
+    def _preparar(self, ruta: str):
+        try:
+            listas = self._generar(ruta)
+        except Exception:
+            # Imagen ilegible o borrada: se sirve el original y no se reintenta.
+            logger.warning("no se pudieron generar las variantes", extra={"ruta": ruta}, exc_info=True)
+            listas = {nombre: ruta for nombre in VARIANTES}
+        with self._lock:
+            self._en_curso.discard(ruta)
+            self._listas[ruta] = listas
+            while len(self._listas) > self.capacidad:
+                self._listas.popitem(last=False)
+
+    def _clave(self, ruta: str) -> str:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        if ruta.startswith(self.carpeta + "/") and _CONTENIDO.fullmatch(nombre):
+            return nombre
+        datos = os.stat(ruta)
+        return hashlib.sha256(f"{ruta}:{datos.st_mtime_ns}:{datos.st_size}".encode()).hexdigest()
+
+    def _generar(self, ruta: str) -> dict[str, str]:
+        clave = self._clave(ruta)
+        destinos = {
+            nombre: f"{self.carpeta}/{clave[:2]}/{clave}_{nombre}{self.extension}" for nombre in VARIANTES
+        }
+        faltantes = [nombre for nombre, destino in destinos.items() if not os.path.exists(destino)]
+        if not faltantes:
+            return destinos
+
+        from PIL import Image, ImageOps
+
+        os.makedirs(f"{self.carpeta}/{clave[:2]}", exist_ok=True)
+        with Image.open(ruta) as original:
+            imagen = ImageOps.exif_transpose(original)
+            if self.extension == ".jpg" or imagen.mode not in ("RGB", "RGBA"):
+                transparente = "A" in imagen.getbands() or "transparency" in imagen.info
+                imagen = imagen.convert("RGBA" if self.extension == ".webp" and transparente else "RGB")
+            for nombre in faltantes:
+                ancho, alto, recortar = VARIANTES[nombre]
+                if recortar:
+                    variante = ImageOps.fit(imagen, (ancho, alto))
+                else:
+                    variante = imagen.copy()
+                    variante.thumbnail((ancho, alto))
+                temporal = f"{destinos[nombre]}.{uuid.uuid4().hex}.parte"
+                try:
+                    variante.save(temporal, format=MEDIOS_FORMATO.upper(), quality=80)
+                    os.replace(temporal, destinos[nombre])
+                except BaseException:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(temporal)
+                    raise
+        return destinos
+
+    def detener(self):
+        with self._lock:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+
+medios = AlmacenMedios()
@@ -0,0 +1,221 @@
+#utils/metricas.py
+"""
+Métricas por petición: tiempo total, tiempo en base de datos, sentencias SQL,
+filas leídas y tiempo de serialización.
+
+- Los eventos de SQLAlchemy sobre `engine` y `async_engine` suman a la
+  `Medicion` de la petición en curso (guardada en un contextvar, que también
+  ven las rutas síncronas en el threadpool).
+- `RespuestaJSONMedida` (respuesta por defecto de la app) mide el render JSON
+  de `RespuestaJSON` (utils.respuestas).
+- `MiddlewareMetricas` crea la medición, agrega el encabezado `Server-Timing`
+  y acumula los totales por (método, plantilla de ruta).
+- `exportar_prometheus()` genera el texto que sirve `GET /metrics`.
+
+Las filas son las que informa el driver (`rowcount` de cada SELECT): exacto con
+los cursores con buffer de MySQL; las consultas en streaming (`yield_per`) no
+se cuentan. Los totales son por proceso: con varios workers, Prometheus debe
+consultar cada uno.
+"""
+import contextvars
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from utils.db import async_engine, engine
+from utils.respuestas import RespuestaJSON
+
+# Límites superiores (segundos) del histograma de duración de peticiones.
+CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class Medicion:
+    inicio: float
+    db_segundos: float = 0.0
+    sentencias: int = 0
+    filas: int = 0
+    serializacion_segundos: float = 0.0
+
+
+medicion_actual: contextvars.ContextVar[Medicion | None] = contextvars.ContextVar("medicion_actual", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Eventos de SQLAlchemy
+# ---------------------------------------------------------------------------
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_sentencia", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["inicio_sentencia"].pop()
+    medicion = medicion_actual.get()
+    if medicion is None:
+        return
+    medicion.db_segundos += time.perf_counter() - inicio
+    medicion.sentencias += 1
+    if cursor.description is not None and cursor.rowcount > 0:
+        medicion.filas += cursor.rowcount
+
+
+def _error_al_ejecutar(contexto):
+    # Si la sentencia falla no llega after_cursor_execute: se descarta su inicio.
+    pila = contexto.connection.info.get("inicio_sentencia") if contexto.connection is not None else None
+    if pila:
+        pila.pop()
+
+
+for _motor in (engine, async_engine.sync_engine):
+    event.listen(_motor, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(_motor, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(_motor, "handle_error", _error_al_ejecutar)
+
+
+# ---------------------------------------------------------------------------
+# Serialización
+# ---------------------------------------------------------------------------
+class RespuestaJSONMedida(RespuestaJSON):
+    def render(self, content) -> bytes:
+        inicio = time.perf_counter()
+        cuerpo = super().render(content)
+        medicion = medicion_actual.get()
+        if medicion is not None:
+            medicion.serializacion_segundos += time.perf_counter() - inicio
+        return cuerpo
+
+
+# ---------------------------------------------------------------------------
+# Acumulado por ruta
+# ---------------------------------------------------------------------------
+class _Acumulado:
+    __slots__ = ("por_estado", "cubetas", "segundos", "db_segundos", "sentencias", "filas", "serializacion_segundos")
+
+    def __init__(self):
+        self.por_estado: dict[int, int] = {}
+        self.cubetas = [0] * len(CUBETAS)
+        self.segundos = 0.0
+        self.db_segundos = 0.0
+        self.sentencias = 0
+        self.filas = 0
+        self.serializacion_segundos = 0.0
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rutas: dict[tuple[str, str], _Acumulado] = {}
+
+    def registrar(self, metodo: str, ruta: str, estado: int, segundos: float, medicion: Medicion):
+        with self._lock:
+            acumulado = self._rutas.get((metodo, ruta))
+            if acumulado is None:
+                acumulado = self._rutas[(metodo, ruta)] = _Acumulado()
+            acumulado.por_estado[estado] = acumulado.por_estado.get(estado, 0) + 1
+            for i, limite in enumerate(CUBETAS):
+                if segundos <= limite:
+                    acumulado.cubetas[i] += 1
+            acumulado.segundos += segundos
+            acumulado.db_segundos += medicion.db_segundos
+            acumulado.sentencias += medicion.sentencias
+            acumulado.filas += medicion.filas
+            acumulado.serializacion_segundos += medicion.serializacion_segundos
+
+    def exportar_prometheus(self) -> str:
+        with self._lock:
+            rutas = sorted(self._rutas.items())
+            lineas = [
+                "# HELP pawpals_peticiones_total Peticiones HTTP atendidas.",
+                "# TYPE pawpals_peticiones_total counter",
+            ]
+            for (metodo, ruta), a in rutas:
+                for estado, cantidad in sorted(a.por_estado.items()):
+                    lineas.append(f"pawpals_peticiones_total{{{_etiquetas(metodo, ruta)},estado=\"{estado}\"}} {cantidad}")
+
+            lineas += [
+                "# HELP pawpals_peticion_segundos Duración total de la petición.",
+                "# TYPE pawpals_peticion_segundos histogram",
+            ]
+            for (metodo, ruta), a in rutas:
+                etiquetas = _etiquetas(metodo, ruta)
+                total = sum(a.por_estado.values())
+                for limite, cantidad in zip(CUBETAS, a.cubetas):
+                    lineas.append(f"pawpals_peticion_segundos_bucket{{{etiquetas},le=\"{limite}\"}} {cantidad}")
+                lineas.append(f"pawpals_peticion_segundos_bucket{{{etiquetas},le=\"+Inf\"}} {total}")
+                lineas.append(f"pawpals_peticion_segundos_sum{{{etiquetas}}} {a.segundos:.6f}")
+                lineas.append(f"pawpals_peticion_segundos_count{{{etiquetas}}} {total}")
+
+            for nombre, atributo, ayuda in (
+                ("pawpals_db_segundos_total", "db_segundos", "Tiempo ejecutando SQL."),
+                ("pawpals_db_sentencias_total", "sentencias", "Sentencias SQL ejecutadas."),
+                ("pawpals_db_filas_total", "filas", "Filas devueltas por SELECT."),
+                ("pawpals_serializacion_segundos_total", "serializacion_segundos", "Tiempo serializando respuestas JSON."),
+            ):
+                lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter"]
+                for (metodo, ruta), a in rutas:
+                    valor = getattr(a, atributo)
+                    valor = f"{valor:.6f}" if isinstance(valor, float) else valor
+                    lineas.append(f"{nombre}{{{_etiquetas(metodo, ruta)}}} {valor}")
+        return "\n".join(lineas) + "\n"
+
+
+def _etiquetas(metodo: str, ruta: str) -> str:
+    ruta = ruta.replace("\\", "\\\\").replace('"', '\\"')
+    return f'metodo="{metodo}",ruta="{ruta}"'
+
+
+metricas = RegistroMetricas()
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+def _server_timing(medicion: Medicion, segundos: float) -> bytes:
+    return (
+        f"app;dur={segundos * 1000:.1f}, "
+        f"db;dur={medicion.db_segundos * 1000:.1f};desc=\"{medicion.sentencias} sentencias, {medicion.filas} filas\", "
+        f"ser;dur={medicion.serializacion_segundos * 1000:.1f}"
+    ).encode()
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI. El encabezado `Server-Timing` refleja lo ocurrido hasta
+    que empieza la respuesta; en respuestas en streaming, lo que se consulte
+    después solo aparece en /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        medicion = Medicion(inicio=time.perf_counter())
+        token = medicion_actual.set(medicion)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                encabezados = list(mensaje.get("headers", []))
+                encabezados.append((b"server-timing", _server_timing(medicion, time.perf_counter() - medicion.inicio)))
+                mensaje = {**mensaje, "headers": encabezados}
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicion_actual.reset(token)
+            ruta = scope.get("route")
+            metricas.registrar(
+                scope["method"],
+                getattr(ruta, "path", "sin_ruta"),
+                estado,
+                time.perf_counter() - medicion.inicio,
+                medicion,
+            )
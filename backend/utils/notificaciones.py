@@ -0,0 +1,101 @@
+#utils/notificaciones.py
+"""
+NOTIFICACIONES DEL CLIENTE
+--------------------------
+- `crear_notificacion` arma la fila `Notificacion` (sin hacer commit).
+- `no_leidas` guarda el contador de notificaciones sin leer por cliente, para
+  que el badge de la app se resuelva sin leer la bandeja. En caché falla, se
+  calcula con un COUNT sobre el índice notificacion(cliente_id, leido, fecha).
+- `marcar_leidas` marca en bloque (un solo UPDATE) todas, algunas o las
+  anteriores a una fecha.
+
+Después de confirmar cualquier cambio, quien lo hizo llama a
+`no_leidas.descartar(cliente_id)`. Los avisos de utils.eventos_db no sirven
+aquí: solo traen el id de la notificación y el UPDATE masivo no los genera.
+Los demás workers convergen por el TTL (`NO_LEIDAS_TTL_SEGUNDOS`, 30 s).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models import Notificacion
+from utils import keygen
+
+NO_LEIDAS_TTL_SEGUNDOS = float(os.getenv("NO_LEIDAS_TTL_SEGUNDOS", "30"))
+NO_LEIDAS_CAPACIDAD = int(os.getenv("NO_LEIDAS_CAPACIDAD", "50000"))
+
+
+def crear_notificacion(db: Session, cliente_id, titulo: str, mensaje: str, tipo: str, referencia_id) -> Notificacion:
+    notificacion = Notificacion(
+        id=keygen.generate_uint64_key(),
+        cliente_id=cliente_id,
+        titulo=titulo,
+        mensaje=mensaje,
+        fecha=datetime.now(),
+        leido=0, # 0 = No leído
+        tipo=tipo,
+        referencia_id=str(referencia_id),
+    )
+    db.add(notificacion)
+    return notificacion
+
+
+def marcar_leidas(db: Session, cliente_id, ids: list[str] | None = None, hasta: datetime | None = None) -> int:
+    """
+    Marca como leídas las notificaciones sin leer del cliente (todas, solo `ids`
+    o solo las anteriores o iguales a `hasta`). Devuelve cuántas cambiaron.
+    No hace commit.
+    """
+    sentencia = update(Notificacion).where(Notificacion.cliente_id == cliente_id, Notificacion.leido == 0)
+    if ids is not None:
+        sentencia = sentencia.where(Notificacion.id.in_(ids))
+    if hasta is not None:
+        sentencia = sentencia.where(Notificacion.fecha <= hasta)
+    return db.execute(sentencia.values(leido=1), execution_options={"synchronize_session": False}).rowcount
+
+
+class ContadorNoLeidas:
+    def __init__(self, ttl: float = NO_LEIDAS_TTL_SEGUNDOS, capacidad: int = NO_LEIDAS_CAPACIDAD):
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        self._entradas: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        # Sube con cada invalidación: un conteo que empezó antes no se guarda.
+        self.generacion = 0
+
+    def obtener(self, db: Session, cliente_id) -> int:
+        clave = str(cliente_id)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                return entrada[1]
+            generacion = self.generacion
+
+        total = db.scalar(
+            select(func.count())
+            .select_from(Notificacion)
+            .where(Notificacion.cliente_id == clave, Notificacion.leido == 0)
+        )
+
+        with self._lock:
+            if generacion == self.generacion:
+                self._entradas[clave] = (time.monotonic() + self.ttl, total)
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.capacidad:
+                    self._entradas.popitem(last=False)
+        return total
+
+    def descartar(self, *cliente_ids):
+        with self._lock:
+            self.generacion += 1
+            for i in cliente_ids:
+                self._entradas.pop(str(i), None)
+
+
+no_leidas = ContadorNoLeidas()
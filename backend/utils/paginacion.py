@@ -0,0 +1,31 @@
+#utils/paginacion.py
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+
+def codificar_cursor(*valores) -> str:
+    """
+    Codifica la clave de la última fila entregada en un cursor opaco (base64 url-safe).
+    Los valores no serializables en JSON (fechas, Decimal) se guardan como texto.
+    """
+    crudo = json.dumps(valores, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, *tipos) -> list:
+    """
+    Recupera los valores codificados por `codificar_cursor`, convirtiendo cada
+    uno con el tipo correspondiente de `tipos` (p. ej. `int`, `datetime.fromisoformat`).
+    Lanza 400 si el cursor fue manipulado o no corresponde a este formato.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(tipos):
+            raise ValueError
+        return [tipo(v) for tipo, v in zip(tipos, valores)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido.")
@@ -0,0 +1,95 @@
+#utils/pedidos.py
+"""
+Creación de pedidos con precios del catálogo.
+
+Se usa desde el checkout del cliente: todos los platos se consultan en una sola
+sentencia (`IN`), los subtotales y el total se calculan en el servidor y los
+`DetallePedido` se insertan con un único INSERT masivo. El número de viajes a
+la base de datos no depende de la cantidad de líneas del pedido.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import DetallePedido, Pedido, PlatoCombinado
+from utils import keygen
+
+CENTAVO = Decimal("0.01")
+
+
+def agrupar_items(platos: list[dict]) -> dict[int, int]:
+    """
+    Convierte las líneas recibidas ([{plato_id, cantidad}, ...]) en
+    {plato_id: cantidad}, sumando las líneas repetidas del mismo plato.
+    """
+    items: dict[int, int] = {}
+    for item in platos:
+        try:
+            plato_id = int(item.get("plato_id"))
+            cantidad = int(item.get("cantidad", 1))
+        except (TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Formato de platos inválido.")
+        if cantidad < 1:
+            raise HTTPException(status_code=400, detail="La cantidad de cada plato debe ser al menos 1.")
+        items[plato_id] = items.get(plato_id, 0) + cantidad
+    return items
+
+
+def registrar_pedido(
+    db: Session,
+    cliente_id: str,
+    direccion_id: str,
+    items: dict[int, int],
+    total_esperado: float | None = None,
+) -> Pedido:
+    """
+    Agrega a la sesión un `Pedido` pendiente con sus detalles (no hace commit).
+
+    Los precios salen del catálogo; si se indica `total_esperado` (el total que
+    mostró el cliente) y no coincide con el calculado, se rechaza el pedido para
+    que la app refresque los precios.
+    """
+    precios = dict(
+        db.execute(
+            select(PlatoCombinado.id, PlatoCombinado.precio).where(PlatoCombinado.id.in_(items))
+        ).all()
+    )
+    for plato_id in items:
+        if plato_id not in precios:
+            raise HTTPException(status_code=404, detail=f"El plato con ID {plato_id} no existe.")
+
+    pedido_id = keygen.generate_uint64_key()
+    lineas = [
+        {
+            "id": keygen.generate_uint64_key(),
+            "pedido_id": pedido_id,
+            "plato_combinado_id": plato_id,
+            "cantidad": cantidad,
+            "subtotal": (precios[plato_id] * cantidad).quantize(CENTAVO),
+        }
+        for plato_id, cantidad in items.items()
+    ]
+    total = sum((l["subtotal"] for l in lineas), Decimal("0"))
+    if total_esperado is not None and abs(Decimal(str(total_esperado)) - total) >= CENTAVO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El total enviado no coincide con los precios actuales (total real: {total}).",
+        )
+
+    pedido = Pedido(
+        id=pedido_id,
+        cliente_id=cliente_id,
+        direccion_id=direccion_id,
+        fecha=datetime.now(),
+        total=total,
+        estado="pendiente",
+        incluye_plato=True,
+    )
+    db.add(pedido)
+    # El pedido debe existir antes que sus detalles (FK); la sesión no hace autoflush.
+    db.flush()
+    db.execute(insert(DetallePedido), lineas)
+    return pedido
@@ -0,0 +1,168 @@
+#utils/referencia.py
+"""
+INSTANTÁNEA DE DATOS DE REFERENCIA
+----------------------------------
+Categorías, especies, etiquetas, razas y planes de suscripción en un solo
+documento, para que la app arranque con una sola petición
+(`GET /cliente/referencia/`).
+
+La instantánea se guarda ya serializada (JSON compacto) y comprimida con gzip
+y, si está instalado el paquete `brotli`, también con Brotli. Servirla no
+consulta la base de datos ni serializa ni comprime nada.
+
+- `version` es un resumen del contenido: es el mismo en todos los workers si
+  los datos son iguales, así que sirve como ETag.
+- Se reconstruye de forma perezosa, como el catálogo: tras un commit que toque
+  esos modelos (ver utils.eventos_db) o al vencer `CATALOGO_TTL_SEGUNDOS`, para
+  que los demás workers converjan solos.
+- Las rutas individuales (/cliente/platos-mascotas/categorias, etc.) leen de
+  la misma instantánea.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+from slugify import slugify
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Categoria, Especie, Etiqueta, EtiquetaPlato, MembresiaSubscripcion, PlatoCombinado
+from utils.catalogo import CATALOGO_TTL_SEGUNDOS
+from utils.eventos_db import al_confirmar
+from utils.respuestas import BROTLI_DISPONIBLE, codificaciones_aceptadas, serializar
+
+# Lista predefinida de razas por ID de especie (1: perro, 2: gato).
+# En un futuro podría venir de la base de datos.
+RAZAS_POR_ESPECIE = {
+    1: sorted(["Mestizo", "Labrador Retriever", "Bulldog Francés", "Pastor Alemán", "Golden Retriever", "Chihuahua", "Beagle"]),
+    2: sorted(["Mestizo", "Siamés", "Persa", "Maine Coon", "Bengalí", "Ragdoll", "Esfinge"]),
+}
+RAZAS_POR_DEFECTO = ["No especificado"]
+
+
+def plan_a_dict(p: MembresiaSubscripcion) -> dict:
+    return {
+        "id": str(p.id),
+        "nombre": p.nombre,
+        "duracion": p.duracion,
+        "precio": float(p.precio),
+        "descripcion": p.descripcion,
+        # La cadena de beneficios se guarda separada por comas
+        "beneficios": p.beneficios.split(',') if p.beneficios else [],
+    }
+
+
+@dataclass(frozen=True)
+class Instantanea:
+    datos: dict
+    version: str
+    json: bytes
+    gzip: bytes
+    br: bytes | None
+
+    def cuerpo(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        """(bytes, Content-Encoding) según lo que acepte el cliente: br > gzip > sin comprimir."""
+        aceptadas = codificaciones_aceptadas(accept_encoding)
+        if self.br is not None and "br" in aceptadas:
+            return self.br, "br"
+        if "gzip" in aceptadas:
+            return self.gzip, "gzip"
+        return self.json, None
+
+
+def construir_instantanea(datos: dict) -> Instantanea:
+    version = hashlib.sha256(
+        json.dumps(datos, ensure_ascii=False, sort_keys=True).encode()
+    ).hexdigest()[:16]
+    crudo = serializar({"version": version, **datos})
+    br = None
+    if BROTLI_DISPONIBLE:
+        import brotli
+
+        br = brotli.compress(crudo, quality=11)
+    return Instantanea(
+        datos=datos,
+        version=version,
+        json=crudo,
+        gzip=gzip.compress(crudo, compresslevel=9, mtime=0),
+        br=br,
+    )
+
+
+class DatosReferencia:
+    def __init__(self, ttl: float = CATALOGO_TTL_SEGUNDOS):
+        self.ttl = ttl
+        self.generacion = 0
+        self._lock_async = asyncio.Lock()
+        self._instantanea: Instantanea | None = None
+        self._vence = 0.0
+
+    def invalidar(self):
+        self._vence = 0.0
+        self.generacion += 1
+
+    def _vigente(self) -> bool:
+        return self._instantanea is not None and time.monotonic() < self._vence
+
+    @staticmethod
+    async def _consultar(db: AsyncSession) -> dict:
+        categorias = (await db.scalars(select(Categoria).where(Categoria.estado_registro == "A"))).all()
+        especies = (await db.scalars(select(Especie).where(Especie.estado_registro == "A"))).all()
+        etiquetas = (
+            await db.scalars(
+                select(Etiqueta)
+                .join(Etiqueta.etiqueta_plato)
+                .join(EtiquetaPlato.plato_combinado)
+                .where(
+                    PlatoCombinado.estado_registro == "A",
+                    PlatoCombinado.publicado == 1,
+                )
+                .distinct()
+            )
+        ).all()
+        planes = (
+            await db.scalars(select(MembresiaSubscripcion).where(MembresiaSubscripcion.estado_registro == "A"))
+        ).all()
+        return {
+            "categorias": [
+                {
+                    "id": str(c.id),
+                    "nombre": c.nombre,
+                    "descripcion": c.descripcion,
+                    "slug": slugify(c.nombre, separator="-"),
+                }
+                for c in categorias
+            ],
+            "especies": [{"id": str(e.id), "nombre": e.nombre} for e in especies],
+            "etiquetas": [{"id": str(e.id), "nombre": e.nombre} for e in etiquetas],
+            "razas": {str(especie_id): razas for especie_id, razas in RAZAS_POR_ESPECIE.items()},
+            "subscripciones": [plan_a_dict(p) for p in planes],
+        }
+
+    async def obtener_async(self, db: AsyncSession) -> Instantanea:
+        if self._vigente():
+            return self._instantanea
+        async with self._lock_async:
+            if self._vigente():
+                return self._instantanea
+            generacion = self.generacion
+            instantanea = construir_instantanea(await self._consultar(db))
+            self._instantanea = instantanea
+            # Si llegó una invalidación mientras se consultaba, no extender la vigencia.
+            if generacion == self.generacion:
+                self._vence = time.monotonic() + self.ttl
+            return instantanea
+
+    async def precargar_async(self, db: AsyncSession):
+        await self.obtener_async(db)
+
+
+referencia = DatosReferencia()
+
+
+@al_confirmar(Categoria, Especie, Etiqueta, EtiquetaPlato, PlatoCombinado, MembresiaSubscripcion)
+def _invalidar_referencia(cambios):
+    referencia.invalidar()
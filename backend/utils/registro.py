@@ -0,0 +1,203 @@
+#utils/registro.py
+"""
+Registro (logging) estructurado y no bloqueante.
+
+Los módulos usan `logging.getLogger(__name__)` y registran con `extra={...}`
+solo identificadores y datos técnicos (nunca nombres, correos ni teléfonos).
+`configurar_registro()` instala en el logger raíz un handler que solo encola
+el registro; un hilo aparte (QueueListener) lo serializa en JSON, una línea
+por evento, y lo escribe en stdout. La petición nunca espera por stdout: si la
+cola se llena, el registro se descarta y se cuenta en `descartados`.
+
+Variables de entorno:
+- LOG_NIVEL: nivel por defecto (INFO).
+- LOG_NIVELES: nivel por prefijo de ruta, p. ej. "/cliente/platos=WARNING,/auth=INFO".
+- LOG_MUESTREO: fracción de registros DEBUG/INFO que se conservan por prefijo
+  de ruta, p. ej. "/cliente/platos=0.05". WARNING y superiores no se muestrean.
+- LOG_COLA: capacidad de la cola (10000).
+
+La ruta de cada registro la fija `MiddlewareRegistro`, que además emite un
+evento "peticion" por request con método, ruta, estado y duración.
+"""
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+ruta_actual: contextvars.ContextVar[str | None] = contextvars.ContextVar("ruta_actual", default=None)
+
+# Atributos propios de LogRecord; el resto llegó por `extra` y va al JSON.
+_ATRIBUTOS_BASE = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "ruta"}
+
+logger_peticiones = logging.getLogger("peticiones")
+
+
+def _nivel(nombre: str) -> int:
+    nivel = logging.getLevelName(nombre.strip().upper())
+    if not isinstance(nivel, int):
+        raise ValueError(f"Nivel de log desconocido: {nombre}")
+    return nivel
+
+
+def _por_ruta(valor: str | None, convertir) -> list[tuple[str, object]]:
+    """Parsea "prefijo=valor,..." y ordena del prefijo más largo al más corto."""
+    reglas = []
+    for parte in (valor or "").split(","):
+        if "=" in parte:
+            prefijo, dato = parte.split("=", 1)
+            reglas.append((prefijo.strip(), convertir(dato)))
+    return sorted(reglas, key=lambda regla: len(regla[0]), reverse=True)
+
+
+def _buscar(reglas, ruta: str | None, defecto):
+    if ruta is not None:
+        for prefijo, valor in reglas:
+            if ruta.startswith(prefijo):
+                return valor
+    return defecto
+
+
+class FiltroRuta(logging.Filter):
+    """Aplica el nivel y la tasa de muestreo configurados para la ruta en curso."""
+
+    def __init__(self, nivel: int, niveles, muestreo):
+        super().__init__()
+        self.nivel = nivel
+        self.niveles = niveles
+        self.muestreo = muestreo
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ruta = ruta_actual.get()
+        record.ruta = ruta
+        if record.levelno < _buscar(self.niveles, ruta, self.nivel):
+            return False
+        if record.levelno >= logging.WARNING:
+            return True
+        tasa = _buscar(self.muestreo, ruta, 1.0)
+        return tasa >= 1.0 or random.random() < tasa
+
+
+class FormatoJSON(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        if getattr(record, "ruta", None):
+            datos["ruta"] = record.ruta
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_BASE:
+                datos[clave] = valor
+        if record.exc_text:
+            datos["excepcion"] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaNoBloqueante(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (y cuenta) en lugar de bloquear si la cola está llena."""
+
+    def __init__(self, cola: queue.Queue):
+        super().__init__(cola)
+        self.descartados = 0
+        self._formato_excepciones = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Se resuelve aquí lo que no puede cruzar de hilo (args, traceback);
+        # el JSON se arma en el hilo del listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formato_excepciones.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configurar_registro():
+    """Instala el handler en cola en el logger raíz. Idempotente."""
+    global _listener
+    if _listener is not None:
+        return
+    nivel = _nivel(os.getenv("LOG_NIVEL", "INFO"))
+    niveles = _por_ruta(os.getenv("LOG_NIVELES"), _nivel)
+    muestreo = _por_ruta(os.getenv("LOG_MUESTREO"), float)
+
+    salida = logging.StreamHandler(sys.stdout)
+    salida.setFormatter(FormatoJSON())
+
+    handler = ColaNoBloqueante(queue.Queue(int(os.getenv("LOG_COLA", "10000"))))
+    handler.addFilter(FiltroRuta(nivel, niveles, muestreo))
+
+    raiz = logging.getLogger()
+    raiz.handlers = [handler]
+    # El filtro decide por ruta; el logger raíz solo corta por debajo del nivel más bajo configurado.
+    raiz.setLevel(min([nivel, *(n for _, n in niveles)]))
+
+    _listener = logging.handlers.QueueListener(handler.queue, salida)
+    _listener.start()
+
+
+def detener_registro():
+    """Vacía la cola y detiene el hilo de escritura."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class MiddlewareRegistro:
+    """
+    Middleware ASGI: fija `ruta_actual` para los registros de la petición y
+    emite un evento "peticion" al terminar. No registra query strings ni
+    cuerpos, que pueden contener datos personales.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = ruta_actual.set(scope["path"])
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            ruta = scope.get("route")
+            logger_peticiones.info(
+                "peticion",
+                extra={
+                    "metodo": scope["method"],
+                    "plantilla": getattr(ruta, "path", None),
+                    "estado": estado,
+                    "duracion_ms": round((time.perf_counter() - inicio) * 1000, 2),
+                },
+            )
+            ruta_actual.reset(token)
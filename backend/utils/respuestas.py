@@ -0,0 +1,260 @@
+#utils/respuestas.py
+"""
+SERIALIZACIÓN Y COMPRESIÓN DE RESPUESTAS
+----------------------------------------
+- `RespuestaJSON`: respuesta JSON con orjson (`pip install orjson`); sin
+  orjson usa `json` de la biblioteca estándar con la misma salida compacta.
+  `datetime`, `date`, `UUID` y `Decimal` se serializan directamente (Decimal
+  como número), de modo que una ruta puede devolver las columnas tal cual.
+  Un modelo de Pydantic se serializa con su propio serializador compilado.
+  Es la base de `RespuestaJSONMedida` (utils.metricas), la respuesta por
+  defecto de la app.
+- `MiddlewareCompresion`: Brotli (si está instalado `brotli`) o gzip según
+  `Accept-Encoding`, para respuestas de al menos `COMPRESION_MINIMO_BYTES`.
+  No toca respuestas ya comprimidas (p. ej. utils.referencia) ni los flujos
+  `text/event-stream` (utils.difusion), que deben llegar evento por evento.
+
+FastAPI pasa todo lo que devuelve una ruta por `jsonable_encoder`, que recorre
+el contenido en Python y suele costar más que el propio `dumps`. Las rutas más
+pesadas devuelven `RespuestaJSONMedida(contenido)` directamente para evitarlo.
+
+Variables de entorno:
+- COMPRESION_MINIMO_BYTES: tamaño mínimo para comprimir (1024).
+- COMPRESION_GZIP_NIVEL: nivel de gzip (6).
+- COMPRESION_BROTLI_CALIDAD: calidad de Brotli (4; 11 es demasiado lento por petición).
+- COMPRESION_HILO_BYTES: desde este tamaño el cuerpo se comprime en un hilo (128 KiB).
+"""
+import importlib.util
+import json
+import os
+import zlib
+from decimal import Decimal
+
+import anyio.to_thread
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+
+ORJSON_DISPONIBLE = importlib.util.find_spec("orjson") is not None
+BROTLI_DISPONIBLE = importlib.util.find_spec("brotli") is not None
+if ORJSON_DISPONIBLE:
+    import orjson
+
+COMPRESION_MINIMO_BYTES = int(os.getenv("COMPRESION_MINIMO_BYTES", "1024"))
+COMPRESION_GZIP_NIVEL = int(os.getenv("COMPRESION_GZIP_NIVEL", "6"))
+COMPRESION_BROTLI_CALIDAD = int(os.getenv("COMPRESION_BROTLI_CALIDAD", "4"))
+COMPRESION_HILO_BYTES = int(os.getenv("COMPRESION_HILO_BYTES", str(128 * 1024)))
+
+# Flujos que deben llegar mensaje a mensaje y formatos ya comprimidos.
+TIPOS_SIN_COMPRESION = (
+    "text/event-stream",
+    "application/grpc",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "font/woff",
+    "font/woff2",
+    "image/avif",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "audio/*",
+    "video/*",
+)
+
+
+# ---------------------------------------------------------------------------
+# Serialización
+# ---------------------------------------------------------------------------
+def _por_defecto(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Modelos de Pydantic, sets, Enum, etc.: lo que ya sabe convertir FastAPI.
+    convertido = jsonable_encoder(obj)
+    if convertido is obj:
+        raise TypeError(f"{type(obj).__name__} no es serializable a JSON")
+    return convertido
+
+
+def serializar(contenido) -> bytes:
+    """JSON compacto en UTF-8."""
+    if isinstance(contenido, BaseModel):
+        # Serializador ya compilado por Pydantic (ver utils.detalle_pedido).
+        return contenido.__pydantic_serializer__.to_json(contenido)
+    if ORJSON_DISPONIBLE:
+        return orjson.dumps(contenido, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        contenido,
+        default=_por_defecto,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class RespuestaJSON(JSONResponse):
+    def render(self, content) -> bytes:
+        return serializar(content)
+
+
+# ---------------------------------------------------------------------------
+# Compresión
+# ---------------------------------------------------------------------------
+def codificaciones_aceptadas(accept_encoding: str) -> set[str]:
+    """Codificaciones de `Accept-Encoding` con q > 0."""
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.partition(";")
+        q = parametros.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if nombre.strip():
+            aceptadas.add(nombre.strip())
+    return aceptadas
+
+
+def _excluido(tipo_contenido: str) -> bool:
+    tipo = tipo_contenido.partition(";")[0].strip().lower()
+    return tipo in TIPOS_SIN_COMPRESION or f"{tipo.partition('/')[0]}/*" in TIPOS_SIN_COMPRESION
+
+
+class Compresor:
+    """Compresión incremental de un cuerpo: `trozo` en un flujo, `final` para cerrar."""
+
+    def __init__(self, codificacion: str, nivel_gzip: int, calidad_brotli: int):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            import brotli
+
+            self._brotli = brotli.Compressor(quality=calidad_brotli)
+        else:
+            # wbits=31: deflate con cabecera y cola de gzip.
+            self._gzip = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)
+
+    def trozo(self, datos: bytes) -> bytes:
+        # El flush deja el trozo decodificable sin esperar al resto del flujo.
+        if self.codificacion == "br":
+            return self._brotli.process(datos) + self._brotli.flush()
+        return self._gzip.compress(datos) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def final(self, datos: bytes) -> bytes:
+        if self.codificacion == "br":
+            return self._brotli.process(datos) + self._brotli.finish()
+        return self._gzip.compress(datos) + self._gzip.flush()
+
+
+class MiddlewareCompresion:
+    """
+    Middleware ASGI de compresión (Brotli o gzip), sin depender de clases
+    internas de Starlette. Sigue las mismas reglas que GZipMiddleware:
+
+    - No comprime respuestas con `Content-Encoding`, parciales (206) ni de los
+      tipos de `TIPOS_SIN_COMPRESION`; esas pasan sin tocar.
+    - Un cuerpo de un solo mensaje se comprime si tiene al menos `minimum_size`
+      bytes; desde `minimo_hilo` bytes se comprime en un hilo para no frenar el
+      event loop.
+    - Un cuerpo en varios mensajes (StreamingResponse) se comprime trozo a
+      trozo y pierde el `Content-Length`.
+    - Las respuestas que podrían comprimirse llevan `Vary: Accept-Encoding`,
+      aunque el cliente no acepte ninguna codificación.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESION_MINIMO_BYTES,
+        compresslevel: int = COMPRESION_GZIP_NIVEL,
+        calidad_brotli: int = COMPRESION_BROTLI_CALIDAD,
+        minimo_hilo: int = COMPRESION_HILO_BYTES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.calidad_brotli = calidad_brotli
+        self.minimo_hilo = minimo_hilo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        aceptadas = codificaciones_aceptadas(Headers(scope=scope).get("accept-encoding", ""))
+        if BROTLI_DISPONIBLE and "br" in aceptadas:
+            codificacion = "br"
+        elif "gzip" in aceptadas:
+            codificacion = "gzip"
+        else:
+            codificacion = None
+        # `pendiente`: inicio retenido hasta ver el primer trozo del cuerpo.
+        # `compresor`: flujo en curso de una respuesta en varios mensajes.
+        pendiente = compresor = None
+
+        async def enviar(mensaje):
+            nonlocal pendiente, compresor
+            tipo = mensaje["type"]
+            if tipo == "http.response.start":
+                cabeceras = Headers(raw=mensaje["headers"])
+                if (
+                    "content-encoding" in cabeceras
+                    or mensaje["status"] == 206
+                    or _excluido(cabeceras.get("content-type", ""))
+                ):
+                    await send(mensaje)
+                else:
+                    pendiente = mensaje
+                return
+
+            if tipo == "http.response.body" and pendiente is not None:
+                inicio, pendiente = pendiente, None
+                cuerpo = mensaje.get("body", b"")
+                mas = mensaje.get("more_body", False)
+                if len(cuerpo) < self.minimum_size and not mas:
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+                cabeceras = MutableHeaders(raw=inicio["headers"])
+                cabeceras.add_vary_header("Accept-Encoding")
+                if codificacion is not None:
+                    compresor = Compresor(codificacion, self.compresslevel, self.calidad_brotli)
+                    cabeceras["Content-Encoding"] = codificacion
+                    if mas:
+                        del cabeceras["Content-Length"]
+                        mensaje["body"] = compresor.trozo(cuerpo)
+                    else:
+                        if len(cuerpo) >= self.minimo_hilo:
+                            mensaje["body"] = await anyio.to_thread.run_sync(compresor.final, cuerpo)
+                        else:
+                            mensaje["body"] = compresor.final(cuerpo)
+                        compresor = None
+                        if inicio.get("trailers", False):
+                            del cabeceras["Content-Length"]
+                        else:
+                            cabeceras["Content-Length"] = str(len(mensaje["body"]))
+                await send(inicio)
+                await send(mensaje)
+                return
+
+            if tipo == "http.response.body" and compresor is not None:
+                cuerpo = mensaje.get("body", b"")
+                if mensaje.get("more_body", False):
+                    mensaje["body"] = compresor.trozo(cuerpo)
+                else:
+                    mensaje["body"] = compresor.final(cuerpo)
+                    compresor = None
+                await send(mensaje)
+                return
+
+            # pathsend (archivo enviado por el servidor), trailers, early hints o
+            # respuestas que no se comprimen.
+            if pendiente is not None and tipo == "http.response.pathsend":
+                await send(pendiente)
+                pendiente = None
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
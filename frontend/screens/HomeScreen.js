@@ -13,7 +13,7 @@ import {
 import { Ionicons } from '@expo/vector-icons';
 import CartBadge from '../components/CartBadge';
 
-import { getProducts, getCategories } from '../services/productService';
+import { getProducts, getReferenceData } from '../services/productService';
 import ProductCard from '../components/ProductCard';
 import { styles } from '../styles/homeScreenStyles';
 
@@ -39,7 +39,8 @@ const HomeScreen = ({ navigation, route }) => {
   useEffect(() => {
     const loadInitialData = async () => {
       try {
-        const categoriesData = await getCategories();
+        // Una sola petición con todos los datos de referencia (categorías, especies, etc.)
+        const { categorias: categoriesData } = await getReferenceData();
         setCategories(categoriesData);
 
         if (categoriesData.length > 0) {
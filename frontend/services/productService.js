@@ -86,3 +86,20 @@ export const getTags = async () => {
     throw error;
   }
 };
+
+/**
+ * 🔹 Obtiene todos los datos de referencia en una sola petición.
+ * Endpoint: GET /cliente/referencia/
+ * 
+ * @returns {Promise<Object>} { version, categorias, especies, etiquetas, razas, subscripciones };
+ *   `razas` va indexado por ID de especie.
+ */
+export const getReferenceData = async () => {
+  try {
+    const response = await api.get('/cliente/referencia/');
+    return response.data;
+  } catch (error) {
+    console.error('❌ Error en getReferenceData:', error.response?.data || error.message);
+    throw error;
+  }
+};